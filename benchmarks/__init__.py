@@ -0,0 +1,10 @@
+"""
+    benchmarks
+    ~~~~~~~~~~
+
+    Performance benchmarks for the :mod:`~ydf` package.
+
+    The micro-benchmark suite is run with `python -m benchmarks run` and compared between runs with
+    `python -m benchmarks compare`. Each `bench_*` module can also be run directly, e.g.
+    `python -m benchmarks.bench_parallel`.
+"""
@@ -0,0 +1,102 @@
+"""
+    benchmarks/__main__
+    ~~~~~~~~~~~~~~~~~~~
+
+    Run the micro-benchmark suite, save results as JSON and compare results between runs.
+
+    Usage:
+        python -m benchmarks list
+        python -m benchmarks run [--group GROUP] [-k KEYWORD] [--output FILE]
+        python -m benchmarks compare BASELINE CURRENT [--threshold FRACTION]
+"""
+
+import argparse
+import io
+import json
+import sys
+
+from benchmarks import common, suite
+
+
+def _format_time(seconds):
+    return '{:.3f}'.format(seconds * 1e6)
+
+
+def command_list(args):
+    for group in suite.groups():
+        print(group)
+        for key, b in suite.select([group]):
+            print('  {}'.format(key))
+    return 0
+
+
+def command_run(args):
+    benchmarks = suite.select(args.group, args.keyword)
+    if not benchmarks:
+        print('No benchmarks match', file=sys.stderr)
+        return 2
+
+    def report(key, result):
+        print('{:<72} {:>14} usec'.format(key, _format_time(result['seconds'])), file=sys.stderr)
+
+    results = suite.run(benchmarks, args.repeat, args.min_time, report)
+
+    if args.output == '-':
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    elif args.output:
+        with io.open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+    return 0
+
+
+def command_compare(args):
+    with io.open(args.baseline) as f:
+        baseline = json.load(f)
+    with io.open(args.current) as f:
+        current = json.load(f)
+
+    comparisons = suite.compare(baseline, current, args.threshold)
+    common.print_table(('benchmark', 'baseline usec', 'current usec', 'ratio', ''), [
+        (c.key, _format_time(c.baseline), _format_time(c.current), '{:.2f}x'.format(c.ratio),
+         'SLOWER' if c.regressed else '')
+        for c in comparisons
+    ])
+
+    regressions = [c for c in comparisons if c.regressed]
+    print('{} of {} benchmarks slower by more than {:.0%}'.format(len(regressions), len(comparisons), args.threshold))
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Micro-benchmark suite for ydf.')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    list_parser = commands.add_parser('list', help='List benchmark groups and cases.')
+    list_parser.set_defaults(func=command_list)
+
+    run_parser = commands.add_parser('run', help='Run benchmarks and optionally save the results as JSON.')
+    run_parser.add_argument('-g', '--group', action='append', choices=suite.groups(),
+                            help='Only run benchmarks in this group; may be given more than once.')
+    run_parser.add_argument('-k', '--keyword', help='Only run benchmarks whose group/name contains this string.')
+    run_parser.add_argument('-o', '--output', help='File to write JSON results to; "-" for stdout.')
+    run_parser.add_argument('--repeat', type=int, default=suite.DEFAULT_REPEAT)
+    run_parser.add_argument('--min-time', type=float, default=suite.DEFAULT_MIN_TIME,
+                            help='Minimum seconds per repetition.')
+    run_parser.set_defaults(func=command_run)
+
+    compare_parser = commands.add_parser('compare', help='Flag benchmarks that slowed down between two runs.')
+    compare_parser.add_argument('baseline', help='JSON results to compare against.')
+    compare_parser.add_argument('current', help='JSON results to check.')
+    compare_parser.add_argument('--threshold', type=float, default=suite.DEFAULT_THRESHOLD,
+                                help='Fraction a benchmark may slow down by before it fails, e.g. 0.1 for 10%%.')
+    compare_parser.set_defaults(func=command_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
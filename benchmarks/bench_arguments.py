@@ -0,0 +1,101 @@
+"""
+    benchmarks/bench_arguments
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Measure the cost of argument constraints on instruction functions, and compare the validator compiled from
+    them with a chain of one function per constraint.
+
+    Usage: python -m benchmarks.bench_arguments [--number N]
+"""
+
+import argparse
+import collections
+
+from benchmarks import common
+from ydf import arguments, instructions
+
+
+ARG = collections.OrderedDict([('image', 'debian'), ('tag', 'buster')])
+
+CONSTRAINTS = (
+    arguments.required(name='dict', required_type=dict),
+    arguments.required_dict_key(name='image', required_type=str),
+    arguments.optional_dict_key(name='tag', required_type=str, mutually_exclusive_with='digest'),
+    arguments.optional_dict_key(name='digest', required_type=str, mutually_exclusive_with='tag'),
+    arguments.required_collection_length(name='dict', length=2),
+)
+
+
+def constrained_instruction(count):
+    """
+    Build an instruction function with a trivial body and the given number of argument constraints.
+
+    :param count: Number of constraints
+    :return: Instruction function
+    """
+    @instructions.instruction(name='BENCH', type=dict, desc='<image>')
+    def bench_dict(arg):
+        return arg['image']
+
+    for decorator in reversed(CONSTRAINTS[:count]):
+        bench_dict = decorator(bench_dict)
+    return bench_dict
+
+
+def chained_validator(func, constraints):
+    """
+    Build a validator that calls one function per constraint, the alternative to compiling them into one.
+
+    :param func: Instruction function the constraints apply to
+    :param constraints: Sequence of :class:`~ydf.arguments.Constraint` in the order to check them
+    :return: Function that takes an instruction argument and returns the argument to convert
+    """
+    checks = tuple(arguments.compile_validator(func, [constraint]) for constraint in constraints)
+
+    def validate(arg):
+        for check in checks:
+            arg = check(arg)
+        return arg
+    return validate
+
+
+def run(number, repeat):
+    """
+    Print the time per call of an instruction function as constraints are added to it.
+
+    :param number: Number of calls per measurement
+    :param repeat: Number of repetitions per measurement
+    """
+    baseline = constrained_instruction(0)
+    baseline_seconds = common.timed(lambda: baseline(ARG), repeat=repeat, number=number)
+
+    rows = []
+    for count in range(len(CONSTRAINTS) + 1):
+        func = constrained_instruction(count)
+        seconds = common.timed(lambda: func(ARG), repeat=repeat, number=number)
+        row = [count, '{:.0f}'.format(seconds * 1e9), '{:.0f}'.format((seconds - baseline_seconds) * 1e9)]
+
+        if count:
+            compiled, chained = func.validate, chained_validator(func.instruction_func, func.constraints)
+            compiled_seconds = common.timed(lambda: compiled(ARG), repeat=repeat, number=number)
+            chained_seconds = common.timed(lambda: chained(ARG), repeat=repeat, number=number)
+            row += ['{:.0f}'.format(compiled_seconds * 1e9), '{:.0f}'.format(chained_seconds * 1e9),
+                    '{:.2f}x'.format(chained_seconds / compiled_seconds)]
+        else:
+            row += ['-', '-', '-']
+        rows.append(row)
+
+    common.print_table(('constraints', 'nsec/call', 'nsec/overhead', 'nsec/compiled', 'nsec/chained', 'speedup'),
+                       rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[-1])
+    parser.add_argument('--number', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    run(args.number, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+    benchmarks/bench_check
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Compare validating a corpus with `ydf --check` against rendering it.
+
+    Usage: python -m benchmarks.bench_check [--files N] [--jobs N]
+"""
+
+import argparse
+import shutil
+import tempfile
+
+from benchmarks import common
+from ydf import batch, check, parallel, yaml_ext
+
+
+def run(files, jobs, repeat):
+    """
+    Check and render a generated corpus and print throughput and speedup of checking.
+
+    :param files: Number of YAML files in the corpus
+    :param jobs: Number of worker processes
+    :param repeat: Number of repetitions per measurement
+    """
+    directory = tempfile.mkdtemp(prefix='ydf-bench-')
+    try:
+        paths = common.write_corpus(directory, files)
+        output_dir = tempfile.mkdtemp(dir=directory)
+
+        # Keep parsed files out of the comparison; both modes load every file the same way.
+        yaml_ext.set_cache_size(0)
+
+        render = common.timed(lambda: list(batch.render_files(paths, output_dir=output_dir, jobs=jobs)),
+                              repeat=repeat)
+        checked = common.timed(lambda: list(check.check_files(paths, jobs)), repeat=repeat)
+
+        rows = [(name, '{:.3f}'.format(seconds), '{:.0f}'.format(files / seconds),
+                 '{:.2f}x'.format(render / seconds)) for name, seconds in (('render', render), ('check', checked))]
+        common.print_table(('mode', 'seconds', 'files/sec', 'speedup'), rows)
+    finally:
+        shutil.rmtree(directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[-1])
+    parser.add_argument('--files', type=int, default=2000)
+    parser.add_argument('--jobs', type=int, default=parallel.cpu_count())
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(args.files, args.jobs, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
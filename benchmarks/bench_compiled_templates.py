@@ -0,0 +1,140 @@
+"""
+    benchmarks/bench_compiled_templates
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Compare the cold start of rendering with custom templates compiled from source, from a bytecode cache and
+    from an archive written by `ydf compile-templates`.
+
+    Usage: python -m benchmarks.bench_compiled_templates [--number N]
+"""
+
+import argparse
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from benchmarks import common
+from ydf import templating
+
+
+# A custom template that extends a base template and includes partials full of macros and conditionals, like
+# those teams keep next to their YAML files.
+BASE_TEMPLATE = """
+# Generated by ydf {{ ydf.version }}
+{% block header %}{% endblock %}
+{% block body %}{% endblock %}
+{% block footer %}{% endblock %}
+"""
+
+CUSTOM_TEMPLATE = """
+{% extends "base.tpl" %}
+{% import "macros.tpl" as m %}
+{% block header %}
+{% for n in range(PARTIALS) %}{% include "partial-" ~ n ~ ".tpl" %}{% endfor %}
+{% endblock %}
+{% block body %}
+{{ m.section(meta) }}
+{{ convert_instructions(instructions) }}
+{% endblock %}
+"""
+
+MACRO_TEMPLATE = """
+{% macro field_{n}(name, value) -%}
+{% if value is mapping %}{% for k, v in value|dictsort %}# {{ name }}.{{ k }}: {{ v|string|trim }}
+{% endfor %}{% elif value is sequence and value is not string %}# {{ name }}: {{ value|join(', ') }}
+{% else %}# {{ name }}: {{ value|default('-')|upper if name == 'x{n}' else value|default('-') }}{% endif %}
+{%- endmacro %}
+"""
+
+PARTIAL_TEMPLATE = """
+{% set labels = meta.get('labels', {}) %}
+{% for key in ('relpath', 'description', 'owner', 'team', 'tier') %}
+{% if key in meta and meta[key] is not none %}# {{ loop.index }}/{{ n }} {{ key|title }}: {{ meta[key]|truncate(60) }}
+{% elif key in labels %}# {{ key }} (label): {{ labels[key] }}{% endif %}
+{% endfor %}
+"""
+
+PARTIALS = 10
+MACROS = 20
+
+
+def write_templates(directory):
+    """
+    Write the custom templates to the given directory.
+
+    :param directory: Directory to write templates into
+    """
+    files = {
+        'base.tpl': BASE_TEMPLATE,
+        'custom.tpl': CUSTOM_TEMPLATE.replace('PARTIALS', str(PARTIALS)),
+        'macros.tpl': (''.join(MACRO_TEMPLATE.replace('{n}', str(n)) for n in range(MACROS)) +
+                       '{% macro section(meta) %}' +
+                       ''.join('{{{{ field_{0}("x{0}", meta.get("x{0}")) }}}}'.format(n) for n in range(MACROS)) +
+                       '{% endmacro %}'),
+    }
+    for n in range(PARTIALS):
+        files['partial-{}.tpl'.format(n)] = PARTIAL_TEMPLATE.replace(' n ', ' {} '.format(n))
+
+    for name, content in files.items():
+        with io.open(os.path.join(directory, name), 'w') as f:
+            f.write(content)
+
+
+def run(number, repeat):
+    """
+    Print the time per cold CLI process rendering a file with custom templates.
+
+    :param number: Number of processes per measurement
+    :param repeat: Number of repetitions per measurement
+    """
+    directory = tempfile.mkdtemp(prefix='ydf-bench-')
+    templates = os.path.join(directory, 'templates')
+    bytecode_cache = os.path.join(directory, 'bytecode')
+    archive = os.path.join(directory, 'templates.zip')
+    missing = os.path.join(directory, 'missing.zip')
+    output = os.path.join(directory, 'out.Dockerfile')
+
+    try:
+        os.mkdir(templates)
+        write_templates(templates)
+        yaml_path = common.write_corpus(directory, 1)[0]
+        templating.compile_templates(archive, [templates, templating.DEFAULT_TEMPLATE_PATH])
+
+        def cold_cli(*options):
+            return lambda: subprocess.check_call([sys.executable, '-m', 'ydf', yaml_path, '-s', templates, '-t',
+                                                  'custom.tpl', '-o', output] + list(options))
+
+        cases = [
+            ('template source', cold_cli('--template-archive', missing)),
+            ('bytecode cache', cold_cli('--template-archive', missing, '--bytecode-cache', bytecode_cache)),
+            ('compiled template archive', cold_cli('--template-archive', archive)),
+            ('native default template', lambda: subprocess.check_call([sys.executable, '-m', 'ydf', yaml_path,
+                                                                       '-o', output])),
+        ]
+
+        rows = []
+        baseline = None
+        for name, func in cases:
+            func()
+            seconds = common.timed(func, repeat=repeat, number=number)
+            baseline = baseline or seconds
+            rows.append((name, '{:.2f}'.format(seconds * 1e3), '{:.2f}x'.format(baseline / seconds)))
+
+        common.print_table(('cold cli process', 'msec/render', 'speedup'), rows)
+    finally:
+        shutil.rmtree(directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[-1])
+    parser.add_argument('--number', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(args.number, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+    benchmarks/bench_meta
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Compare instruction lookup through the dispatch table against resolving the argument type per call.
+
+    Usage: python -m benchmarks.bench_meta [--number N]
+"""
+
+import argparse
+import collections
+
+from benchmarks import common
+from ydf import meta, yaml_ext
+
+
+ARGS = (
+    ('from', 'debian:buster'),
+    ('env', collections.OrderedDict([('KEY', 'value')])),
+    ('run', ['echo one', 'echo two']),
+    ('expose', 8080),
+)
+
+
+def resolve(name, arg):
+    """
+    Resolve an instruction the way lookups worked before the dispatch table existed.
+    """
+    return meta.get_instructions()[name.upper()][meta.get_instruction_arg_type(arg)]
+
+
+def run(number, repeat):
+    """
+    Print the time per lookup for each argument type, both as built-ins and as round trip loader types.
+
+    :param number: Number of lookups per measurement
+    :param repeat: Number of repetitions per measurement
+    """
+    document = yaml_ext.load('instructions: [{env: {KEY: value}}, {run: [echo]}]', yaml_ext.LOADER_ROUNDTRIP)
+    args = ARGS + tuple(next(iter(i.items())) for i in document['instructions'])
+
+    rows = []
+    for name, arg in args:
+        scan = common.timed(lambda: resolve(name, arg), repeat=repeat, number=number)
+        table = common.timed(lambda: meta.get_instruction(name, arg), repeat=repeat, number=number)
+        rows.append((name, type(arg).__name__, '{:.0f}'.format(scan * 1e9),
+                     '{:.0f}'.format(table * 1e9), '{:.2f}x'.format(scan / table)))
+
+    common.print_table(('instruction', 'arg type', 'nsec/resolve', 'nsec/dispatch', 'speedup'), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[-1])
+    parser.add_argument('--number', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(args.number, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
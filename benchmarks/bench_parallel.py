@@ -0,0 +1,55 @@
+"""
+    benchmarks/bench_parallel
+    ~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Measure how batch rendering scales with the number of worker processes.
+
+    Usage: python -m benchmarks.bench_parallel [--files N] [--max-jobs N]
+"""
+
+import argparse
+import shutil
+import tempfile
+
+from benchmarks import common
+from ydf import batch, parallel
+
+
+def run(files, max_jobs, repeat):
+    """
+    Render a generated corpus with 1..N jobs and print throughput and speedup.
+
+    :param files: Number of YAML files in the corpus
+    :param max_jobs: Largest number of worker processes to measure
+    :param repeat: Number of repetitions per measurement
+    """
+    directory = tempfile.mkdtemp(prefix='ydf-bench-')
+    try:
+        paths = common.write_corpus(directory, files)
+        output_dir = tempfile.mkdtemp(dir=directory)
+
+        rows = []
+        baseline = None
+        for jobs in range(1, max_jobs + 1):
+            seconds = common.timed(lambda: list(batch.render_files(paths, output_dir=output_dir, jobs=jobs)),
+                                   repeat=repeat)
+            baseline = baseline or seconds
+            rows.append((jobs, '{:.3f}'.format(seconds), '{:.0f}'.format(files / seconds),
+                         '{:.2f}x'.format(baseline / seconds)))
+
+        common.print_table(('jobs', 'seconds', 'files/sec', 'speedup'), rows)
+    finally:
+        shutil.rmtree(directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[-1])
+    parser.add_argument('--files', type=int, default=2000)
+    parser.add_argument('--max-jobs', type=int, default=parallel.cpu_count())
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(args.files, args.max_jobs, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+    benchmarks/bench_server
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    Compare the latency of rendering a file with cold CLI invocations against a `ydf serve` daemon.
+
+    Usage: python -m benchmarks.bench_server [--number N]
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import common
+from ydf import client
+
+
+def wait_for_socket(path, timeout=30):
+    """
+    Wait until a daemon answers on the given socket.
+
+    :param path: Path of the Unix socket
+    :param timeout: Number of seconds to wait
+    """
+    deadline = time.time() + timeout
+    while True:
+        try:
+            with client.Client(path) as c:
+                c.ping()
+            return
+        except OSError:
+            if time.time() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def run(number, repeat):
+    """
+    Print the time per render for cold CLI processes, thin client processes and a persistent connection.
+
+    :param number: Number of renders per measurement
+    :param repeat: Number of repetitions per measurement
+    """
+    directory = tempfile.mkdtemp(prefix='ydf-bench-')
+    socket_path = os.path.join(directory, 'ydf.sock')
+    yaml_path = common.write_corpus(directory, 1)[0]
+    output = os.path.join(directory, 'out.Dockerfile')
+
+    daemon = subprocess.Popen([sys.executable, '-m', 'ydf', 'serve', '--socket', socket_path],
+                              stderr=subprocess.DEVNULL)
+    try:
+        wait_for_socket(socket_path)
+
+        def cold_cli():
+            subprocess.check_call([sys.executable, '-m', 'ydf', yaml_path, '--output', output])
+
+        def thin_client():
+            subprocess.check_call([sys.executable, '-m', 'ydf.client', '--socket', socket_path, yaml_path,
+                                   '--output', output])
+
+        with client.Client(socket_path) as connection:
+            cases = [
+                ('cold cli process', cold_cli),
+                ('thin client process', thin_client),
+                ('persistent connection', lambda: connection.render(file=yaml_path)),
+            ]
+
+            rows = []
+            baseline = None
+            for name, func in cases:
+                seconds = common.timed(func, repeat=repeat, number=number)
+                baseline = baseline or seconds
+                rows.append((name, '{:.2f}'.format(seconds * 1e3), '{:.1f}x'.format(baseline / seconds)))
+
+        common.print_table(('case', 'msec/render', 'speedup'), rows)
+    finally:
+        daemon.terminate()
+        daemon.wait()
+        shutil.rmtree(directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[-1])
+    parser.add_argument('--number', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(args.number, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+    benchmarks/bench_streaming
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Compare peak memory and time of rendering a YAML file with a huge instruction list, loaded whole or streamed.
+
+    Usage: python -m benchmarks.bench_streaming [--instructions N]
+"""
+
+import argparse
+import io
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks import common
+from ydf import batch, streaming, templating
+
+
+INSTRUCTIONS = (
+    '  - run: "apt-get install -y package-{index}"\n',
+    '  - copy: "src/module-{index}.py /app/module-{index}.py"\n',
+    '  - label:\n      build-{index}: "value {index}"\n',
+)
+
+
+def write_yaml(path, count):
+    """
+    Write a YAML file with the given number of instructions.
+
+    :param path: Path of the file to write
+    :param count: Number of instructions
+    """
+    with io.open(path, 'w') as f:
+        f.write('meta:\n  name: huge\ninstructions:\n  - from: "debian:buster"\n')
+        for index in range(count):
+            f.write(INSTRUCTIONS[index % len(INSTRUCTIONS)].format(index=index))
+
+
+def measure(func):
+    """
+    Call a function, tracing memory allocations.
+
+    :param func: Function to call
+    :return: Tuple of seconds taken and peak traced memory in bytes
+    """
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        return elapsed, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(counts):
+    """
+    Render files of each size both ways and print time and peak memory.
+
+    :param counts: Sequence of instruction counts
+    """
+    directory = tempfile.mkdtemp(prefix='ydf-bench-')
+    try:
+        template = templating.load_template()
+        rows = []
+        for count in counts:
+            path = os.path.join(directory, 'huge-{}.yaml'.format(count))
+            write_yaml(path, count)
+            output = os.path.join(directory, 'huge-{}.Dockerfile'.format(count))
+
+            def whole():
+                batch.write_file(output, batch.render_file(path, template))
+
+            def streamed():
+                with io.open(output, 'w') as f:
+                    streaming.render_file(path, f)
+
+            for name, func in (('load', whole), ('stream', streamed)):
+                seconds, peak = measure(func)
+                rows.append((count, name, '{:.3f}'.format(seconds), '{:.1f}'.format(peak / 1024.0 / 1024.0)))
+
+        common.print_table(('instructions', 'mode', 'seconds', 'peak MiB'), rows)
+    finally:
+        shutil.rmtree(directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[-1])
+    parser.add_argument('--instructions', type=int, nargs='+', default=[1000, 10000, 50000])
+    args = parser.parse_args()
+    run(args.instructions)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+    benchmarks/bench_templating
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Measure the per-render cost of template environments: fresh vs. cached, escaped vs. plain text,
+    Jinja2 vs. the native default template and cold template compilation with and without a bytecode cache.
+
+    Usage: python -m benchmarks.bench_templating [--number N]
+"""
+
+import argparse
+import shutil
+import tempfile
+
+from benchmarks import common
+from ydf import templating, yaml_ext
+
+
+def _render_fresh(yaml_vars, autoescape):
+    env = templating._environ(templating.DEFAULT_TEMPLATE_PATH, autoescape, cached=False)
+    return templating.render_template(env.get_template(templating.DEFAULT_TEMPLATE_NAME), yaml_vars)
+
+
+def _compile_cold(bytecode_cache):
+    env = templating._environ(templating.DEFAULT_TEMPLATE_PATH, bytecode_cache=bytecode_cache, cached=False)
+    return env.get_template(templating.DEFAULT_TEMPLATE_NAME)
+
+
+def run(number, repeat):
+    """
+    Print the time taken per render for each environment configuration.
+
+    :param number: Number of renders per repetition
+    :param repeat: Number of repetitions per measurement
+    """
+    yaml_vars = yaml_ext.load(common.generate_yaml(0))
+    directory = tempfile.mkdtemp(prefix='ydf-bench-')
+
+    try:
+        cases = [
+            ('fresh environment, autoescape', lambda: _render_fresh(yaml_vars, True)),
+            ('cached environment, autoescape', lambda: templating.render(yaml_vars, autoescape=True, native=False)),
+            ('cached environment, plain text', lambda: templating.render(yaml_vars, autoescape=False, native=False)),
+            ('native default template, autoescape', lambda: templating.render(yaml_vars, autoescape=True)),
+            ('native default template, plain text', lambda: templating.render(yaml_vars, autoescape=False)),
+            ('cold compile, no bytecode cache', lambda: _compile_cold(None)),
+            ('cold compile, bytecode cache', lambda: _compile_cold(directory)),
+        ]
+
+        rows = []
+        for name, func in cases:
+            seconds = common.timed(func, repeat=repeat, number=number)
+            rows.append((name, '{:.1f}'.format(seconds * 1e6)))
+
+        common.print_table(('case', 'usec/call'), rows)
+    finally:
+        shutil.rmtree(directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[-1])
+    parser.add_argument('--number', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(args.number, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+    benchmarks/bench_yaml_cache
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Compare loading a YAML file that misses the document cache with loading it from the cache, with and without
+    copying the cached document.
+
+    Usage: python -m benchmarks.bench_yaml_cache [--instructions N]
+"""
+
+import argparse
+import io
+import os
+import shutil
+import tempfile
+
+from benchmarks import common
+from benchmarks.bench_yaml_ext import generate_large_yaml
+from ydf import yaml_ext
+
+
+def run(instructions, repeat):
+    """
+    Print the time to load a small and a large file with each loader backend on a cache miss and hit.
+
+    :param instructions: Number of repeated instruction blocks in the large file
+    :param repeat: Number of repetitions per measurement
+    """
+    directory = tempfile.mkdtemp(prefix='ydf-bench-')
+    files = (
+        ('service', common.generate_yaml(0), 200),
+        ('large', generate_large_yaml(instructions), 1),
+    )
+
+    rows = []
+    try:
+        yaml_ext.set_cache_size(len(files))
+        for name, text, number in files:
+            path = os.path.join(directory, '{}.yaml'.format(name))
+            with io.open(path, 'w') as f:
+                f.write(text)
+
+            for loader in yaml_ext.available_loaders():
+                yaml_ext.load_file(path, loader)
+                cases = (
+                    ('miss', lambda: yaml_ext.load_file(path, loader, cached=False)),
+                    ('hit', lambda: yaml_ext.load_file(path, loader)),
+                    ('hit, no copy', lambda: yaml_ext.load_file(path, loader, copy=False)),
+                )
+                baseline = None
+                for case, func in cases:
+                    seconds = common.timed(func, repeat=repeat, number=number)
+                    baseline = baseline or seconds
+                    rows.append((name, loader, case, '{:.3f}'.format(seconds * 1e3),
+                                 '{:.2f}x'.format(baseline / seconds)))
+    finally:
+        yaml_ext.set_cache_size(0)
+        yaml_ext.clear_cache()
+        shutil.rmtree(directory)
+
+    common.print_table(('file', 'loader', 'case', 'msec/load', 'vs miss'), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[-1])
+    parser.add_argument('--instructions', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(args.instructions, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
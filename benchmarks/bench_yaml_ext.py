@@ -0,0 +1,83 @@
+"""
+    benchmarks/bench_yaml_ext
+    ~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Compare parse throughput of each available YAML loader backend on realistic files.
+
+    Usage: python -m benchmarks.bench_yaml_ext [--instructions N]
+"""
+
+import argparse
+
+from benchmarks import common
+from ydf import yaml_ext
+
+
+LARGE_YAML_HEADER = """
+meta:
+  description: "Large generated file"
+
+x-cleanup: &cleanup
+  - "apt-get clean"
+  - "rm -rf /var/lib/apt/lists/*"
+
+instructions:
+  - from: "debian:buster"
+"""
+
+LARGE_YAML_ITEM = """
+  - env:
+      STEP_{index}: "value-{index}"
+  - run:
+      - "echo step {index}"
+      - "touch /tmp/step-{index}"
+  - run: *cleanup
+  - label:
+      step.{index}: "{index}"
+"""
+
+
+def generate_large_yaml(count):
+    """
+    Build the YAML text of a single file with many instructions, including aliases of an anchored node.
+
+    :param count: Number of times the repeated instruction block appears
+    :return: YAML string
+    """
+    return LARGE_YAML_HEADER + ''.join(LARGE_YAML_ITEM.format(index=i) for i in range(count))
+
+
+def run(instructions, repeat):
+    """
+    Print parse time and throughput of each loader backend for a small and a large file.
+
+    :param instructions: Number of repeated instruction blocks in the large file
+    :param repeat: Number of repetitions per measurement
+    """
+    files = (
+        ('service', common.generate_yaml(0), 200),
+        ('large', generate_large_yaml(instructions), 1),
+    )
+
+    rows = []
+    for name, text, number in files:
+        timings = [(loader, common.timed(lambda: yaml_ext.load(text, loader), repeat=repeat, number=number))
+                   for loader in yaml_ext.available_loaders()]
+        baseline = dict(timings)[yaml_ext.LOADER_ROUNDTRIP]
+        for loader, seconds in timings:
+            rows.append((name, loader, '{:.1f}'.format(seconds * 1e3), '{:.2f}'.format(len(text) / seconds / 1e6),
+                         '{:.2f}x'.format(baseline / seconds)))
+
+    common.print_table(('file', 'loader', 'msec/parse', 'MB/sec', 'vs roundtrip'), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[-1])
+    parser.add_argument('--instructions', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(args.instructions, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+    benchmarks/common
+    ~~~~~~~~~~~~~~~~~
+
+    Helpers shared by benchmark modules: realistic YAML corpora, timers and result tables.
+"""
+
+import io
+import os
+import time
+
+
+YAML_TEMPLATE = """
+meta:
+  relpath: "service-{index}.yaml"
+  description: "Generated benchmark service number {index}"
+
+instructions:
+  - from:
+      image: "python"
+      tag: "3.6"
+  - label:
+      maintainer: "team-{index}@example.com"
+      version: "1.{index}.0"
+      url: "https://example.com/services/{index}"
+  - env:
+      SERVICE_NAME: "service-{index}"
+      SERVICE_PORT: "{port}"
+      PYTHONUNBUFFERED: "1"
+  - arg: "BUILD_NUMBER=0"
+  - workdir: "/srv/service-{index}"
+  - copy: "requirements.txt /srv/service-{index}/requirements.txt"
+  - run:
+      - "apt-get update"
+      - "apt-get install -y --no-install-recommends build-essential libpq-dev"
+      - "pip install --no-cache-dir -r requirements.txt"
+      - "rm -rf /var/lib/apt/lists/*"
+  - copy: ". /srv/service-{index}"
+  - user: "www-data"
+  - expose: {port}
+  - healthcheck:
+      options:
+        interval: "30s"
+      cmd: "curl -f http://localhost:{port}/ || exit 1"
+  - entrypoint:
+      executable: "python"
+      params:
+        - "-m"
+        - "service_{index}"
+"""
+
+
+def generate_yaml(index):
+    """
+    Build the YAML text of a realistic service definition.
+
+    :param index: Number used to make the generated document unique
+    :return: YAML string
+    """
+    return YAML_TEMPLATE.format(index=index, port=8000 + index % 1000)
+
+
+def write_corpus(directory, count):
+    """
+    Write a corpus of YAML files to the given directory.
+
+    :param directory: Directory to write files into
+    :param count: Number of files to write
+    :return: List of file paths in the order they were written
+    """
+    paths = []
+    for index in range(count):
+        path = os.path.join(directory, 'service-{:05d}.yaml'.format(index))
+        with io.open(path, 'w') as f:
+            f.write(generate_yaml(index))
+        paths.append(path)
+    return paths
+
+
+def timed(func, repeat=3, number=1):
+    """
+    Time the given function, returning the best of several repetitions.
+
+    :param func: Callable that takes no arguments
+    :param repeat: Number of repetitions
+    :param number: Number of calls per repetition
+    :return: Best wall time of a single call, in seconds
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = (time.perf_counter() - start) / number
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def calibrate(func, min_time=0.1):
+    """
+    Find the number of calls of the given function that take at least the given amount of time.
+
+    :param func: Callable that takes no arguments
+    :param min_time: Minimum time, in seconds, the calls should take
+    :return: Number of calls
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return number
+        number = max(number * 2, int(number * min_time / elapsed) + 1) if elapsed else number * 10
+
+
+def print_table(headers, rows):
+    """
+    Print rows of benchmark results as an aligned plain text table.
+
+    :param headers: Sequence of column names
+    :param rows: Sequence of row sequences
+    """
+    rows = [[str(c) for c in row] for row in rows]
+    widths = [max(len(str(h)), *(len(r[i]) for r in rows)) if rows else len(str(h)) for i, h in enumerate(headers)]
+    print('  '.join(str(h).rjust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print('  '.join(c.rjust(w) for c, w in zip(row, widths)))
@@ -0,0 +1,238 @@
+"""
+    benchmarks/suite
+    ~~~~~~~~~~~~~~~~
+
+    Registry of micro-benchmarks for each stage of converting YAML to a Dockerfile, plus functions to
+    run them and compare results between runs.
+"""
+
+import collections
+import copy
+import io
+import platform
+
+from benchmarks import common
+from ydf import __version__, formatting, instructions, meta, templating, yaml_ext
+
+
+RESULTS_FORMAT = 1
+DEFAULT_REPEAT = 5
+DEFAULT_MIN_TIME = 0.1
+DEFAULT_THRESHOLD = 0.1
+
+SIZES = (10, 1000, 100000)
+
+
+Benchmark = collections.namedtuple('Benchmark', 'group name setup')
+
+BENCHMARKS = collections.OrderedDict()
+
+
+def benchmark(group, name):
+    """
+    Decorate a function that sets up a benchmark and returns the callable to time.
+
+    :param group: Name of the benchmark group, usually the function being measured
+    :param name: Name of the case within the group
+    """
+    def decorator(setup):
+        key = '{}/{}'.format(group, name)
+        BENCHMARKS[key] = Benchmark(group, name, setup)
+        return setup
+    return decorator
+
+
+def groups():
+    """
+    Get the names of all benchmark groups, in registration order.
+
+    :return: List of group names
+    """
+    return list(collections.OrderedDict.fromkeys(b.group for b in BENCHMARKS.values()))
+
+
+def _register_yaml_ext():
+    text = common.generate_yaml(0)
+    for loader in yaml_ext.available_loaders():
+        benchmark('yaml_ext.load', loader)(lambda loader=loader: lambda: yaml_ext.load(text, loader))
+
+
+def _register_meta():
+    document = yaml_ext.load(common.generate_yaml(0), yaml_ext.LOADER_ROUNDTRIP)
+    args = (
+        ('str', 'from', 'debian:buster'),
+        ('dict', 'env', collections.OrderedDict([('KEY', 'value')])),
+        ('list', 'run', ['echo one', 'echo two']),
+        ('int', 'expose', 8080),
+        ('CommentedSeq', 'run', document['instructions'][6]['run']),
+    )
+    for case, name, arg in args:
+        benchmark('meta.get_instruction', case)(
+            lambda name=name, arg=arg: lambda: meta.get_instruction(name, arg))
+
+
+def _register_arguments():
+    calls = (
+        (instructions.from_str, 'debian:buster'),
+        (instructions.from_dict, collections.OrderedDict([('image', 'debian'), ('tag', 'buster')])),
+        (instructions.expose_int, 8080),
+        (instructions.stopsignal_int, 9),
+        (instructions.arg_str, 'VERSION=1'),
+        (instructions.healthcheck_dict, collections.OrderedDict([('cmd', 'curl localhost')])),
+    )
+    for func, arg in calls:
+        benchmark('arguments.validate', func.__name__)(lambda func=func, arg=arg: lambda: func.validate(arg))
+
+
+def _register_instructions():
+    blocks = ''.join('  - *cleanup\n  - env: *env\n  - label: *labels\n' for _ in range(50))
+    text = '''
+instructions:
+  - &cleanup
+    run:
+      - "apt-get clean"
+      - "rm -rf /var/lib/apt/lists/* /tmp/* /var/tmp/*"
+  - env: &env
+      LANG: "C.UTF-8"
+      PATH: "/usr/local/bin:/usr/bin:/bin"
+  - label: &labels
+      maintainer: "ops@example.com"
+      team: "platform"
+''' + blocks
+    aliased = yaml_ext.load(text)['instructions']
+    expanded = [copy.deepcopy(instruction) for instruction in aliased]
+    for name, items in (('aliased', aliased), ('expanded', expanded)):
+        benchmark('instructions.convert_instructions', name)(
+            lambda items=items: lambda: instructions.convert_instructions(items))
+
+
+def _register_formatting():
+    def items(size):
+        return ['item-{} '.format(i) for i in range(size)]
+
+    def pairs(size):
+        return collections.OrderedDict(('key-{}'.format(i), 'value-{}'.format(i)) for i in range(size))
+
+    cases = (
+        ('list_with_conditional_line_breaks', items,
+         lambda lst: formatting.list_with_conditional_line_breaks(lst, quote_escape=True)),
+        ('list_with_conditional_command_line_breaks', items, formatting.list_with_conditional_command_line_breaks),
+        ('dict_with_conditional_line_breaks', pairs,
+         lambda dct: formatting.dict_with_conditional_line_breaks(dct, quote_escape=True)),
+        ('str_join_with_conditional_delimiter', items,
+         lambda lst: formatting.str_join_with_conditional_delimiter(lst, ' ')),
+        ('str_join_instruction_options', pairs, formatting.str_join_instruction_options),
+    )
+    for name, build, func in cases:
+        for size in SIZES:
+            benchmark('formatting.{}'.format(name), size)(
+                lambda build=build, func=func, size=size: (lambda arg: lambda: func(arg))(build(size)))
+
+    # Writers append to one reused buffer, the way a caller emitting many instructions would.
+    buffer = io.StringIO()
+
+    def write(func, arg):
+        buffer.seek(0)
+        buffer.truncate()
+        func(buffer, arg)
+
+    writers = (
+        ('write_list_with_conditional_line_breaks', items,
+         lambda b, lst: formatting.write_list_with_conditional_line_breaks(b, lst, quote_escape=True)),
+        ('write_list_with_conditional_command_line_breaks', items,
+         formatting.write_list_with_conditional_command_line_breaks),
+        ('write_dict_with_conditional_line_breaks', pairs,
+         lambda b, dct: formatting.write_dict_with_conditional_line_breaks(b, dct, quote_escape=True)),
+    )
+    for name, build, func in writers:
+        for size in SIZES:
+            benchmark('formatting.{}'.format(name), size)(
+                lambda build=build, func=func, size=size: (lambda arg: lambda: write(func, arg))(build(size)))
+
+
+def _register_templating():
+    service = yaml_ext.load(common.generate_yaml(0))
+    large = collections.OrderedDict(instructions=[i for n in range(100)
+                                                  for i in yaml_ext.load(common.generate_yaml(n))['instructions']])
+    for name, document in (('service', service), ('large', large)):
+        for autoescape in (True, False):
+            for native in (True, False):
+                case = '{}-{}{}'.format(name, 'autoescape' if autoescape else 'plain', '' if native else '-jinja')
+                benchmark('templating.render', case)(
+                    lambda document=document, autoescape=autoescape, native=native:
+                    lambda: templating.render(document, autoescape=autoescape, native=native))
+
+
+_register_yaml_ext()
+_register_meta()
+_register_arguments()
+_register_instructions()
+_register_formatting()
+_register_templating()
+
+
+def select(group_names=None, keyword=None):
+    """
+    Get the benchmarks in the given groups whose key contains the given keyword.
+
+    :param group_names: (Optional) Sequence of group names; all groups if not given
+    :param keyword: (Optional) Substring the `group/name` key must contain
+    :return: List of `(key, benchmark)` tuples
+    """
+    return [(key, b) for key, b in BENCHMARKS.items()
+            if (not group_names or b.group in group_names) and (not keyword or keyword in key)]
+
+
+def run(benchmarks, repeat=DEFAULT_REPEAT, min_time=DEFAULT_MIN_TIME, callback=None):
+    """
+    Run the given benchmarks and collect their results.
+
+    Each benchmark is called enough times to take at least `min_time` per repetition and the best
+    repetition is kept.
+
+    :param benchmarks: Sequence of `(key, benchmark)` tuples
+    :param repeat: Number of repetitions per benchmark
+    :param min_time: Minimum time, in seconds, of each repetition
+    :param callback: (Optional) Function called with the key and result of each benchmark as it finishes
+    :return: Dict of results that can be serialized as JSON
+    """
+    results = collections.OrderedDict()
+    for key, b in benchmarks:
+        func = b.setup()
+        number = common.calibrate(func, min_time)
+        seconds = common.timed(func, repeat=repeat, number=number)
+        results[key] = collections.OrderedDict([
+            ('group', b.group), ('name', str(b.name)), ('seconds', seconds), ('number', number), ('repeat', repeat)
+        ])
+        if callback:
+            callback(key, results[key])
+
+    return collections.OrderedDict([
+        ('format', RESULTS_FORMAT),
+        ('ydf', __version__),
+        ('python', platform.python_version()),
+        ('platform', platform.platform()),
+        ('benchmarks', results),
+    ])
+
+
+Comparison = collections.namedtuple('Comparison', 'key baseline current ratio regressed')
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare two sets of results for benchmarks present in both.
+
+    :param baseline: Results returned by :func:`~benchmarks.suite.run` to compare against
+    :param current: Results returned by :func:`~benchmarks.suite.run` to check
+    :param threshold: Fraction a benchmark may slow down by before it's flagged, e.g. `0.1` for 10%
+    :return: List of :class:`~benchmarks.suite.Comparison` instances
+    """
+    comparisons = []
+    for key, result in current['benchmarks'].items():
+        before = baseline['benchmarks'].get(key)
+        if before is None:
+            continue
+        ratio = result['seconds'] / before['seconds']
+        comparisons.append(Comparison(key, before['seconds'], result['seconds'], ratio, ratio > 1 + threshold))
+    return comparisons
@@ -44,6 +44,7 @@ setup(
     entry_points="""
         [console_scripts]
         ydf=ydf.cli:main
+        ydf-client=ydf.client:main
     """,
     classifiers=(
         'Development Status :: 2 - Pre-Alpha',
@@ -13,8 +13,5 @@
 # ---
 
 {% if instructions is defined %}
-  {% for instruction in instructions -%}
-      {{ convert_instruction(instruction) }}
-
-  {% endfor %}
-{% endif %}
+  {{- convert_instructions(instructions) }}
+{%- endif %}
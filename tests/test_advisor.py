@@ -0,0 +1,109 @@
+"""
+    test_advisor
+    ~~~~~~~~~~~~
+
+    Tests for the :mod:`~ydf.advisor` module.
+"""
+
+import pytest
+
+from ydf import advisor, ir, passes
+
+
+def _codes(nodes):
+    return [(advice.index, advice.code, advice.movable) for advice in advisor.advise(nodes)]
+
+
+def test_advise_copy_before_install():
+    """
+    Assert that :func:`~ydf.advisor.advise` reports copying a source tree before installing dependencies, and
+    doesn't offer to move it.
+    """
+    nodes = [ir.From('python'), ir.Copy('. /app'), ir.Run('pip install -r /app/requirements.txt')]
+    assert _codes(nodes) == [(1, advisor.ADVICE_COPY_BEFORE_INSTALL, False)]
+
+
+@pytest.mark.parametrize('copy', [
+    ir.Copy('requirements.txt /app/'),
+    ir.Copy(['requirements.txt', '/app/']),
+])
+def test_advise_allows_copying_files_before_install(copy):
+    """
+    Assert that :func:`~ydf.advisor.advise` allows copying individual files, e.g. a requirements file, before
+    installing dependencies.
+    """
+    assert _codes([ir.From('python'), copy, ir.Run('pip install -r requirements.txt')]) == []
+
+
+def test_advise_early_arg():
+    """
+    Assert that :func:`~ydf.advisor.advise` reports an `ARG` declared before `RUN` instructions that don't use it,
+    but never as movable, as those commands may still read it from their environment.
+    """
+    nodes = [ir.From('alpine'), ir.Arg('VERSION'), ir.Run('apk add make'), ir.Run('make VERSION=${VERSION}')]
+    assert _codes(nodes) == [(1, advisor.ADVICE_EARLY_ARG, False)]
+
+
+def test_advise_ignores_args_before_first_from():
+    """
+    Assert that :func:`~ydf.advisor.advise` ignores `ARG` instructions before the first `FROM`, as `FROM` uses them.
+    """
+    assert _codes([ir.Arg('VERSION'), ir.From('alpine'), ir.Run('make')]) == []
+
+
+def test_advise_early_volatile_label():
+    """
+    Assert that :func:`~ydf.advisor.advise` reports a `LABEL` with a value that changes on every build before
+    instructions that build layers, but not other labels.
+    """
+    nodes = [ir.From('alpine'), ir.Label([('org.opencontainers.image.revision', 'abc123')]),
+             ir.Label([('team', 'ops')]), ir.Run('make')]
+    assert _codes(nodes) == [(1, advisor.ADVICE_EARLY_VOLATILE_LABEL, True)]
+
+
+def test_reorder_moves_labels_but_not_args():
+    """
+    Assert that :func:`~ydf.advisor.reorder` moves a volatile `LABEL` after the last layer of its stage, but never
+    moves an `ARG` past a `RUN`, as the command sees it as an environment variable, without modifying the given list.
+    """
+    label, arg = ir.Label([('build-date', '2017-01-01')]), ir.Arg('VERSION')
+    nodes = [ir.From('alpine'), label, arg, ir.Run('make'), ir.Run('make $VERSION'), ir.Cmd('app'),
+             ir.From('scratch'), ir.Run('true')]
+    given = list(nodes)
+
+    assert advisor.reorder(nodes) == [ir.From('alpine'), arg, ir.Run('make'), ir.Run('make $VERSION'), label,
+                                      ir.Cmd('app'), ir.From('scratch'), ir.Run('true')]
+    assert nodes == given
+
+
+@pytest.mark.parametrize('nodes', [
+    [ir.From('alpine'), ir.Arg('A'), ir.Run('make'), ir.Env([('A', '1')]), ir.Run('echo $A')],
+    [ir.From('alpine'), ir.Label([('commit', '$SHA')]), ir.Arg('SHA'), ir.Run('make')],
+    [ir.From('alpine'), ir.Arg('A'), ir.Run('make'), ir.Onbuild(ir.Run('x')), ir.Run('echo $A')],
+])
+def test_reorder_keeps_unsafe_moves(nodes):
+    """
+    Assert that :func:`~ydf.advisor.reorder` doesn't move an instruction past one that defines a variable it uses,
+    or past `ONBUILD`.
+    """
+    advice = advisor.advise(nodes)
+    assert advice and not any(a.movable for a in advice)
+    assert advisor.reorder(nodes) == nodes
+
+
+def test_reorder_cache_runs_before_coalesce_run():
+    """
+    Assert that the `reorder-cache` pass runs first, so `RUN` instructions a volatile `LABEL` separated are merged,
+    while those an `ARG` separates are not.
+    """
+    nodes = [ir.From('alpine'), ir.Run('a'), ir.Arg('V'), ir.Run('b'), ir.Run('c $V')]
+    result = passes.apply(nodes, [passes.OPTIMIZATION_REORDER_CACHE, passes.OPTIMIZATION_COALESCE_RUN])
+    assert result == [ir.From('alpine'), ir.Run('a'), ir.Arg('V'), ir.Run(['b', 'c $V'])]
+
+    nodes = [ir.From('alpine'), ir.Label([('created', 'now')]), ir.Run('a'), ir.Run('b')]
+    passes.set_enabled([passes.OPTIMIZATION_COALESCE_RUN, passes.OPTIMIZATION_REORDER_CACHE])
+    try:
+        assert passes.ENABLED == (passes.OPTIMIZATION_REORDER_CACHE, passes.OPTIMIZATION_COALESCE_RUN)
+        assert passes.apply(nodes) == [ir.From('alpine'), ir.Run(['a', 'b']), ir.Label([('created', 'now')])]
+    finally:
+        passes.set_enabled([])
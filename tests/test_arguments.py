@@ -7,9 +7,99 @@
 
 import pytest
 
-from ydf import arguments
+from ydf import arguments, exceptions, instructions
 
 
 @pytest.mark.xfail()
 def test_stub():
     assert False, "TODO: Implement"
+
+
+@pytest.fixture(scope='function')
+def image_dict():
+    """
+    Fixture that yields an instruction function constrained by several argument decorators.
+    """
+    @arguments.required(name='dict', required_type=dict)
+    @arguments.required_dict_key(name='image', required_type=str)
+    @arguments.optional_dict_key(name='tag', required_type=str, mutually_exclusive_with='digest')
+    @instructions.instruction(name='TEST', type=dict, desc='<image>')
+    def image_dict(arg):
+        return arg['image']
+    return image_dict
+
+
+def test_constraints_compile_to_single_validator(image_dict):
+    """
+    Assert that stacked argument decorators wrap the instruction once and check constraints in declaration order.
+    """
+    assert image_dict.__wrapped__ is image_dict.instruction_func
+    assert [c.kind for c in image_dict.constraints] == [arguments.REQUIRED, arguments.DICT_KEY,
+                                                        arguments.OPTIONAL_DICT_KEY]
+    assert image_dict({'image': 'alpine'}) == 'TEST alpine'
+
+
+def test_constraints_compile_once_on_first_call(monkeypatch):
+    """
+    Assert that stacked argument decorators compile the validator once, when the instruction is first called,
+    instead of once per decorator.
+    """
+    compiled = []
+
+    def compile_validator(func, constraints):
+        compiled.append(constraints)
+        return compile_validator.original(func, constraints)
+    compile_validator.original = arguments.compile_validator
+    monkeypatch.setattr(arguments, 'compile_validator', compile_validator)
+
+    @arguments.required(name='dict', required_type=dict)
+    @arguments.required_dict_key(name='image', required_type=str)
+    @arguments.optional_dict_key(name='tag', required_type=str)
+    @instructions.instruction(name='TEST', type=dict, desc='<image>')
+    def image_dict(arg):
+        return arg['image']
+    assert compiled == []
+
+    assert image_dict({'image': 'alpine'}) == 'TEST alpine'
+    assert image_dict.validate({'image': 'scratch'}) == {'image': 'scratch'}
+    assert image_dict({'image': 'scratch'}) == 'TEST scratch'
+    assert compiled == [image_dict.constraints]
+
+
+@pytest.mark.parametrize(('arg', 'error', 'message'), [
+    ({}, exceptions.ArgumentMissingError, '[TEST] - Name: dict - Desc: <image>'),
+    ({'tag': 'latest'}, exceptions.ArgumentMissingError, '[TEST] - Name: image - Desc: <image>'),
+    ({'image': 1}, exceptions.ArgumentTypeError, '[TEST] - Name: image - Expected: str - Received: int'),
+    ({'image': 'alpine', 'tag': 'latest', 'digest': 'sha'}, exceptions.ArgumentDisjointedError,
+     '[TEST] - Name: tag - Other: digest'),
+])
+def test_validator_raises_constraint_errors(image_dict, arg, error, message):
+    """
+    Assert that the compiled validator raises the error of the first constraint that fails.
+    """
+    with pytest.raises(error) as exc_info:
+        image_dict(arg)
+    assert str(exc_info.value) == message
+
+
+def test_regex_match_passes_groups():
+    """
+    Assert that :func:`~ydf.arguments.required_regex_match` converts the match groups and reports the pattern.
+    """
+    @arguments.required_regex_match(name='string', pattern='(?P<name>\\w+)$')
+    @instructions.instruction(name='TEST', type=str, desc='<name>')
+    def name_str(arg):
+        return arg['name']
+
+    assert name_str('alpine') == 'TEST alpine'
+    with pytest.raises(exceptions.ArgumentPatternError) as exc_info:
+        name_str('-')
+    assert str(exc_info.value) == '[TEST] - Name: string - Pattern: (?P<name>\\w+)$'
+
+
+def test_constraint_requires_instruction():
+    """
+    Assert that argument decorators can only be applied to instruction functions.
+    """
+    with pytest.raises(exceptions.ArgumentInstructionConstraintError):
+        arguments.required(name='arg', required_type=str)(lambda arg: arg)
@@ -0,0 +1,90 @@
+"""
+    test_batch
+    ~~~~~~~~~~
+
+    Tests for the :mod:`~ydf.batch` module.
+"""
+
+import os
+
+import pytest
+
+from ydf import batch
+
+
+VALID_YAML = """
+instructions:
+  - from: "alpine"
+  - cmd: "echo Hello World"
+"""
+
+INVALID_YAML = """
+instructions:
+  - from: 42
+"""
+
+
+@pytest.fixture(scope='function')
+def yaml_tree(tmpdir):
+    """
+    Fixture that yields a directory tree containing YAML and non-YAML files.
+    """
+    tmpdir.join('a.yaml').write(VALID_YAML)
+    tmpdir.join('b.txt').write(VALID_YAML)
+    tmpdir.mkdir('sub').join('c.yml').write(VALID_YAML)
+    return tmpdir
+
+
+def test_expand_paths_walks_directories(yaml_tree):
+    """
+    Assert that :func:`~ydf.batch.expand_paths` recursively finds YAML files within directories.
+    """
+    expected = [str(yaml_tree.join('a.yaml')), str(yaml_tree.join('sub', 'c.yml'))]
+    assert batch.expand_paths([str(yaml_tree)]) == expected
+
+
+def test_expand_paths_expands_globs_and_removes_duplicates(yaml_tree):
+    """
+    Assert that :func:`~ydf.batch.expand_paths` expands glob patterns and only yields each path once.
+    """
+    path = str(yaml_tree.join('a.yaml'))
+    assert batch.expand_paths([path, str(yaml_tree.join('*.yaml'))]) == [path]
+
+
+def test_output_path_uses_pattern_and_directory():
+    """
+    Assert that :func:`~ydf.batch.output_path` formats the pattern with parts of the input path.
+    """
+    assert batch.output_path('foo/bar.yaml', '{dirname}/{name}.Dockerfile') == 'foo/bar.Dockerfile'
+    assert batch.output_path('foo/bar.yaml', output_dir='out') == os.path.join('out', 'bar.Dockerfile')
+
+
+def test_render_files_continues_after_failure(tmpdir):
+    """
+    Assert that :func:`~ydf.batch.render_files` reports a failure for a single file and keeps rendering
+    the rest of the batch.
+    """
+    tmpdir.join('bad.yaml').write(INVALID_YAML)
+    tmpdir.join('good.yaml').write(VALID_YAML)
+    paths = [str(tmpdir.join('bad.yaml')), str(tmpdir.join('good.yaml'))]
+
+    results = list(batch.render_files(paths, output_dir=str(tmpdir.join('out'))))
+
+    assert [r.ok for r in results] == [False, True]
+    assert 'FROM alpine' in tmpdir.join('out', 'good.Dockerfile').read()
+
+
+def test_render_files_with_jobs_writes_every_file(tmpdir):
+    """
+    Assert that :func:`~ydf.batch.render_files` renders files using worker processes and yields results
+    in input order.
+    """
+    paths = []
+    for name in ('c', 'a', 'b'):
+        tmpdir.join('{}.yaml'.format(name)).write(VALID_YAML)
+        paths.append(str(tmpdir.join('{}.yaml'.format(name))))
+
+    results = list(batch.render_files(paths, output_dir=str(tmpdir.join('out')), jobs=2))
+
+    assert [r.path for r in results] == paths
+    assert all(r.ok for r in results)
@@ -0,0 +1,96 @@
+"""
+    test_check
+    ~~~~~~~~~~
+
+    Tests for the :mod:`~ydf.check` module.
+"""
+
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from ydf import check, cli
+
+
+VALID_YAML = """
+instructions:
+  - from: "alpine"
+  - run: "make"
+  - onbuild:
+      run: "make"
+"""
+
+INVALID_YAML = """
+instructions:
+  - from: 42
+  - run: "make"
+  - arg: "not valid!"
+  - bogus: "value"
+  - onbuild:
+      from: 42
+"""
+
+
+@pytest.fixture(scope='function')
+def yaml_files(tmpdir):
+    """
+    Fixture that yields the paths of a valid, an invalid and a malformed YAML file.
+    """
+    tmpdir.join('valid.yaml').write(VALID_YAML)
+    tmpdir.join('invalid.yaml').write(INVALID_YAML)
+    tmpdir.join('malformed.yaml').write('instructions: [\n')
+    return [str(tmpdir.join(name)) for name in ('valid.yaml', 'invalid.yaml', 'malformed.yaml')]
+
+
+def test_check_instructions_collects_every_error():
+    """
+    Assert that :func:`~ydf.check.check_instructions` reports every invalid instruction, including those nested
+    in `ONBUILD`, and instruction objects without exactly one key, instead of stopping at the first.
+    """
+    items = [{'from': 42}, {'run': 'make'}, {'arg': 'not valid!'}, {'bogus': 'value'}, {'onbuild': {'from': 42}},
+             {'onbuild': {'bogus': 'value'}}, {}, {'run': 'make', 'user': 'root'}]
+    errors = check.check_instructions(items)
+    assert [(e['index'], e['name'], e['type']) for e in errors] == [
+        (0, 'from', 'ArgumentInstructionUnknownError'),
+        (2, 'arg', 'ArgumentPatternError'),
+        (3, 'bogus', 'ArgumentInstructionUnknownError'),
+        (4, 'onbuild', 'ArgumentInstructionUnknownError'),
+        (5, 'onbuild', 'ArgumentInstructionUnknownError'),
+        (6, None, 'InstructionKeyCountError'),
+        (7, None, 'InstructionKeyCountError'),
+    ]
+    assert errors[2]['message'] == '[bogus] - Name: str'
+    assert errors[6]['message'] == 'Instruction 7 has 2 keys; expected exactly one instruction name'
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_check_files(yaml_files, jobs):
+    """
+    Assert that :func:`~ydf.check.check_files` yields a result for each file in order, including files that
+    fail to load, when checking in the calling process or in worker processes.
+    """
+    results = list(check.check_files(yaml_files, jobs))
+    assert [result.path for result in results] == yaml_files
+    assert [result.ok for result in results] == [True, False, False]
+    assert len(results[1].errors) == 4
+    assert results[2].errors[0]['index'] is None
+
+
+def test_cli_check_writes_report_and_exit_code(yaml_files, tmpdir):
+    """
+    Assert that `ydf --check` writes a JSON report and exits with status 1 only if a file is invalid.
+    """
+    runner = CliRunner()
+    output = str(tmpdir.join('report.json'))
+
+    result = runner.invoke(cli.main, ['--check', yaml_files[0], '-o', output])
+    assert result.exit_code == 0
+    with open(output) as f:
+        assert json.load(f)['failed'] == 0
+
+    result = runner.invoke(cli.main, ['--check', '-o', output] + yaml_files)
+    assert result.exit_code == 1
+    with open(output) as f:
+        report = json.load(f)
+    assert (report['files'], report['failed'], report['errors']) == (3, 2, 5)
@@ -0,0 +1,72 @@
+"""
+    test_cli
+    ~~~~~~~~
+
+    Tests for the :mod:`~ydf.cli` module.
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+
+# Modules that are slow to import and only needed by some commands, so must not be imported by `ydf.cli` itself.
+LAZY_MODULES = ('jinja2', 'ruamel.yaml', 'yaml', 'multiprocessing', 'cProfile', 'pstats', 'socketserver',
+                'ydf.instructions', 'ydf.server', 'ydf.yaml_loaders')
+
+# Budget for the time importing `ydf.cli` takes on top of `click`, as a multiple of the startup time of a bare
+# interpreter so it scales with the speed of the machine. Importing it adds about twice the startup time, and about
+# four times when the lazy modules are imported eagerly.
+IMPORT_TIME_BUDGET = 3.0
+
+
+def _python(*args):
+    # Drop variables pytest-cov uses to start coverage in subprocesses, as it imports modules of its own.
+    env = {k: v for k, v in os.environ.items() if not k.startswith('COV_CORE_')}
+    return subprocess.check_output((sys.executable,) + args, stderr=subprocess.STDOUT, universal_newlines=True,
+                                   env=env)
+
+
+def _min_import_times(codes, runs=5):
+    # Interleave the runs so a slow spell on the machine affects every measurement alike, and keep the fastest.
+    env = {k: v for k, v in os.environ.items() if not k.startswith('COV_CORE_')}
+    times = [[] for _ in codes]
+    for _ in range(runs):
+        for measurements, code in zip(times, codes):
+            start = time.perf_counter()
+            subprocess.check_call((sys.executable, '-c', code), env=env)
+            measurements.append(time.perf_counter() - start)
+    return [min(measurements) for measurements in times]
+
+
+def test_import_cli_does_not_import_lazy_modules():
+    """
+    Assert that importing the command-line interface doesn't import modules only needed to render.
+    """
+    output = _python('-c', 'import sys, ydf.cli; print("\\n".join(sys.modules))')
+    imported = set(output.splitlines())
+    assert [name for name in LAZY_MODULES if name in imported] == []
+
+
+def test_import_yaml_ext_does_not_import_lazy_modules():
+    """
+    Assert that importing :mod:`~ydf.yaml_ext`, which every command uses, doesn't import the YAML libraries until
+    a loader is used.
+    """
+    script = 'import sys, ydf.yaml_ext; {}; print("\\n".join(sys.modules))'
+
+    imported = set(_python('-c', script.format('ydf.yaml_ext.LOADER_NAMES')).splitlines())
+    assert [name for name in LAZY_MODULES if name in imported] == []
+
+    imported = set(_python('-c', script.format('ydf.yaml_ext.OrderedRoundTripLoader("a: 1")')).splitlines())
+    assert {'ruamel.yaml', 'ydf.yaml_loaders'} <= imported
+
+
+def test_import_cli_time_within_budget():
+    """
+    Assert that the time importing the command-line interface adds on top of `click`, which every command needs,
+    stays within :data:`IMPORT_TIME_BUDGET` times the startup time of a bare interpreter.
+    """
+    bare, click, cli = _min_import_times(('pass', 'import click', 'import ydf.cli'))
+    assert cli - click < IMPORT_TIME_BUDGET * bare
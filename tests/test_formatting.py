@@ -5,6 +5,9 @@
     Tests for the :mod:`~ydf.formatting` module.
 """
 
+import collections
+import io
+
 import pytest
 
 from ydf import formatting
@@ -98,3 +101,79 @@ def test_dict_doesnt_line_break_on_single_item(one_item_dict):
     """
     kvp = list(one_item_dict.items())[0]
     assert formatting.dict_with_conditional_line_breaks(one_item_dict) == '{}={}'.format(*kvp)
+
+
+@pytest.mark.parametrize('quote_escape', [True, False])
+def test_list_and_dict_strip_and_quote_escape(quote_escape):
+    """
+    Assert that :func:`~ydf.formatting.list_with_conditional_line_breaks` and
+    :func:`~ydf.formatting.dict_with_conditional_line_breaks` strip each item and optionally double-quote it.
+    """
+    q = '"' if quote_escape else ''
+    expected = '{0}a{0} \\\n  {0}b c{0}'.format(q)
+    assert formatting.list_with_conditional_line_breaks([' a', 'b c '], indent=2, quote_escape=quote_escape) == expected
+
+    expected = '{0}a{0}={0}1{0} \\\n  {0}b{0}={0}{0}'.format(q)
+    pairs = [('a ', ' 1'), ('b', ' ')]
+    assert formatting.pairs_with_conditional_line_breaks(pairs, indent=2, quote_escape=quote_escape) == expected
+
+
+@pytest.mark.parametrize('write, arg, quote_escape, expected', [
+    (formatting.write_list_with_conditional_line_breaks, [], False, ''),
+    (formatting.write_list_with_conditional_line_breaks, [], True, ''),
+    (formatting.write_list_with_conditional_line_breaks, [' a '], False, 'a'),
+    (formatting.write_list_with_conditional_line_breaks, [' a '], True, '"a"'),
+    (formatting.write_list_with_conditional_line_breaks, ['a', 'b c ', ' d'], False,
+     'a \\\n       b c \\\n       d'),
+    (formatting.write_list_with_conditional_line_breaks, ['a', 'b c '], True, '"a" \\\n       "b c"'),
+    (formatting.write_list_with_conditional_command_line_breaks, [], False, ''),
+    (formatting.write_list_with_conditional_command_line_breaks, ['make'], False, 'make'),
+    (formatting.write_list_with_conditional_command_line_breaks, ['make ', 'make install'], False,
+     'make && \\\n       make install'),
+    (formatting.write_dict_with_conditional_line_breaks, {}, True, ''),
+    (formatting.write_dict_with_conditional_line_breaks, {'a ': ' 1'}, False, 'a=1'),
+    (formatting.write_dict_with_conditional_line_breaks, {'a ': ' 1'}, True, '"a"="1"'),
+    (formatting.write_dict_with_conditional_line_breaks, collections.OrderedDict([('a', '1'), ('b', 'x y ')]), False,
+     'a=1 \\\n       b=x y'),
+    (formatting.write_dict_with_conditional_line_breaks, collections.OrderedDict([('a', '1'), ('b', 'x y ')]), True,
+     '"a"="1" \\\n       "b"="x y"'),
+], ids=['list-empty', 'list-empty-quoted', 'list-one', 'list-one-quoted', 'list-many', 'list-many-quoted',
+        'commands-empty', 'commands-one', 'commands-many', 'dict-empty-quoted', 'dict-one', 'dict-one-quoted',
+        'dict-many', 'dict-many-quoted'])
+def test_writers_append_to_buffer(write, arg, quote_escape, expected):
+    """
+    Assert that the `write_*` functions of :mod:`~ydf.formatting` append stripped, optionally quoted items to a
+    buffer that already has content, breaking lines only between two or more items.
+    """
+    buffer = io.StringIO()
+    buffer.write('RUN ')
+    write(buffer, arg, indent=7, quote_escape=quote_escape)
+    assert buffer.getvalue() == 'RUN ' + expected
+
+
+@pytest.mark.parametrize('options, expected', [
+    (None, ''),
+    ({}, ''),
+    ({'Interval': '5m'}, '--interval=5m'),
+])
+def test_str_join_instruction_options(options, expected):
+    """
+    Assert that :func:`~ydf.formatting.str_join_instruction_options` formats an option as a lower case double-dash
+    option, and no options as an empty string.
+    """
+    assert formatting.str_join_instruction_options(options) == expected
+
+
+@pytest.mark.parametrize('pairs, expected', [
+    (None, ''),
+    ([], ''),
+    ((pair for pair in []), ''),
+    ((pair for pair in [('Retries', 3)]), '--retries=3'),
+    ([('Timeout', '1s')], '--timeout=1s'),
+], ids=['none', 'empty-list', 'empty-generator', 'generator', 'list'])
+def test_str_join_instruction_option_pairs(pairs, expected):
+    """
+    Assert that :func:`~ydf.formatting.str_join_instruction_option_pairs` formats pairs from any iterable, including
+    generators, and no pairs as an empty string.
+    """
+    assert formatting.str_join_instruction_option_pairs(pairs) == expected
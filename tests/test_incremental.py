@@ -0,0 +1,108 @@
+"""
+    test_incremental
+    ~~~~~~~~~~~~~~~~
+
+    Tests for the :mod:`~ydf.incremental` module.
+"""
+
+import pytest
+
+from ydf import incremental, yaml_ext
+
+
+VALID_YAML = """
+instructions:
+  - from: "alpine"
+"""
+
+
+@pytest.fixture(scope='function', params=incremental.CHECKS)
+def check(request):
+    """
+    Fixture that yields each method of detecting changed files.
+    """
+    return request.param
+
+
+@pytest.fixture(scope='function')
+def workspace(tmpdir):
+    """
+    Fixture that yields a directory containing a YAML file, a template and a manifest path.
+    """
+    tmpdir.join('a.yaml').write(VALID_YAML)
+    tmpdir.mkdir('templates').join('custom.tpl').write('{% include "base.tpl" %}')
+    tmpdir.join('templates', 'base.tpl').write('{{ instructions|length }}')
+    return tmpdir
+
+
+def _render(workspace, check):
+    return list(incremental.render_files([str(workspace.join('a.yaml'))], 'custom.tpl',
+                                         [str(workspace.join('templates'))],
+                                         output_dir=str(workspace.join('out')),
+                                         manifest=str(workspace.join('manifest.json')), check=check))
+
+
+def test_render_files_skips_unchanged_files(workspace, check):
+    """
+    Assert that :func:`~ydf.incremental.render_files` skips a YAML file that hasn't changed since the last run.
+    """
+    assert [r.skipped for r in _render(workspace, check)] == [False]
+    assert [r.skipped for r in _render(workspace, check)] == [True]
+
+
+def test_render_files_renders_changed_files(workspace, check):
+    """
+    Assert that :func:`~ydf.incremental.render_files` renders a YAML file again once it changes.
+    """
+    _render(workspace, check)
+    workspace.join('a.yaml').write(VALID_YAML + '  - cmd: "echo"\n')
+    assert [r.skipped for r in _render(workspace, check)] == [False]
+
+
+def test_render_files_renders_when_included_template_changes(workspace, check):
+    """
+    Assert that :func:`~ydf.incremental.render_files` renders every YAML file again when a template included
+    by the rendered template changes.
+    """
+    _render(workspace, check)
+    workspace.join('templates', 'base.tpl').write('changed')
+    assert [r.skipped for r in _render(workspace, check)] == [False]
+
+
+def test_render_files_renders_missing_outputs(workspace, check):
+    """
+    Assert that :func:`~ydf.incremental.render_files` renders a YAML file again when its Dockerfile is missing.
+    """
+    results = _render(workspace, check)
+    workspace.join('out', 'a.Dockerfile').remove()
+    assert [r.skipped for r in _render(workspace, check)] == [False]
+    assert results[0].ok
+
+
+def test_render_files_renders_when_included_yaml_changes(workspace, check):
+    """
+    Assert that :func:`~ydf.incremental.render_files` renders a YAML file again when a file it includes with
+    `!include` changes.
+    """
+    workspace.join('base.yaml').write('from: "alpine"\n')
+    workspace.join('a.yaml').write('instructions:\n  - !include base.yaml\n')
+    _render(workspace, check)
+    assert [r.skipped for r in _render(workspace, check)] == [True]
+
+    workspace.join('base.yaml').write('from: "debian:stretch"\n')
+    assert [r.skipped for r in _render(workspace, check)] == [False]
+
+
+def test_render_files_renders_when_yaml_loader_changes(workspace, check):
+    """
+    Assert that :func:`~ydf.incremental.render_files` renders every YAML file again when the YAML loader backend
+    changes, as backends parse some values differently.
+    """
+    loaders = yaml_ext.available_loaders()
+    _render(workspace, check)
+    try:
+        yaml_ext.set_default_loader(loaders[-1] if yaml_ext.loader_name() != loaders[-1] else loaders[0])
+        assert [r.skipped for r in _render(workspace, check)] == [False]
+        assert [r.skipped for r in _render(workspace, check)] == [True]
+    finally:
+        yaml_ext.set_default_loader()
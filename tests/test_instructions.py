@@ -7,9 +7,108 @@
 
 import pytest
 
-from ydf import instructions
+from ydf import exceptions, instructions, meta, yaml_ext
+
+
+ALIASED_YAML = """
+instructions:
+  - &cleanup
+    run:
+      - "apt-get clean"
+      - "rm -rf /var/lib/apt/lists/*"
+  - env: &env
+      LANG: "C.UTF-8"
+  - from: "debian"
+  - *cleanup
+  - env: *env
+  - *cleanup
+"""
+
+
+@pytest.fixture(scope='function')
+def conversions(monkeypatch):
+    """
+    Fixture that yields a list recording the name and argument of every instruction built.
+    """
+    calls = []
+    get_instruction = meta.get_instruction
+
+    def recording_get_instruction(name, arg):
+        calls.append((name, arg))
+        return get_instruction(name, arg)
+
+    monkeypatch.setattr(meta, 'get_instruction', recording_get_instruction)
+    return calls
 
 
 @pytest.mark.xfail()
 def test_stub():
     assert False, "TODO: Implement"
+
+
+def test_convert_instructions_does_not_modify_input():
+    """
+    Assert that :func:`~ydf.instructions.convert_instructions` joins every instruction, each followed by a blank
+    line, and leaves the instruction objects untouched.
+    """
+    items = [dict(onbuild=dict(run='make')), dict(cmd='echo')]
+    expected = 'ONBUILD RUN make\n\nCMD echo\n\n'
+
+    assert instructions.convert_instructions(items) == expected
+    assert instructions.convert_instructions(items) == expected
+    assert items == [dict(onbuild=dict(run='make')), dict(cmd='echo')]
+
+
+def test_convert_instructions_gen_yields_each_instruction():
+    """
+    Assert that :func:`~ydf.instructions.convert_instructions_gen` yields one string per instruction.
+    """
+    items = [dict(workdir='/app'), dict(user='nobody')]
+    assert list(instructions.convert_instructions_gen(items)) == ['WORKDIR /app', 'USER nobody']
+
+
+@pytest.mark.parametrize('loader', yaml_ext.available_loaders())
+def test_convert_instructions_converts_aliased_nodes_once(loader, conversions):
+    """
+    Assert that :func:`~ydf.instructions.convert_instructions_gen` converts instructions and arguments that are
+    YAML aliases of the same node once and reuses the result for each alias.
+    """
+    document = yaml_ext.load(ALIASED_YAML, loader)
+    lines = list(instructions.convert_instructions_gen(document['instructions']))
+
+    assert lines[0] == lines[3] == lines[5]
+    assert lines[1] == lines[4] == 'ENV LANG=C.UTF-8'
+    assert [name for name, _ in conversions] == ['run', 'env', 'from']
+
+
+def test_convert_instructions_memo_is_per_call(conversions):
+    """
+    Assert that :func:`~ydf.instructions.convert_instructions` doesn't reuse results between calls, so a node
+    changed between documents is converted again.
+    """
+    items = [dict(cmd='echo')]
+    assert instructions.convert_instructions(items) == 'CMD echo\n\n'
+    items[0]['cmd'] = 'true'
+    assert instructions.convert_instructions(items) == 'CMD true\n\n'
+    assert len(conversions) == 2
+
+
+@pytest.mark.parametrize('instruction', [
+    {},
+    yaml_ext.load('from: "alpine"\nrun: "make"\n'),
+], ids=['empty', 'two-keys'])
+def test_instruction_without_exactly_one_key_raises(instruction):
+    """
+    Assert that converting or building an instruction object that doesn't have exactly one key raises an
+    :class:`~ydf.exceptions.InstructionKeyCountError` with its position and number of keys.
+    """
+    items = [{'from': 'alpine'}, instruction]
+    for convert in (instructions.convert_instructions, lambda i: list(instructions.build_instructions_gen(i))):
+        with pytest.raises(exceptions.InstructionKeyCountError) as e:
+            convert(items)
+        assert (e.value.index, e.value.count) == (1, len(instruction))
+
+    with pytest.raises(exceptions.InstructionKeyCountError):
+        instructions.convert_instruction(instruction)
+    with pytest.raises(exceptions.InstructionKeyCountError):
+        instructions.build_instruction(instruction)
@@ -0,0 +1,72 @@
+"""
+    test_ir
+    ~~~~~~~
+
+    Tests for the :mod:`~ydf.ir` and :mod:`~ydf.emitter` modules.
+"""
+
+import pytest
+
+from ydf import emitter, instructions, ir
+
+
+NODE_CLASSES = [getattr(ir, name) for name in ir.__all__ if name != 'Instruction']
+
+
+@pytest.mark.parametrize('cls', NODE_CLASSES)
+def test_node_has_no_instance_dict(cls):
+    """
+    Assert that every node class stores its fields in slots, so nodes don't carry a `__dict__`.
+    """
+    node = cls.__new__(cls)
+    assert not hasattr(node, '__dict__')
+
+
+@pytest.mark.parametrize('cls', NODE_CLASSES)
+def test_emitter_handles_every_node_class(cls):
+    """
+    Assert that :mod:`~ydf.emitter` has an emitter for every node class.
+    """
+    assert cls in emitter.EMITTERS
+
+
+def test_nodes_compare_by_type_and_fields():
+    """
+    Assert that nodes are equal when they're the same class with equal fields.
+    """
+    assert ir.Run('make') == ir.Run('make')
+    assert ir.Run('make') != ir.Run('make', exec_form=True)
+    assert ir.Cmd('make') != ir.Entrypoint('make')
+
+
+@pytest.mark.parametrize(('node', 'expected'), [
+    (ir.From('ubuntu', tag='16.04'), 'FROM ubuntu:16.04'),
+    (ir.From('ubuntu', digest='abc'), 'FROM ubuntu@abc'),
+    (ir.Run('make'), 'RUN make'),
+    (ir.Run(['make', 'make install']), 'RUN make && \\\n    make install'),
+    (ir.Run(['/bin/make', 'install'], exec_form=True), 'RUN ["/bin/make", "install"]'),
+    (ir.Expose(8080), 'EXPOSE 8080'),
+    (ir.Arg('VERSION', 1), 'ARG VERSION=1'),
+    (ir.Onbuild(ir.Run('make')), 'ONBUILD RUN make'),
+    (ir.Raw('RUN', 'make'), 'RUN make'),
+])
+def test_emit_node(node, expected):
+    """
+    Assert that :func:`~ydf.emitter.emit` turns nodes into the expected Dockerfile instruction.
+    """
+    assert emitter.emit(node) == expected
+
+
+@pytest.mark.parametrize('instruction', [
+    {'from': 'ubuntu:16.04'},
+    {'run': ['make', 'make install']},
+    {'env': {'LANG': 'C.UTF-8', 'PATH': '/usr/bin'}},
+    {'healthcheck': {'cmd': 'curl localhost', 'options': {'interval': '5s'}}},
+])
+def test_build_then_emit_matches_convert(instruction):
+    """
+    Assert that emitting a built node gives the same text as converting the instruction directly.
+    """
+    node = instructions.build_instruction(instruction)
+    assert isinstance(node, ir.Instruction)
+    assert emitter.emit(node) == instructions.convert_instruction(instruction)
@@ -13,3 +13,32 @@ from ydf import meta
 @pytest.mark.xfail()
 def test_stub():
     assert False, "TODO: Implement"
+
+
+def test_dispatch_table_built_on_import():
+    """
+    Assert that importing :mod:`~ydf.instructions` builds the dispatch table for it.
+    """
+    from ydf import instructions
+    assert meta.DISPATCH_TABLES[instructions.__name__][('from', str)] is instructions.from_str
+
+
+def test_get_instruction_remembers_subclass():
+    """
+    Assert that :func:`~ydf.meta.get_instruction` resolves argument types that subclass a known type and
+    adds them to the dispatch table.
+    """
+    class Arg(str):
+        pass
+
+    from ydf import instructions
+    assert meta.get_instruction('From', Arg('alpine')) is instructions.from_str
+    assert meta.DISPATCH_TABLES[instructions.__name__][('From', Arg)] is instructions.from_str
+
+
+def test_get_instruction_unknown_name_raises_key_error():
+    """
+    Assert that :func:`~ydf.meta.get_instruction` raises a :class:`~KeyError` for unknown instructions.
+    """
+    with pytest.raises(KeyError):
+        meta.get_instruction('unknown', 'value')
@@ -0,0 +1,36 @@
+"""
+    test_parallel
+    ~~~~~~~~~~~~~
+
+    Tests for the :mod:`~ydf.parallel` module.
+"""
+
+import pytest
+
+from ydf import parallel
+
+
+def square(value):
+    return value * value
+
+
+@pytest.mark.parametrize('jobs', [1, 2, 3])
+def test_imap_yields_results_in_input_order(jobs):
+    """
+    Assert that :func:`~ydf.parallel.imap` yields results in input order regardless of the number of jobs.
+    """
+    items = list(range(50))
+    assert list(parallel.imap(square, items, jobs=jobs, chunksize=3)) == [square(i) for i in items]
+
+
+@pytest.mark.parametrize('count, jobs, expected', [
+    (0, 4, 1),
+    (10, 4, 1),
+    (100, 4, 7),
+    (3000, 8, 94)
+])
+def test_default_chunksize(count, jobs, expected):
+    """
+    Assert that :func:`~ydf.parallel.default_chunksize` splits items into a few chunks per worker.
+    """
+    assert parallel.default_chunksize(count, jobs) == expected
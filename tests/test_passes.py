@@ -0,0 +1,133 @@
+"""
+    test_passes
+    ~~~~~~~~~~~
+
+    Tests for the :mod:`~ydf.passes` module.
+"""
+
+import pytest
+
+from ydf import batch, instructions, ir, passes
+
+
+@pytest.fixture(scope='function')
+def coalesce_run():
+    """
+    Fixture that enables the `coalesce-run` pass for the duration of a test.
+    """
+    passes.set_enabled([passes.OPTIMIZATION_COALESCE_RUN])
+    yield
+    passes.set_enabled([])
+
+
+def test_coalesce_run_merges_shell_form_runs():
+    """
+    Assert that :func:`~ydf.passes.coalesce_run` merges consecutive shell form `RUN` instructions, from strings
+    and lists of commands, into one list of commands.
+    """
+    nodes = [ir.Run('apt-get update'), ir.Run(['apt-get install -y curl', 'apt-get clean'])]
+    assert passes.coalesce_run(nodes) == [ir.Run(['apt-get update', 'apt-get install -y curl', 'apt-get clean'])]
+    assert nodes == [ir.Run('apt-get update'), ir.Run(['apt-get install -y curl', 'apt-get clean'])]
+
+
+def test_coalesce_run_moves_past_metadata_instructions():
+    """
+    Assert that :func:`~ydf.passes.coalesce_run` merges `RUN` instructions separated only by metadata instructions,
+    keeping the metadata instructions after the merged `RUN`.
+    """
+    label, expose = ir.Label([('team', 'ops')]), ir.Expose(8080)
+    nodes = [ir.Run('make'), label, expose, ir.Run('make install')]
+    assert passes.coalesce_run(nodes) == [ir.Run(['make', 'make install']), label, expose]
+
+
+@pytest.mark.parametrize('barrier', [
+    ir.User('nobody'),
+    ir.Workdir('/app'),
+    ir.Env([('PATH', '/opt/bin')]),
+    ir.Arg('VERSION'),
+    ir.Shell(['/bin/bash', '-c']),
+    ir.Copy('. /app'),
+    ir.Run(['/bin/echo', 'hi'], exec_form=True),
+    ir.Run('cat <<EOF\nhello\nEOF'),
+    ir.Raw('CUSTOM', 'value'),
+])
+def test_coalesce_run_respects_barriers(barrier):
+    """
+    Assert that :func:`~ydf.passes.coalesce_run` doesn't merge `RUN` instructions across instructions that change
+    what a following command sees, or that can't be joined with `&&`.
+    """
+    nodes = [ir.Run('a'), barrier, ir.Run('b')]
+    result = passes.coalesce_run(nodes)
+    assert all(a is b for a, b in zip(result, nodes)) and len(result) == len(nodes)
+
+
+@pytest.mark.parametrize('command', [
+    'make # build everything',
+    ['make', 'echo done #'],
+    'sleep 60 &',
+    'make;',
+    'make install \\',
+    'cat /etc/hosts |',
+    'make ||',
+])
+def test_coalesce_run_skips_unfinished_commands(command):
+    """
+    Assert that :func:`~ydf.passes.coalesce_run` doesn't merge `RUN` instructions with a command that has an
+    unquoted comment or ends with an operator or line continuation, as `&&` can't safely follow it.
+    """
+    nodes = [ir.Run('a'), ir.Run(command), ir.Run('b')]
+    result = passes.coalesce_run(nodes)
+    assert all(a is b for a, b in zip(result, nodes)) and len(result) == len(nodes)
+
+
+@pytest.mark.parametrize('command', [
+    'echo "#1"',
+    "echo 'a # b'",
+    'echo \\#',
+    'echo "a;"',
+])
+def test_coalesce_run_merges_quoted_characters(command):
+    """
+    Assert that :func:`~ydf.passes.coalesce_run` merges commands whose `#` or trailing operator is quoted or
+    escaped.
+    """
+    assert passes.coalesce_run([ir.Run('a'), ir.Run(command)]) == [ir.Run(['a', command])]
+
+
+def test_apply_counts_removed_instructions():
+    """
+    Assert that :func:`~ydf.passes.apply` adds the number of instructions removed to :func:`~ydf.passes.removed`.
+    """
+    before = passes.removed()
+    nodes = [ir.Run('a'), ir.Run('b'), ir.User('nobody'), ir.Run('c'), ir.Run('d'), ir.Run('e')]
+    assert len(passes.apply(nodes, [passes.OPTIMIZATION_COALESCE_RUN])) == 3
+    assert passes.removed() - before == 3
+
+
+def test_set_enabled_rejects_unknown_pass():
+    """
+    Assert that :func:`~ydf.passes.set_enabled` raises a :class:`~ValueError` for an unknown pass name.
+    """
+    with pytest.raises(ValueError):
+        passes.set_enabled(['unknown'])
+
+
+def test_convert_instructions_applies_enabled_passes(coalesce_run):
+    """
+    Assert that :func:`~ydf.instructions.convert_instructions` applies enabled passes before formatting.
+    """
+    items = [dict(run='make'), dict(run='make install')]
+    assert instructions.convert_instructions(items) == 'RUN make && \\\n    make install\n\n'
+
+
+def test_render_files_reports_removed_layers(tmpdir, coalesce_run):
+    """
+    Assert that :func:`~ydf.batch.render_files` reports the layers removed from each file, including when
+    files are rendered by worker processes.
+    """
+    path = tmpdir.join('a.yaml')
+    path.write('instructions:\n  - from: "alpine"\n  - run: "a"\n  - run: "b"\n  - run: "c"\n')
+
+    for jobs in (1, 2):
+        results = list(batch.render_files([str(path), str(path)], output_dir=str(tmpdir.join('out')), jobs=jobs))
+        assert [result.removed for result in results] == [2, 2]
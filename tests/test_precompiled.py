@@ -0,0 +1,106 @@
+"""
+    test_precompiled
+    ~~~~~~~~~~~~~~~~
+
+    Tests for the :mod:`~ydf.precompiled` module.
+"""
+
+import json
+import zipfile
+
+import pytest
+from click.testing import CliRunner
+
+from ydf import cli, precompiled, templating, yaml_ext
+
+
+YAML_VARS = {'meta': {'name': '<app>'}, 'instructions': [{'from': 'alpine'}, {'run': 'make && make install'}]}
+
+
+@pytest.fixture(scope='function')
+def templates(tmpdir):
+    """
+    Fixture that yields a directory of templates that extend and include each other, and an archive path.
+    """
+    tmpdir.mkdir('templates').join('custom.tpl').write(
+        '{% extends "base.tpl" %}{% block body %}{% include "meta.tpl" %}'
+        '{{ convert_instructions(instructions) }}{% endblock %}')
+    tmpdir.join('templates', 'base.tpl').write('# ydf {{ ydf.version }}\n{% block body %}{% endblock %}\n')
+    tmpdir.join('templates', 'meta.tpl').write('# {{ meta.name }}\n')
+    return str(tmpdir.join('templates')), str(tmpdir.join('templates.zip'))
+
+
+def _render(path, archive, autoescape=True):
+    return templating.render(YAML_VARS, 'custom.tpl', [path], autoescape, template_archive=archive)
+
+
+@pytest.mark.parametrize('autoescape', [True, False])
+def test_archive_renders_same_output(templates, autoescape):
+    """
+    Assert that templates loaded from an archive render the same output as templates compiled from source, for
+    both `autoescape` settings.
+    """
+    path, archive = templates
+    assert templating.compile_templates(archive, [path]) == (['base.tpl', 'custom.tpl', 'meta.tpl'], {})
+
+    template = templating.load_template('custom.tpl', [path], autoescape, template_archive=archive)
+    assert template.filename.startswith(archive)
+    assert _render(path, archive, autoescape) == _render(path, None, autoescape)
+
+
+def test_archive_falls_back_to_changed_source(templates, tmpdir):
+    """
+    Assert that a template changed after it was compiled is compiled from source, while unchanged templates
+    are still loaded from the archive.
+    """
+    path, archive = templates
+    templating.compile_templates(archive, [path])
+    tmpdir.join('templates', 'meta.tpl').write('# changed {{ meta.name }}\n')
+
+    loader = templating._environ([path], template_archive=archive).loader
+    assert [loader.is_current(name) for name in ('base.tpl', 'meta.tpl')] == [True, False]
+    assert '# changed &lt;app&gt;' in _render(path, archive)
+
+
+@pytest.mark.parametrize('content', [b'not a zip', None])
+def test_archive_falls_back_when_unusable(templates, content):
+    """
+    Assert that templates are compiled from source when the archive is corrupt or was compiled by another
+    version.
+    """
+    path, archive = templates
+    if content is None:
+        with zipfile.ZipFile(archive, 'w') as f:
+            f.writestr(precompiled.MANIFEST_NAME, json.dumps(dict(format=precompiled.ARCHIVE_FORMAT, version={})))
+    else:
+        with open(archive, 'wb') as f:
+            f.write(content)
+
+    template = templating.load_template('custom.tpl', [path], template_archive=archive)
+    assert not template.filename.startswith(archive)
+    assert _render(path, archive) == _render(path, None)
+
+
+def test_cli_compile_templates(templates, tmpdir):
+    """
+    Assert that `ydf compile-templates` writes an archive that `ydf` renders with, and exits with status 1 if a
+    template fails to compile.
+    """
+    path, archive = templates
+    tmpdir.join('a.yaml').write('meta:\n  name: "app"\ninstructions:\n  - from: "alpine"\n')
+    output = str(tmpdir.join('Dockerfile'))
+    runner = CliRunner()
+
+    result = runner.invoke(cli.main, ['compile-templates', '-s', path, '-o', archive])
+    assert result.exit_code == 0
+    assert 'custom.tpl' in zipfile.ZipFile(archive).read(precompiled.MANIFEST_NAME).decode('utf-8')
+
+    result = runner.invoke(cli.main, [str(tmpdir.join('a.yaml')), '-s', path, '-t', 'custom.tpl', '-o', output,
+                                      '--template-archive', archive])
+    assert result.exit_code == 0
+    assert tmpdir.join('Dockerfile').read() == templating.render(yaml_ext.load_file(str(tmpdir.join('a.yaml'))),
+                                                                 'custom.tpl', [path])
+
+    tmpdir.join('templates', 'broken.tpl').write('{% if %}')
+    result = runner.invoke(cli.main, ['compile-templates', '-s', path, '-o', archive])
+    assert result.exit_code == 1
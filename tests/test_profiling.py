@@ -0,0 +1,83 @@
+"""
+    test_profiling
+    ~~~~~~~~~~~~~~
+
+    Tests for the :mod:`~ydf.profiling` module.
+"""
+
+import types
+
+import pytest
+
+from ydf import batch, profiling
+
+
+@pytest.fixture(scope='function')
+def profiler():
+    """
+    Fixture that yields a started :class:`~ydf.profiling.Profiler` and stops it afterwards.
+    """
+    yield profiling.start(function_profile=True)
+    profiling.stop()
+
+
+def test_stage_is_shared_no_op_when_not_started():
+    """
+    Assert that :func:`~ydf.profiling.stage` returns the shared no-op context manager when profiling is off.
+    """
+    assert not profiling.enabled()
+    assert profiling.stage(profiling.STAGE_LOAD) is profiling.NULL_STAGE
+
+
+def test_stages_are_recorded_per_file(profiler, tmpdir):
+    """
+    Assert that rendering a batch records each stage both overall and for each YAML file.
+    """
+    for name in ('a', 'b'):
+        tmpdir.join('{}.yaml'.format(name)).write('instructions:\n  - from: "alpine"\n  - cmd: "echo"\n')
+
+    results = list(batch.render_files([str(tmpdir.join('a.yaml')), str(tmpdir.join('b.yaml'))],
+                                      output_dir=str(tmpdir.join('out'))))
+    assert all(r.ok for r in results)
+
+    assert profiler.stages[profiling.STAGE_FILE].calls == 2
+    assert profiler.stages[profiling.STAGE_DISPATCH].calls == 4
+    stages = profiler.files[str(tmpdir.join('a.yaml'))]
+    assert set(stages) >= {profiling.STAGE_FILE, profiling.STAGE_LOAD, profiling.STAGE_RENDER,
+                           profiling.STAGE_VALIDATE, profiling.STAGE_FORMAT, profiling.STAGE_WRITE}
+    assert stages[profiling.STAGE_FILE].wall >= stages[profiling.STAGE_LOAD].wall
+
+
+def test_dump_collapsed_writes_stacks(profiler, tmpdir):
+    """
+    Assert that :meth:`~ydf.profiling.Profiler.dump_collapsed` writes one `stack count` line per call stack.
+    """
+    sorted(range(1000), key=str)
+    profiler.disable()
+
+    path = tmpdir.join('profile.folded')
+    profiler.dump_collapsed(str(path))
+
+    lines = path.read().splitlines()
+    assert lines
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+    assert any(';' in line for line in lines)
+
+
+def test_collapsed_stacks_is_linear_in_call_pairs():
+    """
+    Assert that :func:`~ydf.profiling.collapsed_stacks` yields one stack per caller and callee pair, keeping the
+    total time, when every function of a layer is called by every function of the layer above.
+    """
+    layers, width = 30, 4
+    entries = {}
+    for layer in range(layers):
+        for n in range(width):
+            callers = {('f.py', layer - 1, str(c)): (1, 1, 0.001, 0.001) for c in range(width)} if layer else {}
+            entries[('f.py', layer, str(n))] = (1, 1, 0.001, 0.001, callers)
+
+    stacks = list(profiling.collapsed_stacks(types.SimpleNamespace(stats=entries)))
+    assert len(stacks) == width + (layers - 1) * width * width
+    assert sum(microseconds for _, microseconds in stacks) == layers * width * 1000
+    assert max(len(stack) for stack, _ in stacks) == layers
+    assert all(stack[0].startswith('f.py:0:') for stack, _ in stacks)
@@ -0,0 +1,116 @@
+"""
+    test_server
+    ~~~~~~~~~~~
+
+    Tests for the :mod:`~ydf.server` and :mod:`~ydf.client` modules.
+"""
+
+import concurrent.futures
+import io
+import socket
+
+import pytest
+
+from ydf import client, exceptions, server
+
+
+VALID_YAML = """
+instructions:
+  - from: "alpine"
+  - cmd: "echo {}"
+"""
+
+
+@pytest.fixture(scope='function')
+def socket_path(tmpdir):
+    """
+    Fixture that yields the socket path of a daemon running in a background thread.
+    """
+    path = str(tmpdir.join('ydf.sock'))
+    srv = server.serve_in_thread(path, autoescape=False)
+    yield path
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_render_yaml_and_file(socket_path, tmpdir):
+    """
+    Assert that the daemon renders YAML text and YAML files over a single connection.
+    """
+    tmpdir.join('a.yaml').write(VALID_YAML.format('file'))
+
+    with client.Client(socket_path) as c:
+        assert c.ping()['ok']
+        assert c.render(yaml=VALID_YAML.format('text')).endswith('FROM alpine\n\nCMD echo text\n\n')
+        assert c.render(file=str(tmpdir.join('a.yaml'))).endswith('CMD echo file\n\n')
+
+
+def test_render_error_is_structured(socket_path):
+    """
+    Assert that a failure to render is returned as an error with the exception type and message.
+    """
+    with client.Client(socket_path) as c:
+        with pytest.raises(exceptions.RenderError) as exc_info:
+            c.render(yaml='instructions:\n  - stopsignal: 100\n')
+        assert exc_info.value.error_type == 'ArgumentNumericBoundsError'
+
+        response = c.request(dict(op='unknown'))
+        assert not response['ok'] and response['error']['type'] == 'ProtocolError'
+
+
+def test_concurrent_requests(socket_path):
+    """
+    Assert that the daemon handles requests from many connections at the same time.
+    """
+    def render(index):
+        with client.Client(socket_path) as c:
+            return c.render(yaml=VALID_YAML.format(index))
+
+    with concurrent.futures.ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(render, range(32)))
+
+    assert all(r.endswith('CMD echo {}\n\n'.format(i)) for i, r in enumerate(results))
+
+
+def test_existing_daemon_is_not_replaced(socket_path):
+    """
+    Assert that starting a daemon on the socket of a running daemon fails instead of stealing it.
+    """
+    with pytest.raises(OSError):
+        server.RenderServer(socket_path)
+
+
+def test_stale_socket_is_replaced(tmpdir):
+    """
+    Assert that starting a daemon removes a socket file left behind by a daemon that is no longer running.
+    """
+    path = str(tmpdir.join('ydf.sock'))
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(path)
+    stale.close()
+
+    srv = server.RenderServer(path)
+    srv.server_close()
+
+
+def test_path_that_is_not_a_socket_is_kept(tmpdir):
+    """
+    Assert that starting a daemon on a path that isn't a socket fails instead of removing the file.
+    """
+    path = tmpdir.join('ydf.sock')
+    path.write('keep me')
+
+    with pytest.raises(OSError):
+        server.RenderServer(str(path))
+    assert path.read() == 'keep me'
+
+
+def test_read_message_rejects_malformed_message():
+    """
+    Assert that :func:`~ydf.client.read_message` raises a protocol error for truncated or invalid messages.
+    """
+    with pytest.raises(exceptions.ProtocolError):
+        client.read_message(io.BytesIO(client.HEADER.pack(10) + b'{}'))
+    with pytest.raises(exceptions.ProtocolError):
+        client.read_message(io.BytesIO(client.HEADER.pack(2) + b'[]'))
+    assert client.read_message(io.BytesIO(b'')) is None
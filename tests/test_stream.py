@@ -0,0 +1,68 @@
+"""
+    test_stream
+    ~~~~~~~~~~~
+
+    Tests for the :mod:`~ydf.stream` module.
+"""
+
+import io
+
+import pytest
+
+from ydf import stream
+
+
+MULTI_DOCUMENT_YAML = """
+meta:
+  name: first
+instructions:
+  - from: "alpine"
+---
+instructions:
+  - from: 42
+---
+meta:
+  name: third
+instructions:
+  - cmd: "echo"
+"""
+
+
+def test_render_stream_writes_document_per_key(tmpdir):
+    """
+    Assert that :func:`~ydf.stream.render_stream` writes each document to an output named by its meta key,
+    falling back to its index, and keeps going after a document fails to render.
+    """
+    results = list(stream.render_stream(io.StringIO(MULTI_DOCUMENT_YAML), output_dir=str(tmpdir)))
+
+    assert [r.ok for r in results] == [True, False, True]
+    assert sorted(f.basename for f in tmpdir.listdir()) == ['first.Dockerfile', 'third.Dockerfile']
+
+
+def test_render_stream_writes_before_parsing_next_document(tmpdir):
+    """
+    Assert that :func:`~ydf.stream.render_stream` writes a document before the next document is parsed.
+    """
+    text = 'instructions: [{from: "alpine"}]\n---\ninstructions: [\n'
+    results = stream.render_stream(io.StringIO(text), output_dir=str(tmpdir))
+
+    assert next(results).ok
+    assert tmpdir.join('0.Dockerfile').check()
+    assert not next(results).ok
+
+
+@pytest.mark.parametrize('text, output_pattern', [
+    ('- from: "alpine"\n', stream.DEFAULT_OUTPUT_PATTERN),
+    ('meta: "first"\ninstructions: [{from: "alpine"}]\n', stream.DEFAULT_OUTPUT_PATTERN),
+    ('instructions: [{from: "alpine"}]\n', '{name}.Dockerfile'),
+], ids=['list', 'meta-string', 'unknown-field'])
+def test_render_stream_fails_document_it_cannot_name(tmpdir, text, output_pattern):
+    """
+    Assert that :func:`~ydf.stream.render_stream` yields a failed result, and keeps going, for a document that
+    can't be named because it isn't a mapping or the output pattern has an unknown field.
+    """
+    text += '---\ninstructions: [{from: "alpine"}]\n'
+    results = list(stream.render_stream(io.StringIO(text), output_dir=str(tmpdir), output_pattern=output_pattern))
+
+    assert [r.ok for r in results] == [False, output_pattern == stream.DEFAULT_OUTPUT_PATTERN]
+    assert results[0].output is None and results[0].error
@@ -0,0 +1,145 @@
+"""
+    test_streaming
+    ~~~~~~~~~~~~~~
+
+    Tests for the :mod:`~ydf.streaming` module.
+"""
+
+import io
+import tracemalloc
+
+import pytest
+
+from click.testing import CliRunner
+
+from ydf import cli, passes, streaming, templating, yaml_ext
+
+
+DOCUMENTS = [
+    """
+meta:
+  name: example
+instructions:
+  - from: "alpine"
+  - run: &commands ["make", "make install"]
+  - run: *commands
+  - label:
+      html: "<b>"
+""",
+    """
+instructions:
+  - from: "alpine"
+  - env:
+      LANG: "C.UTF-8"
+meta:
+  description: "meta after instructions"
+""",
+    """
+base: &base
+  run: "make"
+instructions:
+  - *base
+  - from: "alpine"
+""",
+    'meta:\n  name: "no instructions"\n',
+    'instructions: []\n',
+    '',
+]
+
+DOCUMENT_IDS = ['meta-first', 'meta-last', 'alias', 'no-instructions', 'empty-instructions', 'empty']
+
+RUAMEL_LOADERS = [name for name in yaml_ext.available_loaders() if name != yaml_ext.LOADER_PYYAML]
+
+
+@pytest.mark.parametrize('loader', RUAMEL_LOADERS)
+@pytest.mark.parametrize('autoescape', [True, False])
+@pytest.mark.parametrize('document', DOCUMENTS, ids=DOCUMENT_IDS)
+def test_render_matches_template(document, autoescape, loader):
+    """
+    Assert that :func:`~ydf.streaming.render` writes the same output as rendering the loaded document with the
+    default template.
+    """
+    output = io.StringIO()
+    streaming.render(document, output, autoescape=autoescape, loader=loader)
+    assert output.getvalue() == templating.render(yaml_ext.load(document, loader), autoescape=autoescape)
+
+
+def test_iter_document_yields_instructions_one_at_a_time():
+    """
+    Assert that :func:`~ydf.streaming.iter_document` yields top level entries and each item of `instructions`.
+    """
+    assert list(streaming.iter_document(DOCUMENTS[1])) == [
+        (None, {'from': 'alpine'}),
+        (None, {'env': {'LANG': 'C.UTF-8'}}),
+        ('meta', {'description': 'meta after instructions'}),
+    ]
+
+
+@pytest.mark.parametrize('document', ['ydf:\n  version: "0"\ninstructions:\n  - from: "alpine"\n',
+                                      'instructions:\n  - from: "alpine"\nydf: {}\n'], ids=['first', 'last'])
+def test_render_rejects_ydf_variable_like_template(document):
+    """
+    Assert that :func:`~ydf.streaming.render` raises a :class:`~TypeError`, as rendering the loaded document does,
+    when the document has a top level `ydf` key instead of letting it override the variables of ydf.
+    """
+    with pytest.raises(TypeError):
+        templating.render(yaml_ext.load(document))
+    with pytest.raises(TypeError):
+        streaming.render(document, io.StringIO())
+
+
+def test_render_memory_does_not_grow_with_instructions(tmpdir):
+    """
+    Assert that the peak memory of :func:`~ydf.streaming.render` doesn't grow with the number of instructions.
+    """
+    def peak(count):
+        path = tmpdir.join('{}.yaml'.format(count))
+        path.write('meta:\n  name: "huge"\ninstructions:\n' +
+                   ''.join('  - run: "echo {}"\n'.format(i) for i in range(count)))
+        with io.open(str(path)) as stream, io.open(str(tmpdir.join('Dockerfile')), 'w') as output:
+            tracemalloc.start()
+            try:
+                streaming.render(stream, output)
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+    peak(10)
+    assert peak(8000) < peak(2000) * 1.5
+
+
+def test_render_requires_default_template(tmpdir):
+    """
+    Assert that :func:`~ydf.streaming.render` raises a :class:`~ValueError` for templates other than the default.
+    """
+    tmpdir.join('other.tpl').write('{{ instructions }}')
+    with pytest.raises(ValueError):
+        streaming.render(DOCUMENTS[0], io.StringIO(), 'other.tpl', str(tmpdir))
+
+
+def test_render_rejects_passes():
+    """
+    Assert that :func:`~ydf.streaming.render` raises a :class:`~ValueError` when passes are enabled.
+    """
+    passes.set_enabled([passes.OPTIMIZATION_COALESCE_RUN])
+    try:
+        with pytest.raises(ValueError):
+            streaming.render(DOCUMENTS[0], io.StringIO())
+    finally:
+        passes.set_enabled([])
+
+
+def test_cli_stream(tmpdir):
+    """
+    Assert that `ydf --stream` renders a single YAML file the same as without it, and rejects multiple files.
+    """
+    tmpdir.join('a.yaml').write(DOCUMENTS[0])
+    yaml_path, streamed, rendered = (str(tmpdir.join(name)) for name in ('a.yaml', 'streamed', 'rendered'))
+    runner = CliRunner()
+
+    assert runner.invoke(cli.main, [yaml_path, '--stream', '-o', streamed]).exit_code == 0
+    assert runner.invoke(cli.main, [yaml_path, '-o', rendered]).exit_code == 0
+    assert tmpdir.join('streamed').read() == tmpdir.join('rendered').read()
+
+    result = runner.invoke(cli.main, [yaml_path, yaml_path, '--stream', '-d', str(tmpdir)])
+    assert result.exit_code == 2
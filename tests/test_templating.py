@@ -5,11 +5,176 @@
     Tests for the :mod:`~ydf.templating` module.
 """
 
+import io
+import os
+
 import pytest
 
-from ydf import templating
+from ydf import native, templating, yaml_ext
+
+
+GOLDEN_YAML = [
+    '''
+meta:
+  owner: "Jane <jane@example.com>"
+  description: "Quotes ' and \\" & ampersands"
+  version: 2
+  enabled: true
+  notes: ~
+instructions:
+  - from: "debian:buster"
+  - arg: "VERSION=1"
+  - env:
+      PATH: "/usr/local/bin:$PATH"
+      QUOTED: "a \\"b\\" <c>"
+  - label:
+      maintainer: "jane & john"
+  - run:
+      - "apt-get update"
+      - "apt-get install -y curl && rm -rf /var/lib/apt/lists/*"
+  - copy: ". /app"
+  - add:
+      - "a.tar.gz"
+      - "/opt/"
+  - workdir: "/app"
+  - user: "nobody"
+  - volume:
+      - "/data"
+  - expose: 8080
+  - stopsignal: 9
+  - healthcheck:
+      cmd: "curl -f http://localhost/ || exit 1"
+  - entrypoint:
+      - "/bin/sh"
+      - "-c"
+  - cmd: "echo '<done>'"
+''',
+    '''
+instructions:
+  - from: "alpine"
+''',
+    '''
+meta:
+  owner: "nobody"
+''',
+    '''
+meta: {}
+instructions: []
+''',
+    '''
+other: "value"
+''',
+]
 
 
 @pytest.mark.xfail()
 def test_stub():
     assert False, "TODO: Implement"
+
+
+def test_environ_is_cached_by_path_and_options():
+    """
+    Assert that :func:`~ydf.templating._environ` returns the same environment for the same search path and
+    options and a different one when options change.
+    """
+    env = templating._environ(templating.DEFAULT_TEMPLATE_PATH)
+    assert templating._environ([templating.DEFAULT_TEMPLATE_PATH]) is env
+    assert templating._environ(templating.DEFAULT_TEMPLATE_PATH, autoescape=False) is not env
+    assert templating._environ(templating.DEFAULT_TEMPLATE_PATH, cached=False) is not env
+
+
+def test_render_plain_text_does_not_escape():
+    """
+    Assert that :func:`~ydf.templating.render` doesn't HTML escape instructions when autoescape is disabled.
+    """
+    yaml_vars = dict(instructions=[dict(label=dict(foo='bar'))])
+    assert 'LABEL "foo"="bar"' in templating.render(yaml_vars, autoescape=False)
+
+
+def test_render_with_bytecode_cache_writes_cache(tmpdir):
+    """
+    Assert that :func:`~ydf.templating.render` stores compiled templates in the bytecode cache directory.
+    """
+    templating.render(dict(instructions=[dict(cmd='echo')]), bytecode_cache=str(tmpdir), native=False)
+    assert tmpdir.listdir()
+
+
+def test_template_dependencies_follows_includes(tmpdir):
+    """
+    Assert that :func:`~ydf.templating.template_dependencies` finds templates referenced by `include`.
+    """
+    tmpdir.join('custom.tpl').write('{% include "base.tpl" %}')
+    tmpdir.join('base.tpl').write('{{ instructions|length }}')
+    files = templating.template_dependencies('custom.tpl', [str(tmpdir)])
+    assert files == [str(tmpdir.join('custom.tpl')), str(tmpdir.join('base.tpl'))]
+
+
+@pytest.mark.parametrize('autoescape', [True, False])
+def test_default_template_matches_per_instruction_loop(autoescape):
+    """
+    Assert that the default template renders the same output as converting each instruction in a template loop.
+    """
+    template = templating._environ(autoescape=autoescape).from_string(
+        '{% for instruction in instructions %}{{ convert_instruction(instruction) }}\n\n{% endfor %}')
+    yaml_vars = dict(instructions=[dict(label=dict(foo='bar')), dict(run=['make', 'make install'])])
+
+    rendered = templating.render(yaml_vars, autoescape=autoescape)
+    assert rendered.endswith('# ---\n\n' + template.render(yaml_vars))
+    assert templating.render(yaml_vars, autoescape=autoescape) == rendered
+
+
+def test_load_template_default_is_native():
+    """
+    Assert that :func:`~ydf.templating.load_template` returns a native template for the built-in default template
+    and a Jinja2 template otherwise.
+    """
+    assert isinstance(templating.load_template(), native.DefaultTemplate)
+    assert not isinstance(templating.load_template(native=False), native.DefaultTemplate)
+
+
+def test_load_template_overridden_default_is_not_native(tmpdir):
+    """
+    Assert that :func:`~ydf.templating.load_template` uses Jinja2 when a search path earlier than the built-in
+    templates contains its own `default.tpl`.
+    """
+    tmpdir.join(templating.DEFAULT_TEMPLATE_NAME).write('custom')
+    template = templating.load_template(path=[str(tmpdir), templating.DEFAULT_TEMPLATE_PATH])
+    assert not isinstance(template, native.DefaultTemplate)
+    assert templating.render_template(template, {}) == 'custom'
+
+
+@pytest.mark.parametrize('autoescape', [True, False])
+@pytest.mark.parametrize('text', GOLDEN_YAML)
+def test_native_default_template_is_byte_identical(text, autoescape):
+    """
+    Assert that the native default template renders byte-identical output to the Jinja2 default template.
+    """
+    yaml_vars = yaml_ext.load(text)
+    expected = templating.render(yaml_vars, autoescape=autoescape, native=False)
+    assert templating.render(yaml_vars, autoescape=autoescape) == expected
+
+
+@pytest.mark.parametrize('autoescape', [True, False])
+def test_native_default_template_matches_examples(autoescape):
+    """
+    Assert that the native default template renders each example the same as the Jinja2 default template.
+    """
+    examples = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'examples')
+    for root, _, names in os.walk(examples):
+        for name in names:
+            if name.endswith('.yaml'):
+                with io.open(os.path.join(root, name)) as f:
+                    yaml_vars = yaml_ext.load(f.read())
+                expected = templating.render(yaml_vars, autoescape=autoescape, native=False)
+                assert templating.render(yaml_vars, autoescape=autoescape) == expected
+
+
+@pytest.mark.parametrize('yaml_vars', [dict(meta=None), dict(meta={1: 'one'})])
+def test_native_default_template_falls_back_for_unsupported_variables(yaml_vars):
+    """
+    Assert that the native default template raises the same error as Jinja2 for variables it doesn't support.
+    """
+    with pytest.raises(Exception) as expected:
+        templating.render(yaml_vars, native=False)
+    with pytest.raises(type(expected.value)):
+        templating.render(yaml_vars)
@@ -0,0 +1,121 @@
+"""
+    test_watch
+    ~~~~~~~~~~
+
+    Tests for the :mod:`~ydf.watch` module.
+"""
+
+import pytest
+
+from ydf import watch
+
+
+VALID_YAML = """
+instructions:
+  - from: "alpine"
+"""
+
+
+@pytest.fixture(scope='function')
+def watcher(tmpdir):
+    """
+    Fixture that yields a started :class:`~ydf.watch.Watcher` for a directory of YAML files.
+    """
+    tmpdir.mkdir('yaml')
+    for name in ('a', 'b'):
+        tmpdir.join('yaml', '{}.yaml'.format(name)).write(VALID_YAML)
+    tmpdir.mkdir('templates').join('custom.tpl').write('{% include "base.tpl" %}')
+    tmpdir.join('templates', 'base.tpl').write('{{ instructions|length }}')
+
+    w = watch.Watcher([str(tmpdir.join('yaml'))], 'custom.tpl', [str(tmpdir.join('templates'))],
+                      output_dir=str(tmpdir.join('out')))
+    w.start()
+    return w
+
+
+def _rendered(results):
+    return sorted(r.path.split('/')[-1] for r in results if r.ok)
+
+
+def test_poll_without_changes_renders_nothing(watcher):
+    """
+    Assert that :meth:`~ydf.watch.Watcher.poll` doesn't render anything when no files changed.
+    """
+    assert watcher.poll() == []
+
+
+def test_poll_renders_only_changed_yaml(watcher, tmpdir):
+    """
+    Assert that :meth:`~ydf.watch.Watcher.poll` only renders the YAML file that changed.
+    """
+    tmpdir.join('yaml', 'a.yaml').write(VALID_YAML + '  - cmd: "echo"\n')
+    assert _rendered(watcher.poll()) == ['a.yaml']
+    assert tmpdir.join('out', 'a.Dockerfile').read() == '2'
+
+
+def test_poll_renders_dependents_of_included_template(watcher, tmpdir):
+    """
+    Assert that :meth:`~ydf.watch.Watcher.poll` renders every YAML file when a template they include changes.
+    """
+    tmpdir.join('templates', 'base.tpl').write('changed')
+    assert _rendered(watcher.poll()) == ['a.yaml', 'b.yaml']
+
+
+def test_poll_renders_new_yaml(watcher, tmpdir):
+    """
+    Assert that :meth:`~ydf.watch.Watcher.poll` renders YAML files added to a watched directory.
+    """
+    tmpdir.join('yaml', 'c.yaml').write(VALID_YAML)
+    assert _rendered(watcher.poll()) == ['c.yaml']
+
+
+def test_dependency_graph_affected():
+    """
+    Assert that :meth:`~ydf.watch.DependencyGraph.affected` returns inputs that depend on the changed files.
+    """
+    graph = watch.DependencyGraph()
+    graph.set('a.yaml', ['a.yaml', 'base.tpl'])
+    graph.set('b.yaml', ['b.yaml', 'base.tpl', 'extra.tpl'])
+
+    assert graph.affected(['extra.tpl']) == {'b.yaml'}
+    assert graph.affected(['base.tpl']) == {'a.yaml', 'b.yaml'}
+
+    graph.remove('b.yaml')
+    assert graph.files() == {'a.yaml', 'base.tpl'}
+
+
+def test_poll_renders_dependents_of_included_yaml(watcher, tmpdir):
+    """
+    Assert that :meth:`~ydf.watch.Watcher.poll` renders only the YAML files that include a changed file with
+    `!include`.
+    """
+    tmpdir.join('base.yaml').write('- from: "alpine"\n')
+    tmpdir.join('yaml', 'a.yaml').write('instructions: !include ../base.yaml\n')
+    assert _rendered(watcher.poll()) == ['a.yaml']
+
+    tmpdir.join('base.yaml').write('- from: "alpine"\n- cmd: "echo"\n')
+    assert _rendered(watcher.poll()) == ['a.yaml']
+    assert tmpdir.join('out', 'a.Dockerfile').read() == '2'
+
+
+def test_poll_keeps_included_yaml_when_templates_change(watcher, tmpdir):
+    """
+    Assert that :meth:`~ydf.watch.Watcher.poll` keeps the files each YAML input includes with `!include` after
+    a template changes or a YAML file is added.
+    """
+    for name in ('a', 'b'):
+        tmpdir.join('{}-base.yaml'.format(name)).write('- from: "alpine"\n')
+        tmpdir.join('yaml', '{}.yaml'.format(name)).write('instructions: !include ../{}-base.yaml\n'.format(name))
+    assert _rendered(watcher.poll()) == ['a.yaml', 'b.yaml']
+
+    tmpdir.join('templates', 'base.tpl').write('{{ instructions|length }}\n')
+    tmpdir.join('yaml', 'c.yaml').write(VALID_YAML)
+    assert _rendered(watcher.poll()) == ['a.yaml', 'b.yaml', 'c.yaml']
+
+    tmpdir.join('a-base.yaml').write('- from: "alpine"\n- cmd: "echo"\n')
+    assert _rendered(watcher.poll()) == ['a.yaml']
+    assert tmpdir.join('out', 'a.Dockerfile').read() == '2'
+
+    tmpdir.join('b-base.yaml').write('- from: "alpine"\n- cmd: "echo"\n- cmd: "true"\n')
+    assert _rendered(watcher.poll()) == ['b.yaml']
+    assert tmpdir.join('out', 'b.Dockerfile').read() == '3'
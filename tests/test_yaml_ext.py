@@ -5,11 +5,281 @@
     Tests for the :mod:`~ydf.yaml_ext` module.
 """
 
+import collections
+
 import pytest
 
-from ydf import yaml_ext
+from ydf import exceptions, yaml_ext, yaml_loaders
 
 
 @pytest.mark.xfail()
 def test_stub():
     assert False, "TODO: Implement"
+
+
+MERGE_YAML = """
+base: &base
+  image: "alpine"
+  tag: "latest"
+first: *base
+second:
+  <<: *base
+  tag: "edge"
+"""
+
+
+@pytest.fixture(scope='module', params=yaml_ext.available_loaders())
+def loader(request):
+    """
+    Fixture that yields the name of each available YAML loader backend.
+    """
+    return request.param
+
+
+def test_load_preserves_mapping_order(loader):
+    """
+    Assert that :func:`~ydf.yaml_ext.load` keeps mapping keys in document order for every backend.
+    """
+    keys = ['z', 'a', 'm', 'b']
+    doc = yaml_ext.load('\n'.join('{}: 1'.format(k) for k in keys), loader)
+    assert list(doc.keys()) == keys
+
+
+def test_load_supports_aliases_and_merge_keys(loader):
+    """
+    Assert that :func:`~ydf.yaml_ext.load` resolves aliases and merge keys for every backend.
+    """
+    doc = yaml_ext.load(MERGE_YAML, loader)
+    assert doc['first'] == doc['base']
+    assert list(doc['second'].items()) == [('image', 'alpine'), ('tag', 'edge')]
+
+
+def test_get_loader_auto_falls_back_to_round_trip(monkeypatch):
+    """
+    Assert that :func:`~ydf.yaml_ext.get_loader` uses the round trip loader when libyaml is unavailable.
+    """
+    monkeypatch.setattr(yaml_ext, 'AUTO_LOADER', yaml_ext.LOADER_ROUNDTRIP)
+    assert yaml_ext.get_loader(yaml_ext.LOADER_AUTO) is yaml_loaders.OrderedRoundTripLoader
+
+
+def test_loader_classes_importable_from_yaml_ext():
+    """
+    Assert that the loaders moved to :mod:`~ydf.yaml_loaders` can still be imported from :mod:`~ydf.yaml_ext`
+    and create instances of the moved classes, and that other missing attributes raise an :class:`~AttributeError`.
+    """
+    from ydf.yaml_ext import OrderedRoundTripLoader, OrderedSafeLoader
+
+    assert isinstance(OrderedRoundTripLoader('a: 1'), yaml_loaders.OrderedRoundTripLoader)
+    assert isinstance(OrderedSafeLoader('a: 1'), yaml_loaders.OrderedSafeLoader)
+    assert yaml_loaders.yaml_module(yaml_loaders.OrderedRoundTripLoader).load(
+        'b: 1\na: 2', Loader=OrderedRoundTripLoader) == collections.OrderedDict([('b', 1), ('a', 2)])
+    with pytest.raises(AttributeError):
+        yaml_ext.NotALoader
+
+
+@pytest.mark.parametrize('loader', [name for name in yaml_ext.available_loaders() if name != yaml_ext.LOADER_PYYAML])
+def test_event_loader_composes_one_node_at_a_time(loader):
+    """
+    Assert that :func:`~ydf.yaml_ext.event_loader` returns the parser and composer of a loader backend, which
+    compose the values of a document one at a time.
+    """
+    instance, parser, resolver, composer = yaml_ext.event_loader('- a: 1\n- b\n', loader)
+    try:
+        for _ in range(3):
+            parser.get_event()
+        assert instance.construct_document(composer.compose_node(None, None)) == {'a': 1}
+        assert instance.construct_document(composer.compose_node(None, None)) == 'b'
+        assert resolver is not None
+    finally:
+        instance.dispose()
+
+
+def test_event_loader_rejects_pyyaml():
+    """
+    Assert that :func:`~ydf.yaml_ext.event_loader` raises a :class:`~ValueError` for a backend that isn't a
+    ruamel.yaml loader.
+    """
+    if yaml_ext.LOADER_PYYAML not in yaml_ext.available_loaders():
+        pytest.skip('PyYAML is not installed')
+    with pytest.raises(ValueError):
+        yaml_ext.event_loader('a: 1', yaml_ext.LOADER_PYYAML)
+
+
+def test_get_loader_raises_on_unknown_loader():
+    """
+    Assert that :func:`~ydf.yaml_ext.get_loader` raises a :class:`~ValueError` for unknown backends.
+    """
+    with pytest.raises(ValueError):
+        yaml_ext.get_loader('unknown')
+
+
+@pytest.fixture(scope='function')
+def document_cache():
+    """
+    Fixture that enables a small document cache for the duration of a test.
+    """
+    yaml_ext.clear_cache()
+    yaml_ext.set_cache_size(2)
+    yield yaml_ext.DOCUMENT_CACHE
+    yaml_ext.set_cache_size(0)
+    yaml_ext.clear_cache()
+
+
+def test_load_file_cache_returns_copies(document_cache, tmpdir):
+    """
+    Assert that :func:`~ydf.yaml_ext.load_file` returns cached documents that callers can't corrupt.
+    """
+    path = tmpdir.join('a.yaml')
+    path.write('instructions:\n  - from: "alpine"\n')
+
+    first = yaml_ext.load_file(str(path))
+    first['instructions'][0].popitem()
+    second = yaml_ext.load_file(str(path))
+
+    assert second['instructions'][0] == {'from': 'alpine'}
+    assert yaml_ext.cache_info()[:3] == (1, 1, 0)
+
+
+@pytest.mark.parametrize('loader', yaml_ext.available_loaders())
+def test_load_file_cache_shares_document_without_copy(document_cache, tmpdir, loader):
+    """
+    Assert that :func:`~ydf.yaml_ext.load_file` returns the cached document itself when the caller asks for no
+    copy, and that copies keep aliases of an anchored node as the same object.
+    """
+    path = tmpdir.join('a.yaml')
+    path.write('x-run: &run\n  run: "make"\ninstructions:\n  - *run\n  - *run\n')
+
+    first = yaml_ext.load_file(str(path), loader, copy=False)
+    assert yaml_ext.load_file(str(path), loader, copy=False) is first
+
+    copied = yaml_ext.load_file(str(path), loader)
+    assert copied == first and copied is not first
+    assert copied['instructions'][0] is copied['instructions'][1] is copied['x-run']
+    assert copied['instructions'][0] is not first['instructions'][0]
+
+
+def test_load_file_cache_misses_on_change(document_cache, tmpdir):
+    """
+    Assert that :func:`~ydf.yaml_ext.load_file` parses a file again once its size or modification time changes.
+    """
+    path = tmpdir.join('a.yaml')
+    path.write('a: 1\n')
+    yaml_ext.load_file(str(path))
+    path.write('a: 22\n')
+
+    assert yaml_ext.load_file(str(path)) == {'a': 22}
+    assert yaml_ext.cache_info().misses == 2
+
+
+def test_load_file_cache_evicts_least_recently_used(document_cache, tmpdir):
+    """
+    Assert that :func:`~ydf.yaml_ext.load_file` evicts the least recently used document when the cache is full.
+    """
+    paths = []
+    for name in ('a', 'b', 'c'):
+        tmpdir.join('{}.yaml'.format(name)).write('a: 1\n')
+        paths.append(str(tmpdir.join('{}.yaml'.format(name))))
+
+    yaml_ext.load_file(paths[0])
+    yaml_ext.load_file(paths[1])
+    yaml_ext.load_file(paths[0])
+    yaml_ext.load_file(paths[2])
+    yaml_ext.load_file(paths[0])
+
+    assert yaml_ext.cache_info() == yaml_ext.CacheInfo(hits=2, misses=3, evictions=1, maxsize=2, currsize=2)
+
+
+@pytest.fixture(scope='function')
+def fragments(tmpdir):
+    """
+    Fixture that yields a directory of YAML files that include shared fragments.
+    """
+    yaml_ext.clear_cache()
+    tmpdir.mkdir('shared').join('base.yaml').write('image:\n  from: "alpine"\nsetup: !include setup.yaml\n')
+    tmpdir.join('shared', 'setup.yaml').write('- run: "make"\n')
+    for name in ('a', 'b'):
+        tmpdir.join('{}.yaml'.format(name)).write(
+            'instructions:\n  - !include shared/base.yaml#image\n  - !include shared/setup.yaml\n')
+    yield tmpdir
+    yaml_ext.clear_cache()
+
+
+@pytest.mark.parametrize('loader', yaml_ext.available_loaders())
+def test_include_resolves_relative_to_including_file(fragments, loader):
+    """
+    Assert that `!include path#key` loads a top level value of a file relative to the file that includes it,
+    including files that the included file includes itself.
+    """
+    document = yaml_ext.load_file(str(fragments.join('a.yaml')), loader)
+    assert document == {'instructions': [{'from': 'alpine'}, [{'run': 'make'}]]}
+    assert set(yaml_ext.includes(str(fragments.join('a.yaml')))) == {
+        str(fragments.join('shared', 'base.yaml')), str(fragments.join('shared', 'setup.yaml'))}
+
+
+def test_includes_forgets_least_recently_loaded_files(fragments, monkeypatch):
+    """
+    Assert that :func:`~ydf.yaml_ext.includes` only remembers as many files as the document cache holds, or
+    :data:`~ydf.yaml_ext.INCLUDES_SIZE` if that's larger, so long running processes don't grow without bound.
+    """
+    a, b = str(fragments.join('a.yaml')), str(fragments.join('b.yaml'))
+    monkeypatch.setattr(yaml_ext, 'INCLUDES_SIZE', 1)
+
+    yaml_ext.load_file(a)
+    yaml_ext.load_file(b)
+    assert list(yaml_ext.INCLUDES) == [b]
+    assert yaml_ext.includes(a) == () and len(yaml_ext.includes(b)) == 2
+
+    yaml_ext.set_cache_size(2)
+    try:
+        yaml_ext.load_file(a)
+        yaml_ext.load_file(b)
+        yaml_ext.load_file(a)
+        assert list(yaml_ext.INCLUDES) == [b, a]
+    finally:
+        yaml_ext.set_cache_size(0)
+
+    yaml_ext.clear_cache()
+    assert yaml_ext.includes(a) == ()
+
+
+def test_include_parses_shared_fragments_once(fragments):
+    """
+    Assert that a fragment included by many files is parsed once and returned as a copy callers can't corrupt,
+    and parsed again once it changes.
+    """
+    first = yaml_ext.load_file(str(fragments.join('a.yaml')))
+    first['instructions'][0].popitem()
+    second = yaml_ext.load_file(str(fragments.join('b.yaml')))
+
+    assert second['instructions'][0] == {'from': 'alpine'}
+    assert yaml_ext.FRAGMENT_CACHE.info()[:2] == (3, 2)
+
+    fragments.join('shared', 'setup.yaml').write('- run: "make install"\n')
+    assert yaml_ext.load_file(str(fragments.join('a.yaml')))['instructions'][1] == [{'run': 'make install'}]
+
+
+def test_include_invalidates_cached_document(document_cache, fragments):
+    """
+    Assert that :func:`~ydf.yaml_ext.load_file` parses a cached file again when a file it includes changes.
+    """
+    path = str(fragments.join('a.yaml'))
+    yaml_ext.load_file(path)
+    fragments.join('shared', 'base.yaml').write('image:\n  from: "debian"\n')
+    assert yaml_ext.load_file(path)['instructions'][0] == {'from': 'debian'}
+
+
+@pytest.mark.parametrize('files', [
+    {'a.yaml': 'a: !include a.yaml\n'},
+    {'a.yaml': 'a: !include b.yaml\n', 'b.yaml': 'b: !include a.yaml\n'},
+    {'a.yaml': 'a: !include missing.yaml\n'},
+    {'a.yaml': 'a: !include b.yaml#missing\n', 'b.yaml': 'b: 1\n'},
+], ids=['self', 'cycle', 'missing-file', 'missing-key'])
+def test_include_raises_include_error(files, tmpdir):
+    """
+    Assert that `!include` raises a :class:`~ydf.exceptions.IncludeError` for include cycles and files or keys
+    that don't exist.
+    """
+    for name, content in files.items():
+        tmpdir.join(name).write(content)
+    with pytest.raises(exceptions.IncludeError):
+        yaml_ext.load_file(str(tmpdir.join('a.yaml')))
@@ -0,0 +1,262 @@
+"""
+    ydf/advisor
+    ~~~~~~~~~~~
+
+    Detect instruction orderings that defeat the Docker build cache, and move instructions when it's safe to.
+
+    Docker reuses the cached layer of an instruction until an earlier instruction changes, so instructions whose
+    inputs change often, e.g. a `COPY` of the whole source tree, should come after those that change rarely, e.g.
+    installing dependencies.
+"""
+
+import collections
+import re
+
+from ydf import emitter, ir
+
+
+__all__ = ['Advice', 'advise', 'reorder']
+
+
+ADVICE_COPY_BEFORE_INSTALL = 'copy-before-install'
+ADVICE_EARLY_ARG = 'early-arg'
+ADVICE_EARLY_VOLATILE_LABEL = 'early-volatile-label'
+
+# Instructions whose cached layers are expensive to rebuild.
+LAYER_INSTRUCTIONS = (ir.Run, ir.Copy, ir.Add)
+
+# Commands that install dependencies, which should run before source files are copied into the image.
+INSTALL_COMMAND = re.compile(r'\b(apt-get install|apt install|apk add|yum install|dnf install|pip3? install|'
+                             r'npm (install|ci)|yarn install|bundle install|gem install|go mod download|'
+                             r'composer install|poetry install|cargo fetch)\b')
+
+# Last part of label keys whose value usually changes on every build, e.g. `org.opencontainers.image.revision`.
+VOLATILE_LABEL_KEYS = frozenset(('created', 'revision', 'build-date', 'build_date', 'vcs-ref', 'vcs_ref', 'commit',
+                                 'git-commit', 'timestamp'))
+
+VARIABLE_REFERENCE = re.compile(r'\$\{?(\w+)')
+ENV_VARIABLE_NAME = re.compile(r'(?:^|\s)(\w+)=')
+
+
+class Advice(collections.namedtuple('Advice', 'index code message movable')):
+    """
+    Instruction that invalidates the build cache more often than it needs to.
+
+    :param index: Position of the instruction in the list of nodes
+    :param code: Short name of the problem, e.g. `copy-before-install`
+    :param message: Description of the problem and how to fix it
+    :param movable: Flag indicating if :func:`~ydf.advisor.reorder` moves the instruction
+    """
+
+
+def _stages(nodes):
+    """
+    Find the build stages of the given instructions.
+
+    Instructions before the first `FROM`, e.g. `ARG` instructions used by `FROM`, aren't part of a stage.
+
+    :param nodes: List of :class:`~ydf.ir.Instruction` instances
+    :return: Generator that yields `(start, end)` positions of the instructions of each stage, excluding `FROM`
+    """
+    starts = [i + 1 for i, node in enumerate(nodes) if type(node) is ir.From]
+    for start, end in zip(starts, [s - 1 for s in starts[1:]] + [len(nodes)]):
+        yield start, end
+
+
+def _references(node):
+    """
+    Get the names of the variables referenced by an instruction, e.g. `VERSION` of `RUN make VERSION=$VERSION`.
+
+    :param node: :class:`~ydf.ir.Instruction` instance
+    :return: Set of variable names
+    """
+    return set(VARIABLE_REFERENCE.findall(emitter.emit(node)))
+
+
+def _defines(node):
+    """
+    Get the names of the variables defined by an `ARG` or `ENV` instruction.
+
+    :param node: :class:`~ydf.ir.Instruction` instance
+    :return: Set of variable names
+    """
+    if type(node) is ir.Arg:
+        return {node.arg_name}
+    if type(node) is ir.Env:
+        if isinstance(node.variables, str):
+            return {node.variables.split('=', 1)[0].split(None, 1)[0]} | set(ENV_VARIABLE_NAME.findall(node.variables))
+        return {str(key) for key, _ in node.variables}
+    return set()
+
+
+def _sources(node):
+    """
+    Get the source paths of a `COPY` or `ADD` instruction.
+
+    :param node: :class:`~ydf.ir.Copy` or :class:`~ydf.ir.Add` instance
+    :return: List of source paths
+    """
+    paths = node.paths.split() if isinstance(node.paths, str) else node.paths
+    return [str(path) for path in paths[:-1] if not str(path).startswith('--')]
+
+
+def _copies_source_tree(node):
+    """
+    Check if an instruction copies a directory, e.g. `COPY . /app`, whose contents change on most commits.
+
+    :param node: :class:`~ydf.ir.Instruction` instance
+    :return: `True` if the instruction copies a directory, `False` otherwise
+    """
+    if type(node) not in (ir.Copy, ir.Add):
+        return False
+    return any(src in ('.', './') or src.endswith('/') for src in _sources(node))
+
+
+def _installs_dependencies(node):
+    """
+    Check if an instruction runs a package manager to install dependencies.
+
+    :param node: :class:`~ydf.ir.Instruction` instance
+    :return: `True` if the instruction installs dependencies, `False` otherwise
+    """
+    return type(node) is ir.Run and bool(INSTALL_COMMAND.search(emitter.emit(node)))
+
+
+def _is_volatile_label(node):
+    """
+    Check if a `LABEL` instruction has a value that likely changes on every build.
+
+    :param node: :class:`~ydf.ir.Instruction` instance
+    :return: `True` if the instruction is a volatile `LABEL`, `False` otherwise
+    """
+    if type(node) is not ir.Label:
+        return False
+    return any(str(key).lower().rsplit('.', 1)[-1] in VOLATILE_LABEL_KEYS or '$' in str(value)
+               for key, value in node.labels)
+
+
+def _can_cross(node, names, crossed):
+    """
+    Check if an instruction can be moved past others without changing the value of any variable it uses.
+
+    :param node: :class:`~ydf.ir.Instruction` being moved
+    :param names: Set of variable names the moved instruction defines or references
+    :param crossed: Sequence of instructions it would move past
+    :return: `True` if the move is safe, `False` otherwise
+    """
+    return not any(type(other) in (ir.From, ir.Onbuild, ir.Raw) or _defines(other) & names for other in crossed)
+
+
+def _volatile_label_target(nodes, index, end):
+    """
+    Find where a volatile `LABEL` instruction should move to, after the last layer of its stage.
+
+    :param nodes: List of :class:`~ydf.ir.Instruction` instances
+    :param index: Position of the `LABEL` instruction
+    :param end: End position of its stage
+    :return: Position to move it after, or `None` if no layer follows it
+    """
+    layers = [i for i in range(index + 1, end) if isinstance(nodes[i], LAYER_INSTRUCTIONS)]
+    return layers[-1] if layers else None
+
+
+def _first_use(nodes, index, end):
+    """
+    Find the first instruction of a stage that references the variable of an `ARG` instruction.
+
+    :param nodes: List of :class:`~ydf.ir.Instruction` instances
+    :param index: Position of the `ARG` instruction
+    :param end: End position of its stage
+    :return: Position of the first instruction that uses the variable, or `None` if none do
+    """
+    name = nodes[index].arg_name
+    for i in range(index + 1, end):
+        if name in _references(nodes[i]):
+            return i
+    return None
+
+
+def advise(nodes):
+    """
+    Find instructions ordered so that they invalidate the build cache more often than they need to.
+
+    * `copy-before-install`: a directory, e.g. `.`, is copied before dependencies are installed, so every change
+      to a source file reinstalls them. Copy only the files the install needs, e.g. `requirements.txt`, first.
+    * `early-arg`: an `ARG` is declared before `RUN` instructions that don't use it. A different value of the build
+      argument rebuilds them, as `RUN` sees build arguments as environment variables.
+    * `early-volatile-label`: a `LABEL` with a value that changes on every build, e.g. a commit or build date, comes
+      before instructions that build layers.
+
+    :param nodes: List of :class:`~ydf.ir.Instruction` instances
+    :return: List of :class:`~ydf.advisor.Advice` in the order of the instructions
+    """
+    advice = []
+
+    for start, end in _stages(nodes):
+        for i in range(start, end):
+            node = nodes[i]
+
+            if _copies_source_tree(node):
+                install = next((j for j in range(i + 1, end) if _installs_dependencies(nodes[j])), None)
+                if install is not None:
+                    advice.append(Advice(i, ADVICE_COPY_BEFORE_INSTALL, 'Source tree is copied before dependencies '
+                                         'are installed by instruction {}; copy only the files the install '
+                                         'needs first'.format(install + 1), False))
+
+            elif type(node) is ir.Arg:
+                use = _first_use(nodes, i, end)
+                stop = end if use is None else use
+                if any(type(nodes[j]) is ir.Run for j in range(i + 1, stop)):
+                    if use is None:
+                        message = 'ARG {} is never used but rebuilds every RUN after it when changed'
+                    else:
+                        message = 'ARG {{}} is first used by instruction {}; declare it there'.format(use + 1)
+                    # Never movable: `RUN` sees every build argument as an environment variable, so a command may read
+                    # it without a `$NAME` reference and moving the `ARG` past it could change what it builds.
+                    advice.append(Advice(i, ADVICE_EARLY_ARG, message.format(node.arg_name), False))
+
+            elif _is_volatile_label(node):
+                target = _volatile_label_target(nodes, i, end)
+                if target is not None:
+                    movable = _can_cross(node, _references(node), nodes[i + 1:target + 1])
+                    advice.append(Advice(i, ADVICE_EARLY_VOLATILE_LABEL, 'LABEL changes on every build and '
+                                         'rebuilds the layers after it; move it after instruction {}'.format(
+                                             target + 1), movable))
+
+    return advice
+
+
+def _move(nodes, moves):
+    """
+    Move instructions to new positions.
+
+    :param nodes: List of :class:`~ydf.ir.Instruction` instances
+    :param moves: Dict of the position of an instruction to a `(position, offset)` tuple of where it moves to; an
+        offset of `-1` puts it before the instruction at that position and `1` after it
+    :return: New list of nodes
+    """
+    keys = [moves.get(i, (i, 0)) + (i,) for i in range(len(nodes))]
+    return [nodes[i] for i in sorted(range(len(nodes)), key=keys.__getitem__)]
+
+
+def reorder(nodes):
+    """
+    Move instructions reported by :func:`~ydf.advisor.advise` as movable to where they invalidate less of the
+    build cache.
+
+    Volatile `LABEL` instructions move after the last layer of their stage, unless that moves them past a `FROM`,
+    `ONBUILD` or an instruction that defines a variable they use. `ARG` instructions are never moved, as `RUN`
+    sees build arguments as environment variables whether or not its command references them, and `COPY`
+    instructions are never moved, as later commands may need the copied files.
+
+    :param nodes: List of :class:`~ydf.ir.Instruction` instances
+    :return: New list of nodes; the given nodes are not modified
+    """
+    nodes = list(nodes)
+
+    moves = {}
+    for advice in advise(nodes):
+        if advice.movable and advice.code == ADVICE_EARLY_VOLATILE_LABEL:
+            start, end = next(s for s in _stages(nodes) if s[0] <= advice.index < s[1])
+            moves[advice.index] = (_volatile_label_target(nodes, advice.index, end), 1)
+    return _move(nodes, moves)
@@ -0,0 +1,218 @@
+"""
+    ydf/batch
+    ~~~~~~~~~
+
+    Render many YAML files to Dockerfiles within a single run.
+"""
+
+import collections
+import glob
+import io
+import os
+
+from ydf import meta, parallel, passes, profiling, templating, yaml_ext
+
+
+__all__ = ['Result', 'expand_paths', 'output_path', 'render_file', 'render_files']
+
+
+DEFAULT_OUTPUT_PATTERN = '{name}.Dockerfile'
+YAML_EXTENSIONS = ('.yaml', '.yml')
+
+
+WORKER_TEMPLATE = None
+
+
+class Result(collections.namedtuple('Result', 'path output error skipped removed includes')):
+    """
+    Outcome of rendering a single YAML file as part of a batch.
+
+    The error is stored as a string so results can be sent between worker processes. `removed` is the
+    number of instructions removed by :mod:`~ydf.passes`. `includes` are the absolute paths of files the
+    YAML file included with `!include`.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, path, output, error=None, skipped=False, removed=0, includes=()):
+        return super(Result, cls).__new__(cls, path, output, error, skipped, removed, includes)
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def _is_yaml(path):
+    """
+    Check the given path to see if it has a YAML file extension.
+
+    :param path: File path to check
+    :return: `True` if path ends with a known YAML extension, `False` otherwise
+    """
+    return path.lower().endswith(YAML_EXTENSIONS)
+
+
+def _walk_yaml(path):
+    """
+    Find all YAML files within the given directory tree, in a stable order.
+
+    :param path: Directory to search
+    :return: Generator that yields YAML file paths
+    """
+    for dirpath, dirnames, filenames in os.walk(path):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if _is_yaml(filename):
+                yield os.path.join(dirpath, filename)
+
+
+def expand_paths(paths):
+    """
+    Expand the given sequence of files, directories and glob patterns into a list of YAML file paths.
+
+    Directories are searched recursively for files with a YAML extension. Paths that do not exist are kept
+    as-is so they are reported as failures when rendered rather than silently dropped.
+
+    :param paths: Sequence of file paths, directory paths or glob patterns
+    :return: List of unique YAML file paths in the order given
+    """
+    expanded = []
+
+    for path in paths:
+        if os.path.isdir(path):
+            expanded.extend(_walk_yaml(path))
+        elif glob.has_magic(path):
+            expanded.extend(p for p in sorted(glob.glob(path, recursive=True)) if os.path.isfile(p))
+        else:
+            expanded.append(path)
+
+    return list(collections.OrderedDict.fromkeys(expanded))
+
+
+def output_path(path, pattern=DEFAULT_OUTPUT_PATTERN, output_dir=None):
+    """
+    Build the path of the Dockerfile generated from the YAML file at the given path.
+
+    The pattern is formatted with `dirname`, `basename` and `name` (basename without extension) of
+    the input path.
+
+    :param path: Path to YAML file
+    :param pattern: Filename pattern for the generated Dockerfile
+    :param output_dir: (Optional) Directory the generated Dockerfile is written to
+    :return: Path to write the generated Dockerfile to
+    """
+    dirname, basename = os.path.split(path)
+    name = os.path.splitext(basename)[0]
+    output = pattern.format(dirname=dirname or os.curdir, basename=basename, name=name)
+    return os.path.join(output_dir, output) if output_dir else output
+
+
+def write_file(path, content):
+    """
+    Write the given content to a file, creating parent directories as necessary.
+
+    :param path: Path to file on disk
+    :param content: String to write
+    """
+    dirname = os.path.dirname(path)
+    if dirname and not os.path.isdir(dirname):
+        os.makedirs(dirname, exist_ok=True)
+
+    with io.open(path, 'w') as f:
+        f.write(content)
+
+
+def render_file(path, template):
+    """
+    Render the YAML file at the given path using an already loaded template.
+
+    :param path: Path to YAML file on disk
+    :param template: :class:`~jinja2.Template` returned by :func:`~ydf.templating.load_template`
+    :return: The rendered Dockerfile
+    """
+    return templating.render_template(template, yaml_ext.load_file(path, copy=False))
+
+
+def format_error(error):
+    """
+    Build a single line description of the given exception.
+
+    :param error: Exception instance
+    :return: String containing the exception type and message
+    """
+    return '{}: {}'.format(type(error).__name__, error)
+
+
+def init_worker(template=templating.DEFAULT_TEMPLATE_NAME, path=templating.DEFAULT_TEMPLATE_PATH, env_options=None,
+                loader=None, enabled_passes=None):
+    """
+    Warm up the process that renders files; this loads and compiles the template and populates
+    the instruction registry so it only happens once per process.
+
+    :param template: Name of template file to render
+    :param path: Path on disk to search for templates to render
+    :param env_options: (Optional) Mapping of options given to :func:`~ydf.templating.load_template`
+    :param loader: (Optional) Name of YAML loader backend used by this process
+    :param enabled_passes: (Optional) Names of passes applied to instructions by this process
+    """
+    global WORKER_TEMPLATE
+
+    if loader is not None:
+        yaml_ext.set_default_loader(loader)
+    if enabled_passes is not None:
+        passes.set_enabled(enabled_passes)
+
+    meta.get_instructions()
+    WORKER_TEMPLATE = templating.load_template(template, path, **(env_options or {}))
+
+
+def render_task(task):
+    """
+    Render a single YAML file using the template loaded by :func:`~ydf.batch.init_worker`.
+
+    :param task: Tuple of YAML file path and output path
+    :return: Tuple of :class:`~ydf.batch.Result` and rendered Dockerfile (`None` on failure)
+    """
+    yaml_path, output = task
+    removed = passes.removed()
+    try:
+        with profiling.stage(profiling.STAGE_FILE, yaml_path):
+            content = render_file(yaml_path, WORKER_TEMPLATE)
+    except Exception as e:
+        return Result(yaml_path, output, format_error(e)), None
+    return Result(yaml_path, output, None, removed=passes.removed() - removed,
+                  includes=yaml_ext.includes(yaml_path)), content
+
+
+def render_files(paths, template=templating.DEFAULT_TEMPLATE_NAME, path=templating.DEFAULT_TEMPLATE_PATH,
+                 output_pattern=DEFAULT_OUTPUT_PATTERN, output_dir=None, jobs=parallel.DEFAULT_JOBS,
+                 chunksize=None, **env_options):
+    """
+    Render each YAML file at the given paths and write the Dockerfile to disk.
+
+    The template is loaded and compiled once per process. A failure to render one file does not
+    stop the batch; it is captured in the :class:`~ydf.batch.Result` for that file. When using
+    multiple jobs, files are rendered by worker processes and written by the calling process in
+    the order they were given.
+
+    :param paths: Sequence of YAML file paths
+    :param template: Name of template file to render
+    :param path: Path on disk to search for templates to render
+    :param output_pattern: Filename pattern for each generated Dockerfile
+    :param output_dir: (Optional) Directory to write generated Dockerfiles to
+    :param jobs: Number of processes used to render; zero or less uses every available CPU
+    :param chunksize: (Optional) Number of files sent to a worker process at a time
+    :param env_options: Options given to :func:`~ydf.templating.load_template`, e.g. `autoescape`
+    :return: Generator that yields a :class:`~ydf.batch.Result` for each path, in order
+    """
+    tasks = [(yaml_path, output_path(yaml_path, output_pattern, output_dir)) for yaml_path in paths]
+
+    for result, content in parallel.imap(render_task, tasks, jobs, chunksize, init_worker,
+                                         (template, path, env_options, yaml_ext.DEFAULT_LOADER, passes.ENABLED)):
+        if result.ok:
+            try:
+                with profiling.stage(profiling.STAGE_WRITE, result.path):
+                    write_file(result.output, content)
+            except Exception as e:
+                result = result._replace(error=format_error(e))
+        yield result
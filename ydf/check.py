@@ -0,0 +1,125 @@
+"""
+    ydf/check
+    ~~~~~~~~~
+
+    Validate many YAML files without rendering them.
+
+    A file is valid when it loads, every instruction resolves to an instruction function and its argument meets
+    all of that function's constraints. Instructions are built but not formatted, and no template is loaded,
+    so checking is much cheaper than rendering.
+"""
+
+import collections
+
+from ydf import instructions, meta, parallel, yaml_ext
+
+
+__all__ = ['Result', 'check_file', 'check_files', 'check_instructions', 'report']
+
+
+REPORT_FORMAT = 1
+
+
+class Result(collections.namedtuple('Result', 'path errors')):
+    """
+    Outcome of checking a single YAML file.
+
+    `errors` is a list of dicts with the `index` of the instruction within the file (`None` when the file
+    fails to load), the instruction `name`, the exception `type` and its `message`, so results can be sent
+    between worker processes and written as JSON.
+    """
+
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        return not self.errors
+
+
+def _error(index, name, error):
+    """
+    Describe an exception raised while checking a file.
+
+    :param index: (Optional) Position of the instruction that failed
+    :param name: (Optional) Name of the instruction that failed
+    :param error: Exception instance
+    :return: Dict that can be written as JSON
+    """
+    return collections.OrderedDict([('index', index), ('name', name), ('type', type(error).__name__),
+                                    ('message', str(error))])
+
+
+def check_instructions(items):
+    """
+    Validate each of the given instruction objects (parsed from YAML), collecting every error instead of stopping
+    at the first.
+
+    :param items: Iterable of Python objects representing Dockerfile instructions.
+    :return: List of error dicts, see :class:`~ydf.check.Result`
+    """
+    errors = []
+    for index, instruction in enumerate(items):
+        name = None
+        try:
+            name, _ = instructions.instruction_item(instruction, index)
+            instructions.build_instruction(instruction)
+        except Exception as e:
+            errors.append(_error(index, name, e))
+    return errors
+
+
+def check_file(path):
+    """
+    Validate the YAML file at the given path.
+
+    :param path: Path to YAML file on disk
+    :return: :class:`~ydf.check.Result` of the file
+    """
+    try:
+        document = yaml_ext.load_file(path, copy=False) or {}
+        items = document.get('instructions') or []
+    except Exception as e:
+        return Result(path, [_error(None, None, e)])
+    return Result(path, check_instructions(items))
+
+
+def init_worker(loader=None):
+    """
+    Warm up a process that checks files; this populates the instruction registry so it only happens once
+    per process.
+
+    :param loader: (Optional) Name of YAML loader backend used by this process
+    """
+    if loader is not None:
+        yaml_ext.set_default_loader(loader)
+    meta.get_instructions()
+
+
+def check_files(paths, jobs=parallel.DEFAULT_JOBS, chunksize=None):
+    """
+    Validate each YAML file at the given paths.
+
+    :param paths: Sequence of YAML file paths
+    :param jobs: Number of processes used to check; zero or less uses every available CPU
+    :param chunksize: (Optional) Number of files sent to a worker process at a time
+    :return: Generator that yields a :class:`~ydf.check.Result` for each path, in order
+    """
+    return parallel.imap(check_file, paths, jobs, chunksize, init_worker, (yaml_ext.DEFAULT_LOADER,))
+
+
+def report(results):
+    """
+    Build the JSON report of a check.
+
+    :param results: Sequence of :class:`~ydf.check.Result` instances
+    :return: Dict that can be written as JSON
+    """
+    failed = [result for result in results if not result.ok]
+    return collections.OrderedDict([
+        ('format', REPORT_FORMAT),
+        ('files', len(results)),
+        ('failed', len(failed)),
+        ('errors', sum(len(result.errors) for result in failed)),
+        ('results', [collections.OrderedDict([('path', result.path), ('ok', result.ok),
+                                              ('errors', result.errors)]) for result in results]),
+    ])
@@ -6,14 +6,126 @@
 """
 
 import click
+import glob
+import json
+import os
+import signal
 import sys
 
-from ydf import templating, yaml_ext
+from ydf import batch, client, incremental, parallel, passes, profiling, stream, templating, watch, yaml_ext
 
 
-@click.command('ydf')
+def _is_batch(yaml, output_dir, output_pattern, incremental=False, watching=False):
+    """
+    Determine if the given command-line arguments request rendering more than a single YAML file.
+
+    :param yaml: Sequence of YAML paths, directories or glob patterns given on the command-line
+    :param output_dir: Output directory option
+    :param output_pattern: Output filename pattern option
+    :param incremental: Incremental option
+    :param watching: Watch option
+    :return: `True` if batch mode should be used, `False` otherwise
+    """
+    if output_dir is not None or output_pattern is not None or incremental or watching or len(yaml) != 1:
+        return True
+    return os.path.isdir(yaml[0]) or glob.has_magic(yaml[0])
+
+
+def _report(results):
+    """
+    Write a per-file summary of a batch run to stderr.
+
+    :param results: Sequence of :class:`~ydf.batch.Result` instances
+    :return: Number of files that failed to render
+    """
+    failed = skipped = 0
+
+    for result in results:
+        if result.skipped:
+            skipped += 1
+        elif result.ok:
+            click.echo('ok   {} -> {}'.format(result.path, result.output), err=True)
+        else:
+            failed += 1
+            click.echo('fail {}: {}'.format(result.path, result.error), err=True)
+
+    click.echo('Rendered {} of {} files, {} skipped, {} failed'.format(
+        len(results) - failed - skipped, len(results), skipped, failed), err=True)
+    if passes.OPTIMIZATION_COALESCE_RUN in passes.ENABLED:
+        _report_passes(sum(result.removed for result in results))
+    return failed
+
+
+def _report_passes(removed):
+    """
+    Write the number of image layers removed by optimization passes to stderr.
+
+    :param removed: Number of instructions removed
+    """
+    click.echo('Removed {} layers by coalescing RUN instructions'.format(removed), err=True)
+
+
+def _report_watch(results, elapsed):
+    """
+    Write a summary of the files rendered after a change to stderr.
+
+    :param results: Sequence of :class:`~ydf.batch.Result` instances
+    :param elapsed: Number of seconds taken to render
+    """
+    _report(results)
+    click.echo('Rendered in {:.1f}ms'.format(elapsed * 1000), err=True)
+
+
+def _report_profile(profiler, profile_stats=None, profile_collapsed=None):
+    """
+    Write the time spent per stage and per YAML file to stderr, and function level profiles to disk.
+
+    :param profiler: :class:`~ydf.profiling.Profiler` that recorded the run
+    :param profile_stats: (Optional) Path to write :mod:`pstats` statistics to
+    :param profile_collapsed: (Optional) Path to write collapsed stacks to
+    """
+    for line in profiler.report():
+        click.echo(line, err=True)
+
+    if profile_stats:
+        profiler.dump_stats(profile_stats)
+        click.echo('Wrote profile statistics to {}'.format(profile_stats), err=True)
+    if profile_collapsed:
+        profiler.dump_collapsed(profile_collapsed)
+        click.echo('Wrote collapsed stacks to {}'.format(profile_collapsed), err=True)
+
+
+class DefaultGroup(click.Group):
+    """
+    Group of commands that runs a default command when the first argument isn't the name of a command.
+
+    This keeps `ydf FILE...` working alongside commands such as `ydf serve`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.default_command = kwargs.pop('default_command')
+        super(DefaultGroup, self).__init__(*args, **kwargs)
+
+    def parse_args(self, ctx, args):
+        if args and args[0] not in self.commands and args[0] not in ctx.help_option_names:
+            args = [self.default_command] + list(args)
+        return super(DefaultGroup, self).parse_args(ctx, args)
+
+
+@click.group('ydf', cls=DefaultGroup, default_command='render')
+def main():
+    """
+    YAML to Dockerfile.
+
+    Renders the given YAML files when the first argument isn't a command, e.g. `ydf hello-world.yaml`.
+    """
+
+
+@main.command('render')
 @click.argument('yaml',
-                type=click.Path(dir_okay=False))
+                nargs=-1,
+                required=True,
+                type=click.Path())
 @click.option('-t', '--template',
               type=str,
               default=templating.DEFAULT_TEMPLATE_NAME,
@@ -27,14 +139,354 @@ from ydf import templating, yaml_ext
               type=click.File('w'),
               default=sys.stdout,
               help='Dockerfile generated from translation')
-def main(yaml, template, search_path, output):
+@click.option('-d', '--output-dir',
+              type=click.Path(file_okay=False),
+              default=None,
+              help='Directory to write Dockerfiles to when rendering multiple YAML files')
+@click.option('-p', '--output-pattern',
+              type=str,
+              default=None,
+              help='Filename pattern of Dockerfiles when rendering multiple YAML files, '
+                   'e.g. "{dirname}/{name}.Dockerfile"')
+@click.option('-j', '--jobs',
+              type=int,
+              default=parallel.DEFAULT_JOBS,
+              help='Number of processes used to render multiple YAML files; 0 uses every CPU')
+@click.option('--autoescape/--no-autoescape',
+              default=templating.DEFAULT_AUTOESCAPE,
+              help='HTML escape values rendered by the template; use --no-autoescape for plain text')
+@click.option('--bytecode-cache',
+              type=click.Path(file_okay=False, resolve_path=True),
+              default=None,
+              help='Directory used to cache compiled templates between runs')
+@click.option('--template-archive',
+              type=click.Path(dir_okay=False, resolve_path=True),
+              default=templating.DEFAULT_TEMPLATE_ARCHIVE,
+              help='Archive written by "ydf compile-templates" to load compiled templates from when it exists')
+@click.option('-i', '--incremental', 'is_incremental',
+              is_flag=True,
+              default=False,
+              help='Only render YAML files that changed since the last run')
+@click.option('--manifest',
+              type=click.Path(dir_okay=False),
+              default=incremental.DEFAULT_MANIFEST,
+              help='File used to record rendered YAML files for incremental runs')
+@click.option('--incremental-check',
+              type=click.Choice(incremental.CHECKS),
+              default=incremental.CHECK_HASH,
+              help='Detect changed YAML files by content hash or by modification time and size')
+@click.option('-w', '--watch', 'is_watch',
+              is_flag=True,
+              default=False,
+              help='Keep running and re-render Dockerfiles affected by changes to YAML files or templates')
+@click.option('--watch-interval',
+              type=float,
+              default=watch.DEFAULT_INTERVAL,
+              help='Number of seconds between checks for changed files')
+@click.option('-m', '--multi-document',
+              is_flag=True,
+              default=False,
+              help='Render every document of multi-document YAML streams; "-" reads a stream from stdin')
+@click.option('--key-field',
+              type=str,
+              default=stream.DEFAULT_KEY_FIELD,
+              help='Field of each document meta block used as {key} in the output pattern of multi-document streams')
+@click.option('--yaml-loader',
+              type=click.Choice(yaml_ext.LOADER_NAMES),
+              default=yaml_ext.LOADER_AUTO,
+              help='YAML parser backend; "auto" uses libyaml when available')
+@click.option('--yaml-cache-size',
+              type=click.IntRange(min=0),
+              default=None,
+              help='Number of parsed YAML files to keep in memory; enabled by default in watch mode')
+@click.option('--profile',
+              is_flag=True,
+              default=False,
+              help='Print wall and CPU time spent in each stage and on each YAML file to stderr')
+@click.option('--profile-stats',
+              type=click.Path(dir_okay=False),
+              default=None,
+              help='Profile every function call and write pstats statistics to this file; implies --profile')
+@click.option('--profile-collapsed',
+              type=click.Path(dir_okay=False),
+              default=None,
+              help='Profile every function call and write collapsed stacks for flamegraph tools to this file; '
+                   'implies --profile')
+@click.option('--coalesce-run',
+              is_flag=True,
+              default=False,
+              help='Merge consecutive shell form RUN instructions to reduce the number of image layers')
+@click.option('--reorder-cache',
+              is_flag=True,
+              default=False,
+              help='Move instructions reported by "ydf advise" as movable to where they invalidate less of the '
+                   'build cache; ARG instructions are never moved, as RUN commands see build arguments as '
+                   'environment variables even without a $NAME reference')
+@click.option('--stream', 'is_stream',
+              is_flag=True,
+              default=False,
+              help='Render a single YAML file one instruction at a time, so memory use doesn\'t grow with the number '
+                   'of instructions; requires the default template')
+@click.option('--check', 'is_check',
+              is_flag=True,
+              default=False,
+              help='Only validate the instructions of every YAML file and write a JSON report to the output; exits '
+                   'with status 1 if any file is invalid')
+def render(yaml, template, search_path, output, output_dir, output_pattern, jobs, autoescape, bytecode_cache,
+           template_archive, is_incremental, manifest, incremental_check, is_watch, watch_interval, multi_document,
+           key_field, yaml_loader, yaml_cache_size, profile, profile_stats, profile_collapsed, coalesce_run,
+           reorder_cache, is_stream, is_check):
     """
-    YAML to Dockerfile.
+    Render YAML files to Dockerfiles.
     """
+    if is_check:
+        return _check(yaml, output, jobs, yaml_loader)
+
+    if not (profile or profile_stats or profile_collapsed):
+        return _render(yaml, template, search_path, output, output_dir, output_pattern, jobs, autoescape,
+                       bytecode_cache, template_archive, is_incremental, manifest, incremental_check, is_watch,
+                       watch_interval, multi_document, key_field, yaml_loader, yaml_cache_size, coalesce_run,
+                       reorder_cache, is_stream)
+
+    if jobs != 1:
+        click.echo('Profiling renders in a single process; ignoring --jobs', err=True)
+
+    profiling.start(function_profile=bool(profile_stats or profile_collapsed))
+    try:
+        with profiling.stage(profiling.STAGE_CLI):
+            _render(yaml, template, search_path, output, output_dir, output_pattern, 1, autoescape, bytecode_cache,
+                    template_archive, is_incremental, manifest, incremental_check, is_watch, watch_interval,
+                    multi_document, key_field, yaml_loader, yaml_cache_size, coalesce_run, reorder_cache, is_stream)
+    finally:
+        _report_profile(profiling.stop(), profile_stats, profile_collapsed)
+
+
+def _render(yaml, template, search_path, output, output_dir, output_pattern, jobs, autoescape, bytecode_cache,
+            template_archive, is_incremental, manifest, incremental_check, is_watch, watch_interval, multi_document,
+            key_field, yaml_loader, yaml_cache_size, coalesce_run, reorder_cache, is_stream):
+    """
+    Render YAML files given on the command-line to Dockerfiles.
+    """
+    try:
+        yaml_ext.set_default_loader(yaml_loader)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--yaml-loader')
+
+    passes.set_enabled([name for name, enabled in ((passes.OPTIMIZATION_COALESCE_RUN, coalesce_run),
+                                                   (passes.OPTIMIZATION_REORDER_CACHE, reorder_cache)) if enabled])
+
+    if yaml_cache_size is None and is_watch:
+        yaml_cache_size = yaml_ext.DEFAULT_CACHE_SIZE
+    yaml_ext.set_cache_size(yaml_cache_size or 0)
+
     search_path = search_path + (templating.DEFAULT_TEMPLATE_PATH,)
-    yaml = yaml_ext.load_file(yaml)
-    dockerfile = templating.render(yaml, template, search_path)
-    output.write(dockerfile)
+
+    if is_stream:
+        if multi_document or _is_batch(yaml, output_dir, output_pattern, is_incremental, is_watch):
+            raise click.UsageError('--stream renders a single YAML file')
+        from ydf import streaming
+        try:
+            streaming.render_file(yaml[0], output, template, search_path, autoescape)
+        except ValueError as e:
+            raise click.UsageError(str(e))
+        return
+
+    if multi_document:
+        results = list(stream.render_streams(yaml, template, search_path,
+                                             output_pattern or stream.DEFAULT_OUTPUT_PATTERN, output_dir, key_field,
+                                             autoescape=autoescape, bytecode_cache=bytecode_cache,
+                                             template_archive=template_archive))
+        if _report(results):
+            sys.exit(1)
+        return
+
+    if not _is_batch(yaml, output_dir, output_pattern, is_incremental, is_watch):
+        yaml_path = yaml[0]
+        with profiling.stage(profiling.STAGE_FILE, yaml_path):
+            dockerfile = templating.render(yaml_ext.load_file(yaml_path, copy=False), template, search_path, autoescape,
+                                           bytecode_cache, template_archive=template_archive)
+        with profiling.stage(profiling.STAGE_WRITE, yaml_path):
+            output.write(dockerfile)
+        if passes.OPTIMIZATION_COALESCE_RUN in passes.ENABLED:
+            _report_passes(passes.removed())
+        return
+
+    if output_dir is None and output_pattern is None:
+        raise click.UsageError('Rendering multiple YAML files requires --output-dir or --output-pattern')
+
+    output_pattern = output_pattern or batch.DEFAULT_OUTPUT_PATTERN
+    env_options = dict(autoescape=autoescape, bytecode_cache=bytecode_cache, template_archive=template_archive)
+
+    if is_watch:
+        try:
+            watch.watch(yaml, template, search_path, output_pattern, output_dir, watch_interval, _report_watch,
+                        **env_options)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    paths = batch.expand_paths(yaml)
+
+    if is_incremental:
+        results = incremental.render_files(paths, template, search_path, output_pattern, output_dir, jobs,
+                                           manifest=manifest, check=incremental_check, **env_options)
+    else:
+        results = batch.render_files(paths, template, search_path, output_pattern, output_dir, jobs, **env_options)
+
+    results = list(results)
+    if _report(results):
+        sys.exit(1)
+
+
+def _check(yaml, output, jobs, yaml_loader):
+    """
+    Validate YAML files given on the command-line without rendering them.
+    """
+    from ydf import check
+
+    try:
+        yaml_ext.set_default_loader(yaml_loader)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--yaml-loader')
+
+    report = check.report(list(check.check_files(batch.expand_paths(yaml), jobs)))
+    output.write(json.dumps(report, indent=2) + '\n')
+    click.echo('Checked {} files, {} failed with {} errors'.format(report['files'], report['failed'],
+                                                                   report['errors']), err=True)
+    if report['failed']:
+        sys.exit(1)
+
+
+@main.command('advise')
+@click.argument('yaml',
+                nargs=-1,
+                required=True,
+                type=click.Path())
+@click.option('--yaml-loader',
+              type=click.Choice(yaml_ext.LOADER_NAMES),
+              default=yaml_ext.LOADER_AUTO,
+              help='YAML parser backend; "auto" uses libyaml when available')
+def advise(yaml, yaml_loader):
+    """
+    Report instructions ordered so that they invalidate the Docker build cache more often than they need to.
+
+    Exits with status 1 if any are found, or a file fails to load. Those marked "movable" are moved by
+    `ydf render --reorder-cache`.
+    """
+    from ydf import advisor, instructions
+
+    try:
+        yaml_ext.set_default_loader(yaml_loader)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--yaml-loader')
+
+    found = failed = 0
+    for path in batch.expand_paths(yaml):
+        try:
+            document = yaml_ext.load_file(path, copy=False)
+            nodes = list(instructions.build_instructions_gen(document.get('instructions') or []))
+        except Exception as e:
+            failed += 1
+            click.echo('fail {}: {}'.format(path, batch.format_error(e)), err=True)
+            continue
+
+        for advice in advisor.advise(nodes):
+            found += 1
+            click.echo('{}:{}: {}: {}{}'.format(path, advice.index + 1, advice.code, advice.message,
+                                                ' (movable)' if advice.movable else ''))
+
+    if found or failed:
+        sys.exit(1)
+
+
+@main.command('compile-templates')
+@click.option('-s', '--search-path',
+              type=click.Path(file_okay=False, resolve_path=True),
+              multiple=True,
+              default=[templating.DEFAULT_TEMPLATE_PATH],
+              help='File system path to search for templates')
+@click.option('-o', '--output',
+              type=click.Path(dir_okay=False, resolve_path=True),
+              default=templating.DEFAULT_TEMPLATE_ARCHIVE,
+              help='Archive to write compiled templates to')
+def compile_templates(search_path, output):
+    """
+    Compile every template on the search paths into an archive that rendering loads instead of template sources.
+
+    Templates changed after they were compiled are compiled from source when rendering, until this is run again.
+    Exits with status 1 if a template fails to compile.
+    """
+    compiled, errors = templating.compile_templates(output, search_path + (templating.DEFAULT_TEMPLATE_PATH,))
+
+    for name, error in sorted(errors.items()):
+        click.echo('fail {}: {}'.format(name, batch.format_error(error)), err=True)
+    click.echo('Compiled {} templates to {}'.format(len(compiled), output), err=True)
+
+    if errors:
+        sys.exit(1)
+
+
+@main.command('serve')
+@click.option('-S', '--socket', 'socket_path',
+              type=click.Path(dir_okay=False),
+              default=client.default_socket_path,
+              help='Unix socket to listen on')
+@click.option('-t', '--template',
+              type=str,
+              default=templating.DEFAULT_TEMPLATE_NAME,
+              help='Name of Jinja2 template used when a request doesn\'t give one')
+@click.option('-s', '--search-path',
+              type=click.Path(file_okay=False, resolve_path=True),
+              multiple=True,
+              default=[templating.DEFAULT_TEMPLATE_PATH],
+              help='File system path to search for templates when a request doesn\'t give one')
+@click.option('--autoescape/--no-autoescape',
+              default=templating.DEFAULT_AUTOESCAPE,
+              help='HTML escape values rendered by the template unless a request says otherwise')
+@click.option('--bytecode-cache',
+              type=click.Path(file_okay=False, resolve_path=True),
+              default=None,
+              help='Directory used to cache compiled templates between runs')
+@click.option('--template-archive',
+              type=click.Path(dir_okay=False, resolve_path=True),
+              default=templating.DEFAULT_TEMPLATE_ARCHIVE,
+              help='Archive written by "ydf compile-templates" to load compiled templates from when it exists')
+@click.option('--yaml-loader',
+              type=click.Choice(yaml_ext.LOADER_NAMES),
+              default=yaml_ext.LOADER_AUTO,
+              help='YAML parser backend; "auto" uses libyaml when available')
+@click.option('--yaml-cache-size',
+              type=click.IntRange(min=0),
+              default=yaml_ext.DEFAULT_CACHE_SIZE,
+              help='Number of parsed YAML files to keep in memory for requests that give a file path')
+def serve(socket_path, template, search_path, autoescape, bytecode_cache, template_archive, yaml_loader,
+          yaml_cache_size):
+    """
+    Render YAML sent to a Unix socket, keeping templates loaded between requests.
+
+    Send requests with `ydf-client` or `ydf.client.Client`.
+    """
+    from ydf import server
+
+    try:
+        yaml_ext.set_default_loader(yaml_loader)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--yaml-loader')
+    yaml_ext.set_cache_size(yaml_cache_size)
+
+    def ready(srv):
+        click.echo('Listening on {}'.format(srv.path), err=True)
+
+    # Stop cleanly on SIGTERM, e.g. from a process supervisor, so the socket file is removed.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    try:
+        server.serve(socket_path, template, search_path + (templating.DEFAULT_TEMPLATE_PATH,), ready,
+                     autoescape=autoescape, bytecode_cache=bytecode_cache, template_archive=template_archive)
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        raise click.ClickException(str(e))
 
 
 if __name__ == '__main__':
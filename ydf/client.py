@@ -0,0 +1,202 @@
+"""
+    ydf/client
+    ~~~~~~~~~~
+
+    Thin client for a `ydf serve` daemon and the message protocol they share.
+
+    Each message is a JSON object encoded as UTF-8 and prefixed with its length as a 4 byte, big-endian
+    unsigned integer. A connection carries any number of request/response pairs.
+
+    This module only uses the standard library so clients don't pay to import the YAML and template
+    libraries the daemon already has loaded.
+"""
+
+import argparse
+import io
+import json
+import os
+import socket
+import struct
+import sys
+import tempfile
+
+from ydf import exceptions
+
+
+__all__ = ['Client', 'default_socket_path', 'read_message', 'write_message']
+
+
+HEADER = struct.Struct('>I')
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+
+OP_RENDER = 'render'
+OP_PING = 'ping'
+
+
+def default_socket_path():
+    """
+    Get the path of the Unix socket used when one isn't given.
+
+    :return: Path within `$XDG_RUNTIME_DIR`, or the temporary directory, that is unique to the current user
+    """
+    directory = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    return os.path.join(directory, 'ydf-{}.sock'.format(os.getuid()))
+
+
+def _read_exactly(f, size):
+    data = f.read(size)
+    if len(data) != size:
+        raise exceptions.ProtocolError('Connection closed after {} of {} bytes'.format(len(data), size))
+    return data
+
+
+def read_message(f):
+    """
+    Read a single message from the given binary file-like object.
+
+    :param f: Binary file-like object, e.g. from :meth:`~socket.socket.makefile`
+    :return: Decoded message, or `None` if the connection was closed before a new message started
+    """
+    header = f.read(HEADER.size)
+    if not header:
+        return None
+    if len(header) != HEADER.size:
+        raise exceptions.ProtocolError('Connection closed within message header')
+
+    size, = HEADER.unpack(header)
+    if size > MAX_MESSAGE_SIZE:
+        raise exceptions.ProtocolError('Message of {} bytes exceeds limit of {} bytes'.format(size, MAX_MESSAGE_SIZE))
+
+    try:
+        message = json.loads(_read_exactly(f, size).decode('utf-8'))
+    except ValueError as e:
+        raise exceptions.ProtocolError('Message is not valid JSON: {}'.format(e))
+    if not isinstance(message, dict):
+        raise exceptions.ProtocolError('Message must be a JSON object')
+    return message
+
+
+def write_message(f, message):
+    """
+    Write a single message to the given binary file-like object.
+
+    :param f: Binary file-like object, e.g. from :meth:`~socket.socket.makefile`
+    :param message: JSON serializable dict
+    """
+    data = json.dumps(message).encode('utf-8')
+    f.write(HEADER.pack(len(data)) + data)
+    f.flush()
+
+
+class Client(object):
+    """
+    Connection to a `ydf serve` daemon.
+    """
+
+    def __init__(self, path=None, timeout=None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(path or default_socket_path())
+        self.f = self.sock.makefile('rwb')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.f.close()
+        self.sock.close()
+
+    def request(self, message):
+        """
+        Send a request and wait for its response.
+
+        :param message: Request dict
+        :return: Response dict
+        """
+        write_message(self.f, message)
+        response = read_message(self.f)
+        if response is None:
+            raise exceptions.ProtocolError('Connection closed before a response was received')
+        return response
+
+    def ping(self):
+        """
+        Check the daemon is responding.
+
+        :return: Response dict containing the `ydf` version of the daemon
+        """
+        return self.request(dict(op=OP_PING))
+
+    def render(self, yaml=None, file=None, template=None, path=None, autoescape=None):
+        """
+        Render a Dockerfile from YAML text or a YAML file the daemon can read.
+
+        :param yaml: (Optional) YAML text to render
+        :param file: (Optional) Path to YAML file to render; used when `yaml` isn't given
+        :param template: (Optional) Name of template file; uses the daemon default if not given
+        :param path: (Optional) Sequence of paths to search for templates; uses the daemon default if not given
+        :param autoescape: (Optional) Flag indicating if rendered values should be HTML escaped
+        :return: The rendered Dockerfile
+        """
+        message = dict(op=OP_RENDER)
+        if yaml is not None:
+            message['yaml'] = yaml
+        if file is not None:
+            message['file'] = os.path.abspath(file)
+        if template is not None:
+            message['template'] = template
+        if path is not None:
+            message['path'] = [os.path.abspath(p) for p in path]
+        if autoescape is not None:
+            message['autoescape'] = autoescape
+
+        response = self.request(message)
+        if not response.get('ok'):
+            error = response.get('error') or {}
+            raise exceptions.RenderError(error.get('type', 'Error'), error.get('message', ''))
+        return response['dockerfile']
+
+
+def main(argv=None):
+    """
+    Render a YAML file, or stdin, through a running `ydf serve` daemon.
+
+    :param argv: (Optional) Command-line arguments
+    :return: Process exit code
+    """
+    parser = argparse.ArgumentParser(prog='ydf-client', description='Render YAML to a Dockerfile using `ydf serve`.')
+    parser.add_argument('yaml', help='YAML file to render; "-" reads YAML from stdin')
+    parser.add_argument('-S', '--socket', default=None, help='Unix socket of the daemon')
+    parser.add_argument('-t', '--template', default=None, help='Name of Jinja2 template used to build Dockerfile')
+    parser.add_argument('-s', '--search-path', action='append', default=None,
+                        help='File system path to search for templates')
+    parser.add_argument('-o', '--output', default=None, help='File to write the Dockerfile to; defaults to stdout')
+    parser.add_argument('--autoescape', dest='autoescape', action='store_true', default=None)
+    parser.add_argument('--no-autoescape', dest='autoescape', action='store_false')
+    args = parser.parse_args(argv)
+
+    try:
+        with Client(args.socket) as client:
+            if args.yaml == '-':
+                dockerfile = client.render(yaml=sys.stdin.read(), template=args.template, path=args.search_path,
+                                           autoescape=args.autoescape)
+            else:
+                dockerfile = client.render(file=args.yaml, template=args.template, path=args.search_path,
+                                           autoescape=args.autoescape)
+    except (OSError, exceptions.ServerError) as e:
+        print('ydf-client: {}'.format(e), file=sys.stderr)
+        return 1
+
+    if args.output:
+        with io.open(args.output, 'w') as f:
+            f.write(dockerfile)
+    else:
+        sys.stdout.write(dockerfile)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,226 @@
+"""
+    ydf/emitter
+    ~~~~~~~~~~~
+
+    Turn :mod:`~ydf.ir` instruction nodes into Dockerfile instruction text.
+"""
+
+import json
+
+from ydf import formatting, ir
+
+
+__all__ = ['emit']
+
+
+def _indent(node):
+    """
+    Get the indentation that aligns continuation lines with the first argument of an instruction.
+
+    :param node: :class:`~ydf.ir.Instruction` instance
+    :return: Number of spaces
+    """
+    return len(node.name) + 1
+
+
+def _shell_or_exec(value):
+    """
+    Format an argument that is a string in shell form or a list in exec form.
+
+    :param value: String or list
+    :return: The string as is, or the list as a JSON array
+    """
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def _from(node):
+    """
+    Format the image of a `FROM` instruction, followed by its tag or digest if given.
+
+    :param node: :class:`~ydf.ir.From` instance
+    :return: String of the image reference
+    """
+    delimiter = ':' if node.tag else '@'
+    return formatting.str_join_with_conditional_delimiter((node.image, node.tag, node.digest), delimiter)
+
+
+def _run(node):
+    """
+    Format the command of a `RUN` instruction; a list of shell commands is joined with `&&`, one per line.
+
+    :param node: :class:`~ydf.ir.Run` instance
+    :return: String of the command
+    """
+    if isinstance(node.command, str):
+        return node.command
+    if node.exec_form:
+        return json.dumps(node.command)
+    return formatting.list_with_conditional_command_line_breaks(node.command, indent=_indent(node))
+
+
+def _command(node):
+    """
+    Format the command of a `CMD` or `ENTRYPOINT` instruction in shell or exec form.
+
+    :param node: :class:`~ydf.ir.Cmd` or :class:`~ydf.ir.Entrypoint` instance
+    :return: String of the command
+    """
+    return _shell_or_exec(node.command)
+
+
+def _label(node):
+    """
+    Format the `key="value"` pairs of a `LABEL` instruction, one per line.
+
+    :param node: :class:`~ydf.ir.Label` instance
+    :return: String of quoted labels
+    """
+    return formatting.pairs_with_conditional_line_breaks(node.labels, indent=_indent(node), quote_escape=True)
+
+
+def _expose(node):
+    """
+    Format the port, or space separated ports, of an `EXPOSE` instruction.
+
+    :param node: :class:`~ydf.ir.Expose` instance
+    :return: String of ports
+    """
+    if isinstance(node.ports, int):
+        return str(node.ports)
+    return formatting.str_join_with_conditional_delimiter(node.ports, delimiter=' ')
+
+
+def _env(node):
+    """
+    Format the variables of an `ENV` instruction as `key=value` pairs, one per line, unless given as a string.
+
+    :param node: :class:`~ydf.ir.Env` instance
+    :return: String of variables
+    """
+    if isinstance(node.variables, str):
+        return node.variables
+    return formatting.pairs_with_conditional_line_breaks(node.variables, indent=_indent(node))
+
+
+def _paths(node):
+    """
+    Format the paths of an `ADD`, `COPY` or `VOLUME` instruction in shell or exec form.
+
+    :param node: :class:`~ydf.ir.Add`, :class:`~ydf.ir.Copy` or :class:`~ydf.ir.Volume` instance
+    :return: String of paths
+    """
+    return _shell_or_exec(node.paths)
+
+
+def _user(node):
+    """
+    Format the user, name or id, of a `USER` instruction.
+
+    :param node: :class:`~ydf.ir.User` instance
+    :return: String of the user
+    """
+    return str(node.user)
+
+
+def _workdir(node):
+    """
+    Format the path of a `WORKDIR` instruction.
+
+    :param node: :class:`~ydf.ir.Workdir` instance
+    :return: String of the path
+    """
+    return node.path
+
+
+def _arg(node):
+    """
+    Format the name of an `ARG` instruction, followed by `=` and its default value if given.
+
+    :param node: :class:`~ydf.ir.Arg` instance
+    :return: String of the build argument
+    """
+    return formatting.str_join_with_conditional_delimiter((node.arg_name, node.default), '=')
+
+
+def _onbuild(node):
+    """
+    Format the instruction an `ONBUILD` instruction triggers, including its name.
+
+    :param node: :class:`~ydf.ir.Onbuild` instance
+    :return: String of the triggered instruction
+    """
+    return emit(node.instruction)
+
+
+def _stopsignal(node):
+    """
+    Format the signal, name or number, of a `STOPSIGNAL` instruction.
+
+    :param node: :class:`~ydf.ir.Stopsignal` instance
+    :return: String of the signal
+    """
+    return str(node.signal)
+
+
+def _healthcheck(node):
+    """
+    Format the `--option=value` flags and `CMD` instruction of a `HEALTHCHECK` instruction.
+
+    :param node: :class:`~ydf.ir.Healthcheck` instance
+    :return: String of the options and command, or an empty string if it has no command
+    """
+    if node.cmd is None:
+        return ''
+    return '{} {}'.format(formatting.str_join_instruction_option_pairs(node.options), emit(node.cmd))
+
+
+def _shell(node):
+    """
+    Format the shell of a `SHELL` instruction as a JSON array.
+
+    :param node: :class:`~ydf.ir.Shell` instance
+    :return: String of the JSON array
+    """
+    return json.dumps(node.args)
+
+
+def _raw(node):
+    """
+    Format an instruction that has no node type of its own, whose text is emitted as is.
+
+    :param node: :class:`~ydf.ir.Raw` instance
+    :return: String of the instruction text
+    """
+    return node.text
+
+
+EMITTERS = {
+    ir.From: _from,
+    ir.Run: _run,
+    ir.Cmd: _command,
+    ir.Label: _label,
+    ir.Expose: _expose,
+    ir.Env: _env,
+    ir.Add: _paths,
+    ir.Copy: _paths,
+    ir.Entrypoint: _command,
+    ir.Volume: _paths,
+    ir.User: _user,
+    ir.Workdir: _workdir,
+    ir.Arg: _arg,
+    ir.Onbuild: _onbuild,
+    ir.Stopsignal: _stopsignal,
+    ir.Healthcheck: _healthcheck,
+    ir.Shell: _shell,
+    ir.Raw: _raw,
+}
+
+
+def emit(node):
+    """
+    Turn an instruction node into a Dockerfile instruction string.
+
+    :param node: :class:`~ydf.ir.Instruction` instance
+    :return: String of the Dockerfile instruction
+    """
+    return node.name + ' ' + EMITTERS[type(node)](node)
@@ -112,3 +112,45 @@ class ArgumentInstructionUnknownError(InstructionError):
     def __init__(self, name, arg):
         msg = '[{}] - Name: {}'.format(name, arg)
         super(ArgumentInstructionUnknownError, self).__init__(msg)
+
+
+class InstructionKeyCountError(InstructionError):
+    """
+    Exception raised when an instruction object doesn't have exactly one key, the name of the instruction.
+    """
+
+    def __init__(self, count, index=None):
+        where = 'Instruction' if index is None else 'Instruction {}'.format(index)
+        msg = '{} has {} keys; expected exactly one instruction name'.format(where, count)
+        super(InstructionKeyCountError, self).__init__(msg)
+        self.count = count
+        self.index = index
+
+
+class IncludeError(Exception):
+    """
+    Exception raised when a YAML `!include` tag refers to a file or key that can't be loaded.
+    """
+
+
+class ServerError(Exception):
+    """
+    Base exception type for all errors communicating with a `ydf serve` daemon.
+    """
+
+
+class ProtocolError(ServerError):
+    """
+    Exception raised when a message sent to or received from a `ydf serve` daemon is malformed.
+    """
+
+
+class RenderError(ServerError):
+    """
+    Exception raised by a client when a `ydf serve` daemon fails to render a request.
+    """
+
+    def __init__(self, error_type, message):
+        self.error_type = error_type
+        self.message = message
+        super(RenderError, self).__init__('{}: {}'.format(error_type, message))
@@ -3,8 +3,13 @@
     ~~~~~~~~~~~~~~
 
     Helper functions for cleanly formatting instructions.
+
+    Each `write_*` function writes to a caller-supplied text buffer the same text that its string building
+    counterpart returns.
 """
 
+import io
+
 
 DEFAULT_LINE_BREAK = ' \\\n'
 DEFAULT_COMMAND_LINE_BREAK = ' && \\\n'
@@ -14,40 +19,127 @@ DEFAULT_KEY_VALUE_DELIMITER = '='
 DEFAULT_STR_JOIN_DELIMITER = None
 
 
-def _escape(value, escape=DEFAULT_QUOTE_ESCAPE):
-    """
-    Optionally double-quote escape the given string value.
+# Separators between items, built once for each combination of line break, indentation and quote.
+BREAKS = {}
 
-    :param escape: Flag to indicate if the given string should be quote escaped.
-    :return: String that is optionally escaped.
-    """
-    template = '"{}"' if escape else '{}'
-    return template.format(value)
 
-
-def _break(line_break=DEFAULT_LINE_BREAK, indent=DEFAULT_INDENT):
+def _break(line_break=DEFAULT_LINE_BREAK, indent=DEFAULT_INDENT, quote=''):
     """
     Build a string that represents a line break with an indentation to align with
     the previous line.
 
     :param line_break: String to use for a line break
     :param indent: Number of spaces to indent after the line break
+    :param quote: (Optional) Quote that closes the previous item and opens the next
     :return: String that performs a line break and indentation to align
     """
-    return line_break + ' ' * indent
+    key = (line_break, indent, quote)
+    try:
+        return BREAKS[key]
+    except KeyError:
+        BREAKS[key] = value = quote + line_break + ' ' * indent + quote
+        return value
+
+
+def write_list_with_conditional_line_breaks(buffer, lst, line_break=DEFAULT_LINE_BREAK, indent=DEFAULT_INDENT,
+                                            quote_escape=DEFAULT_QUOTE_ESCAPE):
+    """
+    Write items to a text buffer with line breaks & indentation for lists with more than one item.
+
+    Items are written one piece at a time, so no string is built for each item or for the whole list.
+
+    :param buffer: File-like object to write to, e.g. :class:`~io.StringIO`
+    :param lst: Collection of items to line separate
+    :param line_break: String used to separate each item
+    :param indent: Number of spaces used to indent each new line
+    :param quote_escape: Optional flag to indicate if each item should be escaped with double quotes
+    """
+    write = buffer.write
+    quote = '"' if quote_escape else ''
+    separator = _break(line_break, indent, quote)
+
+    items = iter(lst)
+    for value in items:
+        if quote:
+            write(quote)
+        write(value.strip())
+        break
+    else:
+        return
+
+    for value in items:
+        write(separator)
+        write(value.strip())
+    if quote:
+        write(quote)
 
 
-def _line_break_join(lst, line_break=DEFAULT_LINE_BREAK, indent=DEFAULT_INDENT):
+def write_list_with_conditional_command_line_breaks(buffer, lst, line_break=DEFAULT_COMMAND_LINE_BREAK,
+                                                    indent=DEFAULT_INDENT, quote_escape=DEFAULT_QUOTE_ESCAPE):
     """
-    Build a multi-line string using the given line break and alignment indentation size for
-    each item in the list.
+    Write individual commands to a text buffer with line breaks & indentation for lists with more than one item.
 
-    :param lst: List of items to separate with indented line breaks
-    :param line_break: String to use for each line break
-    :param indent: Number of spaces for alignment indentation
-    :return: Multi-line string with indented line breaks for each item
+    :param buffer: File-like object to write to, e.g. :class:`~io.StringIO`
+    :param lst: Collection of items that represent individual commands to line separate
+    :param line_break: String used to separate each item
+    :param indent: Number of spaces used to indent each new line
+    :param quote_escape: Optional flag to indicate if each item should be escaped with double quotes
     """
-    return _break(line_break, indent).join(lst)
+    write_list_with_conditional_line_breaks(buffer, lst, line_break, indent, quote_escape)
+
+
+def write_pairs_with_conditional_line_breaks(buffer, pairs, delimiter=DEFAULT_KEY_VALUE_DELIMITER,
+                                             line_break=DEFAULT_LINE_BREAK, indent=DEFAULT_INDENT,
+                                             quote_escape=DEFAULT_QUOTE_ESCAPE):
+    """
+    Write key/value pairs to a text buffer with line breaks & indentation for sequences with more than one item.
+
+    :param buffer: File-like object to write to, e.g. :class:`~io.StringIO`
+    :param pairs: Iterable of key/value tuples to line separate
+    :param delimiter: Delimiter character that should be displayed between each key/value pair
+    :param line_break: String used to separate each item
+    :param indent: Number of spaces used to indent each new line
+    :param quote_escape: Optional flag to indicate if each key and value should be escaped with double quotes
+    """
+    write = buffer.write
+    quote = '"' if quote_escape else ''
+    separator = _break(line_break, indent, quote)
+    delimiter = quote + delimiter + quote if quote else delimiter
+
+    items = iter(pairs)
+    for key, value in items:
+        if quote:
+            write(quote)
+        write(key.strip())
+        write(delimiter)
+        write(value.strip())
+        break
+    else:
+        return
+
+    for key, value in items:
+        write(separator)
+        write(key.strip())
+        write(delimiter)
+        write(value.strip())
+    if quote:
+        write(quote)
+
+
+def write_dict_with_conditional_line_breaks(buffer, dct, delimiter=DEFAULT_KEY_VALUE_DELIMITER,
+                                            line_break=DEFAULT_LINE_BREAK, indent=DEFAULT_INDENT,
+                                            quote_escape=DEFAULT_QUOTE_ESCAPE):
+    """
+    Write a dict to a text buffer with line breaks & indentation for dicts with more than one item.
+
+    :param buffer: File-like object to write to, e.g. :class:`~io.StringIO`
+    :param dct: Collection of key/values to line separate
+    :param delimiter: Delimiter character that should be displayed between each key/value pair
+    :param line_break: String used to separate each item
+    :param indent: Number of spaces used to indent each new line
+    :param quote_escape: Optional flag to indicate if each key and value should be escaped with double quotes
+    """
+    write_pairs_with_conditional_line_breaks(buffer, dct.items(), delimiter, line_break, indent, quote_escape)
 
 
 def list_with_conditional_line_breaks(lst, line_break=DEFAULT_LINE_BREAK, indent=DEFAULT_INDENT,
@@ -61,7 +153,9 @@ def list_with_conditional_line_breaks(lst, line_break=DEFAULT_LINE_BREAK, indent
     :param quote_escape: Optional flag to indicate if each item should be escaped with double quotes
     :return: Multi-line string that is well formed for human readers
     """
-    return _line_break_join((_escape(v.strip(), quote_escape) for v in lst), line_break, indent)
+    buffer = io.StringIO()
+    write_list_with_conditional_line_breaks(buffer, lst, line_break, indent, quote_escape)
+    return buffer.getvalue()
 
 
 def list_with_conditional_command_line_breaks(lst, line_break=DEFAULT_COMMAND_LINE_BREAK, indent=DEFAULT_INDENT,
@@ -78,6 +172,23 @@ def list_with_conditional_command_line_breaks(lst, line_break=DEFAULT_COMMAND_LI
     return list_with_conditional_line_breaks(lst, line_break, indent, quote_escape)
 
 
+def pairs_with_conditional_line_breaks(pairs, delimiter=DEFAULT_KEY_VALUE_DELIMITER, line_break=DEFAULT_LINE_BREAK,
+                                       indent=DEFAULT_INDENT, quote_escape=DEFAULT_QUOTE_ESCAPE):
+    """
+    Build a string with line breaks & indentation for sequences of key/value pairs with more than one item.
+
+    :param pairs: Iterable of key/value tuples to line separate
+    :param delimiter: Delimiter character that should be displayed between each key/value pair
+    :param line_break: String used to separate each item
+    :param indent: Number of spaces used to indent each new line
+    :param quote_escape: Optional flag to indicate if each key and value should be escaped with double quotes
+    :return: Multi-line string that is well formed for human readers
+    """
+    buffer = io.StringIO()
+    write_pairs_with_conditional_line_breaks(buffer, pairs, delimiter, line_break, indent, quote_escape)
+    return buffer.getvalue()
+
+
 def dict_with_conditional_line_breaks(dct, delimiter=DEFAULT_KEY_VALUE_DELIMITER, line_break=DEFAULT_LINE_BREAK,
                                       indent=DEFAULT_INDENT, quote_escape=DEFAULT_QUOTE_ESCAPE):
     """
@@ -90,9 +201,7 @@ def dict_with_conditional_line_breaks(dct, delimiter=DEFAULT_KEY_VALUE_DELIMITER
     :param quote_escape: Optional flag to indicate if each key and value should be escaped with double quotes
     :return: Multi-line string that is well formed for human readers
     """
-    pairs = (delimiter.join((_escape(k.strip(), quote_escape), _escape(v.strip(), quote_escape)))
-             for k, v in dct.items())
-    return _line_break_join(pairs, line_break, indent)
+    return pairs_with_conditional_line_breaks(dct.items(), delimiter, line_break, indent, quote_escape)
 
 
 def str_join_with_conditional_delimiter(parts, delimiter=DEFAULT_STR_JOIN_DELIMITER):
@@ -117,4 +226,16 @@ def str_join_instruction_options(dct):
     :param dct: Collection key/value pairs to join
     :return: Formatting string with double-dash options
     """
-    return ''.join(('--{}={}'.format(k.lower(), v) for k, v in dct.items())) if dct else ''
+    return str_join_instruction_option_pairs(dct.items() if dct else None)
+
+
+def str_join_instruction_option_pairs(pairs):
+    """
+    Build a string from the given key/value pairs of optional instruction arguments.
+
+    :param pairs: (Optional) Iterable of key/value tuples to join, e.g. a generator
+    :return: Formatting string with double-dash options, or an empty string if there are none
+    """
+    # Instructions rarely have more than a couple of options, which a join builds faster than a buffer. An empty
+    # iterable, including an exhausted generator, which is always truthy, joins to an empty string.
+    return ''.join(['--{}={}'.format(k.lower(), v) for k, v in pairs or ()])
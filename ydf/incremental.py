@@ -0,0 +1,232 @@
+"""
+    ydf/incremental
+    ~~~~~~~~~~~~~~~
+
+    Skip rendering YAML files whose inputs haven't changed since the last run.
+
+    A manifest on disk records, for each YAML file, the state of the file and of the files it includes when its
+    Dockerfile was last rendered along with a digest of everything else that affects the output: the `ydf` version, the
+    template search path, options and the contents of every template file used.
+"""
+
+import hashlib
+import io
+import json
+import os
+
+from ydf import __version__, batch, parallel, passes, templating, yaml_ext
+
+
+__all__ = ['Manifest', 'context_digest', 'render_files']
+
+
+DEFAULT_MANIFEST = '.ydf-manifest.json'
+MANIFEST_FORMAT = 2
+
+CHECK_HASH = 'hash'
+CHECK_MTIME = 'mtime'
+CHECKS = (CHECK_HASH, CHECK_MTIME)
+
+
+def file_digest(path):
+    """
+    Compute the digest of the file contents at the given path.
+
+    :param path: Path to file on disk
+    :return: Hex digest string
+    """
+    digest = hashlib.sha256()
+    with io.open(path, 'rb') as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+
+def context_digest(template=templating.DEFAULT_TEMPLATE_NAME, path=templating.DEFAULT_TEMPLATE_PATH, **env_options):
+    """
+    Compute the digest of everything other than the YAML file itself that affects a rendered Dockerfile,
+    including the enabled :mod:`~ydf.passes` and the YAML loader backend, as backends parse some values
+    differently, e.g. `yes` is a boolean in YAML 1.1.
+
+    :param template: Name of template file to render
+    :param path: Path on disk to search for templates to render
+    :param env_options: Options given to :func:`~ydf.templating.load_template`
+    :return: Hex digest string
+    """
+    path = (path,) if isinstance(path, str) else tuple(path)
+
+    digest = hashlib.sha256()
+    digest.update(json.dumps([__version__, template, path, sorted(env_options.items()),
+                              list(passes.ENABLED), yaml_ext.loader_name()]).encode('utf-8'))
+    for filename in templating.template_dependencies(template, path, **env_options):
+        digest.update(filename.encode('utf-8'))
+        digest.update(file_digest(filename).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _same_state(entry, state, check=CHECK_HASH):
+    """
+    Check if a recorded file state matches the current one.
+
+    :param entry: Recorded state of the file
+    :param state: Current state of the file returned by :meth:`~ydf.incremental.Manifest.state`
+    :param check: Method used to detect changes; `hash` of contents or `mtime` and size
+    :return: `True` if the file hasn't changed, `False` otherwise
+    """
+    if entry is None or state is None:
+        return False
+    if check == CHECK_HASH:
+        return entry.get('digest') == state['digest']
+    return entry.get('mtime') == state['mtime'] and entry.get('size') == state['size']
+
+
+class Manifest(object):
+    """
+    Record of the YAML files rendered by previous runs, stored as JSON on disk.
+    """
+
+    def __init__(self, path=DEFAULT_MANIFEST, context=None, files=None):
+        self.path = path
+        self.context = context
+        self.files = files or {}
+
+    @classmethod
+    def load(cls, path=DEFAULT_MANIFEST):
+        """
+        Load the manifest at the given path; a missing or unreadable manifest is treated as empty.
+
+        :param path: Path to manifest file on disk
+        :return: :class:`~ydf.incremental.Manifest` instance
+        """
+        try:
+            with io.open(path, 'r') as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError):
+            return cls(path)
+
+        if data.get('format') != MANIFEST_FORMAT:
+            return cls(path)
+
+        return cls(path, data.get('context'), data.get('files'))
+
+    def save(self):
+        """
+        Write the manifest to disk, replacing the previous version atomically.
+        """
+        tmp = '{}.tmp'.format(self.path)
+        with io.open(tmp, 'w') as f:
+            f.write(json.dumps(dict(format=MANIFEST_FORMAT, context=self.context, files=self.files),
+                               indent=2, sort_keys=True))
+        os.replace(tmp, self.path)
+
+    def reset(self, context):
+        """
+        Forget every recorded file because the rendering context has changed.
+
+        :param context: Digest returned by :func:`~ydf.incremental.context_digest`
+        """
+        self.context = context
+        self.files = {}
+
+    def state(self, path, check=CHECK_HASH):
+        """
+        Capture the current state of the YAML file at the given path.
+
+        :param path: Path to YAML file on disk
+        :param check: Method used to detect changes; `hash` of contents or `mtime` and size
+        :return: Dict describing the file, or `None` if it can't be read
+        """
+        try:
+            st = os.stat(path)
+            state = dict(mtime=st.st_mtime, size=st.st_size)
+            if check == CHECK_HASH:
+                state['digest'] = file_digest(path)
+        except (IOError, OSError):
+            return None
+        return state
+
+    def is_fresh(self, path, output, state, check=CHECK_HASH):
+        """
+        Check if the Dockerfile of the YAML file at the given path is up-to-date.
+
+        :param path: Absolute path to YAML file
+        :param output: Path to the Dockerfile rendered from the YAML file
+        :param state: Current state of the YAML file returned by :meth:`~ydf.incremental.Manifest.state`
+        :param check: Method used to detect changes; `hash` of contents or `mtime` and size
+        :return: `True` if rendering can be skipped, `False` otherwise
+        """
+        entry = self.files.get(path)
+        if entry is None or state is None or entry.get('output') != output:
+            return False
+
+        if not _same_state(entry, state, check):
+            return False
+
+        for include, include_entry in entry.get('includes', {}).items():
+            if not _same_state(include_entry, self.state(include, check), check):
+                return False
+
+        return os.path.exists(output)
+
+    def record(self, path, output, state, includes=(), check=CHECK_HASH):
+        """
+        Record that the Dockerfile of the YAML file at the given path was rendered.
+
+        :param path: Absolute path to YAML file
+        :param output: Path to the Dockerfile rendered from the YAML file
+        :param state: State of the YAML file returned by :meth:`~ydf.incremental.Manifest.state`
+        :param includes: (Optional) Absolute paths of files the YAML file included with `!include`
+        :param check: Method used to detect changes; `hash` of contents or `mtime` and size
+        """
+        self.files[path] = dict(state, output=output, includes={p: self.state(p, check) for p in includes})
+
+
+def render_files(paths, template=templating.DEFAULT_TEMPLATE_NAME, path=templating.DEFAULT_TEMPLATE_PATH,
+                 output_pattern=batch.DEFAULT_OUTPUT_PATTERN, output_dir=None, jobs=parallel.DEFAULT_JOBS,
+                 chunksize=None, manifest=DEFAULT_MANIFEST, check=CHECK_HASH, **env_options):
+    """
+    Render each YAML file that changed since the last run and write the Dockerfile to disk.
+
+    Files whose state matches the manifest and whose Dockerfile exists are skipped without being parsed
+    or rendered. The manifest is updated with every file rendered successfully.
+
+    :param paths: Sequence of YAML file paths
+    :param template: Name of template file to render
+    :param path: Path on disk to search for templates to render
+    :param output_pattern: Filename pattern for each generated Dockerfile
+    :param output_dir: (Optional) Directory to write generated Dockerfiles to
+    :param jobs: Number of processes used to render; zero or less uses every available CPU
+    :param chunksize: (Optional) Number of files sent to a worker process at a time
+    :param manifest: Path to manifest file on disk
+    :param check: Method used to detect changes; `hash` of contents or `mtime` and size
+    :param env_options: Options given to :func:`~ydf.templating.load_template`
+    :return: Generator that yields a :class:`~ydf.batch.Result` for each path, in order
+    """
+    manifest = Manifest.load(manifest)
+    context = context_digest(template, path, **env_options)
+    if manifest.context != context:
+        manifest.reset(context)
+
+    pending, stale = [], []
+    for yaml_path in paths:
+        output = batch.output_path(yaml_path, output_pattern, output_dir)
+        key = os.path.abspath(yaml_path)
+        state = manifest.state(key, check)
+        fresh = manifest.is_fresh(key, output, state, check)
+        pending.append((yaml_path, output, key, state, fresh))
+        if not fresh:
+            stale.append(yaml_path)
+
+    results = batch.render_files(stale, template, path, output_pattern, output_dir, jobs, chunksize, **env_options)
+
+    try:
+        for yaml_path, output, key, state, fresh in pending:
+            if fresh:
+                yield batch.Result(yaml_path, output, skipped=True)
+                continue
+
+            result = next(results)
+            if result.ok and state is not None:
+                manifest.record(key, output, state, result.includes, check)
+            yield result
+    finally:
+        manifest.save()
@@ -6,9 +6,8 @@
 """
 
 import functools
-import json
 
-from ydf import arguments, formatting, meta
+from ydf import arguments, emitter, exceptions, ir, meta, passes, profiling
 
 
 __all__ = []
@@ -32,16 +31,225 @@ STOPSIGNAL = 'STOPSIGNAL'
 HEALTHCHECK = 'HEALTHCHECK'
 SHELL = 'SHELL'
 
+INSTRUCTION_SEPARATOR = '\n\n'
+
+
+def instruction_item(instruction, index=None):
+    """
+    Get the name and argument of the given instruction object (parsed from YAML).
+
+    :param instruction: Mapping of an instruction name to its argument.
+    :param index: (Optional) Position of the instruction within its document, used when reporting errors.
+    :return: Tuple of the instruction name and argument.
+    :raises InstructionKeyCountError: If the mapping doesn't have exactly one key.
+    """
+    items = instruction.items()
+    if len(items) != 1:
+        raise exceptions.InstructionKeyCountError(len(items), index)
+    return next(iter(items))
+
+
+def get_instruction(name, arg):
+    """
+    Get the instruction function for the given instruction name and argument.
+
+    :param name: Name of the instruction
+    :param arg: Python object representing the instruction arguments
+    :return: Function decorated with :func:`~ydf.instructions.instruction`
+    :raises ArgumentInstructionUnknownError: If no instruction has the given name and argument type.
+    """
+    try:
+        return meta.get_instruction(name, arg)
+    except KeyError:
+        raise exceptions.ArgumentInstructionUnknownError(name, type(arg).__name__)
+
 
 def convert_instruction(instruction):
     """
     Convert the given instruction object (parsed from YAML) to a Dockerfile instruction string.
 
+    The instruction object is not modified, so a parsed document can be converted any number of times.
+
     :param instruction: Python object representing a Dockerfile instruction.
     :return: String representation of the Dockerfile instruction.
     """
-    name, arg = instruction.popitem()
-    return meta.get_instruction(name, arg)(arg)
+    name, arg = instruction_item(instruction)
+    return get_instruction(name, arg)(arg)
+
+
+def build_instruction(instruction):
+    """
+    Build the intermediate representation of the given instruction object (parsed from YAML).
+
+    The instruction object is not modified.
+
+    :param instruction: Python object representing a Dockerfile instruction.
+    :return: :class:`~ydf.ir.Instruction` node of the Dockerfile instruction.
+    """
+    name, arg = instruction_item(instruction)
+    return _build_instruction(name, arg)
+
+
+def _build_instruction(name, arg):
+    """
+    Validate an instruction argument and build the node of the instruction.
+
+    :param name: Name of the instruction
+    :param arg: Python object representing the instruction arguments
+    :return: :class:`~ydf.ir.Instruction` node of the Dockerfile instruction.
+    """
+    func = get_instruction(name, arg)
+    validate = getattr(func, 'validate', None)
+    if validate is not None:
+        arg = validate(arg)
+    node = func.build(arg)
+    return node if isinstance(node, ir.Instruction) else ir.Raw(func.instruction_name, node)
+
+
+def _convert_instruction(name, arg):
+    """
+    Validate an instruction argument, build the node of the instruction and emit it as text.
+
+    Same as emitting the node from :func:`~ydf.instructions._build_instruction`, inlined as it runs for every
+    instruction of a document.
+
+    :param name: Name of the instruction
+    :param arg: Python object representing the instruction arguments
+    :return: String representation of the Dockerfile instruction.
+    """
+    func = get_instruction(name, arg)
+    validate = getattr(func, 'validate', None)
+    if validate is not None:
+        arg = validate(arg)
+    node = func.build(arg)
+    emit = emitter.EMITTERS.get(type(node))
+    if emit is None:
+        node = ir.Raw(func.instruction_name, node)
+        emit = emitter.EMITTERS[ir.Raw]
+    return node.name + ' ' + emit(node)
+
+
+def _build_instruction_profiled(name, arg):
+    """
+    Validate an instruction argument and build the node of the instruction, recording the dispatch, validation
+    and build stages.
+
+    :param name: Name of the instruction
+    :param arg: Python object representing the instruction arguments
+    :return: :class:`~ydf.ir.Instruction` node of the Dockerfile instruction.
+    """
+    with profiling.stage(profiling.STAGE_DISPATCH):
+        func = get_instruction(name, arg)
+
+    validate = getattr(func, 'validate', None)
+    if validate is not None:
+        with profiling.stage(profiling.STAGE_VALIDATE):
+            arg = validate(arg)
+
+    with profiling.stage(profiling.STAGE_BUILD):
+        node = func.build(arg)
+        return node if isinstance(node, ir.Instruction) else ir.Raw(func.instruction_name, node)
+
+
+def _emit_profiled(node):
+    """
+    Turn an instruction node into text, recording the format stage.
+
+    :param node: :class:`~ydf.ir.Instruction` instance
+    :return: String representation of the Dockerfile instruction.
+    """
+    with profiling.stage(profiling.STAGE_FORMAT):
+        return emitter.emit(node)
+
+
+def _memoized_gen(instructions, convert):
+    """
+    Convert each of the given instruction objects, converting objects that are the same object once.
+
+    :param instructions: Iterable of Python objects representing Dockerfile instructions.
+    :param convert: Function that converts an instruction name and argument
+    :return: Generator that yields the result of `convert` for each instruction
+    """
+    # Memo of object `id` to an `(object, result)` tuple; holding the object stops its `id` being reused by another.
+    converted = {}
+
+    for index, instruction in enumerate(instructions):
+        entry = converted.get(id(instruction))
+        if entry is None:
+            name, arg = instruction_item(instruction, index)
+            if isinstance(arg, (dict, list)):
+                key = (name, id(arg))
+                arg_entry = converted.get(key)
+                if arg_entry is None:
+                    arg_entry = converted[key] = (arg, convert(name, arg))
+                result = arg_entry[1]
+            else:
+                result = convert(name, arg)
+            entry = converted[id(instruction)] = (instruction, result)
+        yield entry[1]
+
+
+def build_instructions_gen(instructions):
+    """
+    Build the intermediate representation of each of the given instruction objects (parsed from YAML).
+
+    The instruction objects are not modified. Instructions, or instruction arguments, that are the same object,
+    e.g. a YAML alias of an anchored node, are validated and built once and the same node is reused.
+
+    :param instructions: Iterable of Python objects representing Dockerfile instructions.
+    :return: Generator that yields a :class:`~ydf.ir.Instruction` node for each Dockerfile instruction.
+    """
+    return _memoized_gen(instructions, _build_instruction_profiled if profiling.enabled() else _build_instruction)
+
+
+def convert_instructions_gen(instructions):
+    """
+    Convert each of the given instruction objects (parsed from YAML) to a Dockerfile instruction string.
+
+    Each instruction is built into a :mod:`~ydf.ir` node, passes enabled with :func:`~ydf.passes.set_enabled`
+    are applied to the nodes and then each node is emitted as text. The instruction objects are not modified.
+    Instructions, or instruction arguments, that are the same object, e.g. a YAML alias of an anchored node,
+    are validated, built and emitted once and the result is reused.
+
+    :param instructions: Iterable of Python objects representing Dockerfile instructions.
+    :return: Generator that yields the string representation of each Dockerfile instruction.
+    """
+    profiled = profiling.enabled()
+
+    if passes.ENABLED:
+        return _emit_nodes_gen(passes.apply(build_instructions_gen(instructions)),
+                               _emit_profiled if profiled else emitter.emit)
+    if profiled:
+        return _memoized_gen(instructions, lambda name, arg: _emit_profiled(_build_instruction_profiled(name, arg)))
+    return _memoized_gen(instructions, _convert_instruction)
+
+
+def _emit_nodes_gen(nodes, emit):
+    """
+    Emit each of the given nodes as text, emitting nodes that are the same object once.
+
+    :param nodes: Iterable of :class:`~ydf.ir.Instruction` instances
+    :param emit: Function that turns a node into text
+    :return: Generator that yields the string representation of each Dockerfile instruction.
+    """
+    emitted = {}
+    for node in nodes:
+        entry = emitted.get(id(node))
+        if entry is None:
+            entry = emitted[id(node)] = (node, emit(node))
+        yield entry[1]
+
+
+def convert_instructions(instructions):
+    """
+    Convert the given instruction objects (parsed from YAML) to a block of Dockerfile instructions.
+
+    Each instruction is followed by a blank line. The instruction objects are not modified.
+
+    :param instructions: Iterable of Python objects representing Dockerfile instructions.
+    :return: String of all Dockerfile instructions.
+    """
+    return ''.join(instruction + INSTRUCTION_SEPARATOR for instruction in convert_instructions_gen(instructions))
 
 
 def instruction(name, type, desc):
@@ -49,6 +257,10 @@ def instruction(name, type, desc):
     Decorate a function to indicate that it is responsible for converting a python type to a Docker
     instruction.
 
+    The decorated function builds a :mod:`~ydf.ir` node; calling the instruction function returns the node
+    emitted as text, while its `build` attribute is the undecorated function. A function that returns the
+    formatted arguments as text instead is emitted as a :class:`~ydf.ir.Raw` node.
+
     :param name: Name of docker instruction
     :param type: Type of python object it can convert
     :param desc: Short description of expected format for the python object.
@@ -56,10 +268,12 @@ def instruction(name, type, desc):
     def decorator(func):
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            return '{} {}'.format(name, func(*args, **kwargs))
+            node = func(*args, **kwargs)
+            return emitter.emit(node if isinstance(node, ir.Instruction) else ir.Raw(name, node))
         wrapper.instruction_name = name
         wrapper.instruction_type = type
         wrapper.instruction_desc = desc
+        wrapper.build = func
         return wrapper
     return decorator
 
@@ -72,10 +286,12 @@ def from_str(arg):
     Convert a :class:`~str` to a `FROM` instruction.
 
     :param arg: String that represents instruction arguments.
-    :return: Fully-qualified `FROM` instruction string.
+    :return: :class:`~ydf.ir.From` node of the `FROM` instruction.
     """
     image, delimiter, tag_or_digest = (arg.get(k) for k in ('image', 'delimiter', 'tag_or_digest'))
-    return formatting.str_join_with_conditional_delimiter((image, tag_or_digest), delimiter)
+    if delimiter == '@':
+        return ir.From(image, digest=tag_or_digest)
+    return ir.From(image, tag=tag_or_digest)
 
 
 @arguments.required(name='dict', required_type=dict)
@@ -88,11 +304,9 @@ def from_dict(arg):
     Convert a :class:`~dict` to a `FROM` instruction.
 
     :param arg: Dict that represents instruction arguments.
-    :return: Fully-qualified `FROM` instruction string.
+    :return: :class:`~ydf.ir.From` node of the `FROM` instruction.
     """
-    image, tag, digest = (arg.get(k) for k in ('image', 'tag', 'digest'))
-    delimiter = ':' if tag else '@'
-    return formatting.str_join_with_conditional_delimiter((image, tag, digest), delimiter)
+    return ir.From(arg['image'], arg.get('tag'), arg.get('digest'))
 
 
 @arguments.required(name='string', required_type=str)
@@ -102,9 +316,9 @@ def run_str(arg):
     Convert a :class:`~str` to a `RUN` instruction.
 
     :param arg: String that represents instruction arguments.
-    :return: Fully-qualified `RUN` instruction.
+    :return: :class:`~ydf.ir.Run` node of the `RUN` instruction.
     """
-    return arg
+    return ir.Run(arg)
 
 
 @arguments.required(name='list', required_type=list)
@@ -114,10 +328,9 @@ def run_list(arg):
     Convert a :class:`~list` to a `RUN` instruction.
 
     :param arg: List that represents instruction arguments.
-    :return: Fully-qualified `RUN` instruction.
+    :return: :class:`~ydf.ir.Run` node of the `RUN` instruction.
     """
-    indent = len(run_list.instruction_name) + 1
-    return formatting.list_with_conditional_command_line_breaks(arg, indent=indent)
+    return ir.Run(arg)
 
 
 @arguments.required(name='dict', required_type=dict)
@@ -129,11 +342,9 @@ def run_dict(arg):
     Convert a :class:`~dict` to a `RUN` instruction.
 
     :param arg: Dict that represents instruction arguments.
-    :return: Fully-qualified `RUN` instruction.
+    :return: :class:`~ydf.ir.Run` node of the `RUN` instruction.
     """
-    executable = arg['executable']
-    params = arg.get('params', [])
-    return json.dumps([executable] + params)
+    return ir.Run([arg['executable']] + arg.get('params', []), exec_form=True)
 
 
 @arguments.required(name='string', required_type=str)
@@ -143,9 +354,9 @@ def cmd_str(arg):
     Convert a :class:`~str` to a `CMD` instruction.
 
     :param arg: String that represents instruction arguments.
-    :return: Fully-qualified `CMD` instruction.
+    :return: :class:`~ydf.ir.Cmd` node of the `CMD` instruction.
     """
-    return arg
+    return ir.Cmd(arg)
 
 
 @arguments.required(name='list', required_type=list)
@@ -155,9 +366,9 @@ def cmd_list(arg):
     Convert a :class:`~list` to a `CMD` instruction.
 
     :param arg: List that represents instruction arguments.
-    :return: Fully-qualified `CMD` instruction.
+    :return: :class:`~ydf.ir.Cmd` node of the `CMD` instruction.
     """
-    return json.dumps(arg)
+    return ir.Cmd(arg)
 
 
 @arguments.required(name='dict', required_type=dict)
@@ -169,11 +380,9 @@ def cmd_dict(arg):
     Convert a :class:`~dict` to a `CMD` instruction.
 
     :param arg: Dict that represents instruction arguments.
-    :return: Fully-qualified `CMD` instruction.
+    :return: :class:`~ydf.ir.Cmd` node of the `CMD` instruction.
     """
-    executable = arg['executable']
-    params = arg.get('params', [])
-    return json.dumps([executable] + params)
+    return ir.Cmd([arg['executable']] + arg.get('params', []))
 
 
 @arguments.required(name='dict', required_type=dict)
@@ -183,10 +392,9 @@ def label_dict(arg):
     Convert a :class:`~dict` to a `LABEL` instruction.
 
     :param arg: Dict that represents instruction arguments.
-    :return: Fully-qualified `LABEL` instruction.
+    :return: :class:`~ydf.ir.Label` node of the `LABEL` instruction.
     """
-    indent = len(label_dict.instruction_name) + 1
-    return formatting.dict_with_conditional_line_breaks(arg, indent=indent, quote_escape=True)
+    return ir.Label(list(arg.items()))
 
 
 @arguments.required(name='int', required_type=int)
@@ -196,9 +404,9 @@ def expose_int(arg):
     Convert a :class:`~int` to a `EXPOSE` instruction.
 
     :param arg: Int that represents instruction arguments.
-    :return: Fully-qualified `EXPOSE` instruction.
+    :return: :class:`~ydf.ir.Expose` node of the `EXPOSE` instruction.
     """
-    return str(arg)
+    return ir.Expose(arg)
 
 
 @arguments.required(name='list', required_type=list)
@@ -208,9 +416,9 @@ def expose_list(arg):
     Convert a :class:`~list` to a `EXPOSE` instruction.
 
     :param arg: List that represents instruction arguments.
-    :return: Fully-qualified `EXPOSE` instruction.
+    :return: :class:`~ydf.ir.Expose` node of the `EXPOSE` instruction.
     """
-    return formatting.str_join_with_conditional_delimiter(arg, delimiter=' ')
+    return ir.Expose(arg)
 
 
 @arguments.required(name='str', required_type=str)
@@ -220,9 +428,9 @@ def env_str(arg):
     Convert a :class:`~str` to a `ENV` instruction.
 
     :param arg: String that represents an instruction arguments.
-    :return: Fully-qualified `ENV` instruction.
+    :return: :class:`~ydf.ir.Env` node of the `ENV` instruction.
     """
-    return arg
+    return ir.Env(arg)
 
 
 @arguments.required(name='dict', required_type=dict)
@@ -232,10 +440,9 @@ def env_dict(arg):
     Convert a :class:`~dict` to a `ENV` instruction.
 
     :param arg: Dict that represents an instruction arguments.
-    :return: Fully-qualified `ENV` instruction.
+    :return: :class:`~ydf.ir.Env` node of the `ENV` instruction.
     """
-    indent = len(env_dict.instruction_name) + 1
-    return formatting.dict_with_conditional_line_breaks(arg, indent=indent)
+    return ir.Env(list(arg.items()))
 
 
 @arguments.required(name='str', required_type=str)
@@ -245,9 +452,9 @@ def add_str(arg):
     Convert a :class:`~str` to a `ADD` instruction.
 
     :param arg: String that represents an instruction arguments.
-    :return: Fully-qualified `ADD` instruction.
+    :return: :class:`~ydf.ir.Add` node of the `ADD` instruction.
     """
-    return arg
+    return ir.Add(arg)
 
 
 @arguments.required(name='list', required_type=list)
@@ -257,9 +464,9 @@ def add_list(arg):
     Convert a :class:`~list` to a `ADD` instruction.
 
     :param arg: List that represents an instruction arguments.
-    :return: Fully-qualified `ADD` instruction.
+    :return: :class:`~ydf.ir.Add` node of the `ADD` instruction.
     """
-    return json.dumps(arg)
+    return ir.Add(arg)
 
 
 @arguments.required(name='str', required_type=str)
@@ -269,9 +476,9 @@ def copy_str(arg):
     Convert a :class:`~str` to a `COPY` instruction.
 
     :param arg: String that represents an instruction arguments.
-    :return: Fully-qualified `COPY` instruction.
+    :return: :class:`~ydf.ir.Copy` node of the `COPY` instruction.
     """
-    return arg
+    return ir.Copy(arg)
 
 
 @arguments.required(name='list', required_type=list)
@@ -281,9 +488,9 @@ def copy_list(arg):
     Convert a :class:`~list` to a `COPY` instruction.
 
     :param arg: List that represents an instruction arguments.
-    :return: Fully-qualified `COPY` instruction.
+    :return: :class:`~ydf.ir.Copy` node of the `COPY` instruction.
     """
-    return json.dumps(arg)
+    return ir.Copy(arg)
 
 
 @arguments.required(name='string', required_type=str)
@@ -293,9 +500,9 @@ def entrypoint_str(arg):
     Convert a :class:`~str` to a `ENTRYPOINT` instruction.
 
     :param arg: String that represents instruction arguments.
-    :return: Fully-qualified `ENTRYPOINT` instruction.
+    :return: :class:`~ydf.ir.Entrypoint` node of the `ENTRYPOINT` instruction.
     """
-    return arg
+    return ir.Entrypoint(arg)
 
 
 @arguments.required(name='list', required_type=list)
@@ -305,9 +512,9 @@ def entrypoint_list(arg):
     Convert a :class:`~list` to a `ENTRYPOINT` instruction.
 
     :param arg: List that represents instruction arguments.
-    :return: Fully-qualified `ENTRYPOINT` instruction.
+    :return: :class:`~ydf.ir.Entrypoint` node of the `ENTRYPOINT` instruction.
     """
-    return json.dumps(arg)
+    return ir.Entrypoint(arg)
 
 
 @arguments.required(name='dict', required_type=dict)
@@ -319,11 +526,9 @@ def entrypoint_dict(arg):
     Convert a :class:`~dict` to a `ENTRYPOINT` instruction.
 
     :param arg: Dict that represents instruction arguments.
-    :return: Fully-qualified `ENTRYPOINT` instruction.
+    :return: :class:`~ydf.ir.Entrypoint` node of the `ENTRYPOINT` instruction.
     """
-    executable = arg['executable']
-    params = arg.get('params', [])
-    return json.dumps([executable] + params)
+    return ir.Entrypoint([arg['executable']] + arg.get('params', []))
 
 
 @arguments.required(name='string', required_type=str)
@@ -333,9 +538,9 @@ def volume_str(arg):
     Convert a :class:`~str` to a `VOLUME` instruction.
 
     :param arg: String that represents instruction arguments.
-    :return: Fully-qualified `VOLUME` instruction.
+    :return: :class:`~ydf.ir.Volume` node of the `VOLUME` instruction.
     """
-    return arg
+    return ir.Volume(arg)
 
 
 @arguments.required(name='list', required_type=list)
@@ -345,9 +550,9 @@ def volume_list(arg):
     Convert a :class:`~list` to a `VOLUME` instruction.
 
     :param arg: List that represents instruction arguments.
-    :return: Fully-qualified `VOLUME` instruction.
+    :return: :class:`~ydf.ir.Volume` node of the `VOLUME` instruction.
     """
-    return json.dumps(arg)
+    return ir.Volume(arg)
 
 
 @arguments.required(name='username', required_type=str)
@@ -357,9 +562,9 @@ def user_str(arg):
     Convert a :class:`~str` to a `USER` instruction.
 
     :param arg: String that represents instruction arguments.
-    :return: Fully-qualified `USER` instruction.
+    :return: :class:`~ydf.ir.User` node of the `USER` instruction.
     """
-    return arg
+    return ir.User(arg)
 
 
 @arguments.required(name='uid', required_type=int)
@@ -370,9 +575,9 @@ def user_int(arg):
     Convert a :class:`~int` to a `USER` instruction.
 
     :param arg: Int that represents instruction arguments.
-    :return: Fully-qualified `USER` instruction.
+    :return: :class:`~ydf.ir.User` node of the `USER` instruction.
     """
-    return str(arg)
+    return ir.User(arg)
 
 
 @arguments.required(name='dir', required_type=str)
@@ -382,9 +587,9 @@ def workdir_str(arg):
     Convert a :class:`~str` to a `WORKDIR` instruction.
 
     :param arg: String that represents instruction arguments.
-    :return: Fully-qualified `WORKDIR` instruction.
+    :return: :class:`~ydf.ir.Workdir` node of the `WORKDIR` instruction.
     """
-    return arg
+    return ir.Workdir(arg)
 
 
 @arguments.required(name='arg', required_type=str)
@@ -395,10 +600,9 @@ def arg_str(arg):
     Convert a :class:`~str` to a `ARG` instruction.
 
     :param arg: String that represents instruction arguments.
-    :return: Fully-qualified `ARG` instruction.
+    :return: :class:`~ydf.ir.Arg` node of the `ARG` instruction.
     """
-    name, default_value = arg['name'], arg.get('default_value')
-    return formatting.str_join_with_conditional_delimiter((name, default_value), '=')
+    return ir.Arg(arg['name'], arg.get('default_value'))
 
 
 @arguments.required(name='arg', required_type=dict)
@@ -409,10 +613,10 @@ def arg_dict(arg):
     Convert a :class:`~dict` to a `ARG` instruction.
 
     :param arg: Dict that represents instruction arguments.
-    :return: Fully-qualified `ARG` instruction.
+    :return: :class:`~ydf.ir.Arg` node of the `ARG` instruction.
     """
     name, default_value = list(arg.items())[0]
-    return formatting.str_join_with_conditional_delimiter((name, default_value), '=')
+    return ir.Arg(name, default_value)
 
 
 @arguments.required(name='instruction', required_type=dict)
@@ -423,9 +627,9 @@ def onbuild_dict(arg):
     Convert a :class:`~dict` to a `ONBUILD` instruction.
 
     :param arg: Dict that represents instruction arguments.
-    :return: Fully-qualified `ONBUILD` instruction.
+    :return: :class:`~ydf.ir.Onbuild` node of the `ONBUILD` instruction.
     """
-    return convert_instruction(arg)
+    return ir.Onbuild(build_instruction(arg))
 
 
 @arguments.required(name='signal', required_type=str)
@@ -435,9 +639,9 @@ def stopsignal_str(arg):
     Convert a :class:`~str` to a `STOPSIGNAL` instruction.
 
     :param arg: String that represents instruction arguments.
-    :return: Fully-qualified `STOPSIGNAL` instruction.
+    :return: :class:`~ydf.ir.Stopsignal` node of the `STOPSIGNAL` instruction.
     """
-    return arg
+    return ir.Stopsignal(arg)
 
 
 @arguments.required(name='signal', required_type=int)
@@ -448,9 +652,9 @@ def stopsignal_int(arg):
     Convert a :class:`~str` to a `STOPSIGNAL` instruction.
 
     :param arg: String that represents instruction arguments.
-    :return: Fully-qualified `STOPSIGNAL` instruction.
+    :return: :class:`~ydf.ir.Stopsignal` node of the `STOPSIGNAL` instruction.
     """
-    return arg
+    return ir.Stopsignal(arg)
 
 
 @instruction(name=HEALTHCHECK, type=type(None), desc='NONE')
@@ -459,9 +663,9 @@ def healthcheck_none(arg):
     Convert a :class:`~NoneType` to a `HEALTHCHECK` instruction.
 
     :param arg: Argument that is `None`.
-    :return: Fully-qualified `HEALTHCHECK` instruction.
+    :return: :class:`~ydf.ir.Healthcheck` node of the `HEALTHCHECK` instruction.
     """
-    return ''
+    return ir.Healthcheck()
 
 
 @arguments.required_dict_key(name='cmd', required_type=(str, list, dict))
@@ -472,11 +676,10 @@ def healthcheck_dict(arg):
     Convert a :class:`~dict` to a `HEALTHCHECK` instruction.
 
     :param arg: Dict that represents instruction arguments.
-    :return: Fully-qualified `HEALTHCHECK` instruction.
+    :return: :class:`~ydf.ir.Healthcheck` node of the `HEALTHCHECK` instruction.
     """
-    options = formatting.str_join_instruction_options(arg.get('options'))
-    cmd = convert_instruction(dict(cmd=arg['cmd']))
-    return '{} {}'.format(options, cmd)
+    options = arg.get('options')
+    return ir.Healthcheck(build_instruction(dict(cmd=arg['cmd'])), list(options.items()) if options else None)
 
 
 @arguments.required(name='shell', required_type=str)
@@ -486,9 +689,9 @@ def shell_str(arg):
     Convert a :class:`~str` to a `SHELL` instruction.
 
     :param arg: String that represents instruction arguments.
-    :return: Fully-qualified `SHELL` instruction.
+    :return: :class:`~ydf.ir.Shell` node of the `SHELL` instruction.
     """
-    return json.dumps(arg.split())
+    return ir.Shell(arg.split())
 
 
 @arguments.required(name='shell', required_type=list)
@@ -498,6 +701,10 @@ def shell_list(arg):
     Convert a :class:`~list` to a `SHELL` instruction.
 
     :param arg: List that represents instruction arguments.
-    :return: Fully-qualified `SHELL` instruction.
+    :return: :class:`~ydf.ir.Shell` node of the `SHELL` instruction.
     """
-    return json.dumps(arg)
+    return ir.Shell(arg)
+
+
+# Build the instruction registry and dispatch table once, as soon as every instruction is defined.
+meta.get_instructions(__name__)
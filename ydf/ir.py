@@ -0,0 +1,294 @@
+"""
+    ydf/ir
+    ~~~~~~
+
+    Intermediate representation of Dockerfile instructions, built from objects parsed from YAML and
+    turned into text by :mod:`~ydf.emitter`.
+
+    Each instruction has a compact class with a slot per field. Fields that may be given in shell form
+    or exec form hold a :class:`~str` for the shell form and a :class:`~list` for the other.
+"""
+
+
+__all__ = ['Instruction', 'From', 'Run', 'Cmd', 'Label', 'Expose', 'Env', 'Add', 'Copy', 'Entrypoint', 'Volume',
+           'User', 'Workdir', 'Arg', 'Onbuild', 'Stopsignal', 'Healthcheck', 'Shell', 'Raw']
+
+
+class Instruction(object):
+    """
+    Base class of every instruction node.
+
+    Nodes compare equal when they are the same instruction with equal fields.
+    """
+
+    __slots__ = ()
+
+    name = None
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(getattr(self, f) == getattr(other, f) for f in self.__slots__)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ', '.join('{}={!r}'.format(f, getattr(self, f)) for f in self.__slots__)
+        return '{}({})'.format(type(self).__name__, fields)
+
+
+class From(Instruction):
+    """
+    `FROM <image>[:<tag>|@<digest>]`
+    """
+
+    __slots__ = ('image', 'tag', 'digest')
+
+    name = 'FROM'
+
+    def __init__(self, image, tag=None, digest=None):
+        self.image = image
+        self.tag = tag
+        self.digest = digest
+
+
+class Run(Instruction):
+    """
+    `RUN <command>`, `RUN <command> && <command>` or `RUN ["<executable>", "<param>"]`
+
+    :param command: String of a shell command, or list of shell commands joined with `&&`
+    :param exec_form: Flag indicating if `command` is a list of an executable and its parameters
+    """
+
+    __slots__ = ('command', 'exec_form')
+
+    name = 'RUN'
+
+    def __init__(self, command, exec_form=False):
+        self.command = command
+        self.exec_form = exec_form
+
+
+class Cmd(Instruction):
+    """
+    `CMD <command>` or `CMD ["<executable>", "<param>"]`
+    """
+
+    __slots__ = ('command',)
+
+    name = 'CMD'
+
+    def __init__(self, command):
+        self.command = command
+
+
+class Label(Instruction):
+    """
+    `LABEL "<key>"="<value>" ...`
+
+    :param labels: List of `(key, value)` tuples
+    """
+
+    __slots__ = ('labels',)
+
+    name = 'LABEL'
+
+    def __init__(self, labels):
+        self.labels = labels
+
+
+class Expose(Instruction):
+    """
+    `EXPOSE <port> ...`
+
+    :param ports: A single port, or list of ports
+    """
+
+    __slots__ = ('ports',)
+
+    name = 'EXPOSE'
+
+    def __init__(self, ports):
+        self.ports = ports
+
+
+class Env(Instruction):
+    """
+    `ENV <key> <value>` or `ENV <key>=<value> ...`
+
+    :param variables: String of a single variable, or list of `(key, value)` tuples
+    """
+
+    __slots__ = ('variables',)
+
+    name = 'ENV'
+
+    def __init__(self, variables):
+        self.variables = variables
+
+
+class Add(Instruction):
+    """
+    `ADD <src>... <dest>` or `ADD ["<src>", ..., "<dest>"]`
+    """
+
+    __slots__ = ('paths',)
+
+    name = 'ADD'
+
+    def __init__(self, paths):
+        self.paths = paths
+
+
+class Copy(Instruction):
+    """
+    `COPY <src>... <dest>` or `COPY ["<src>", ..., "<dest>"]`
+    """
+
+    __slots__ = ('paths',)
+
+    name = 'COPY'
+
+    def __init__(self, paths):
+        self.paths = paths
+
+
+class Entrypoint(Instruction):
+    """
+    `ENTRYPOINT <command>` or `ENTRYPOINT ["<executable>", "<param>"]`
+    """
+
+    __slots__ = ('command',)
+
+    name = 'ENTRYPOINT'
+
+    def __init__(self, command):
+        self.command = command
+
+
+class Volume(Instruction):
+    """
+    `VOLUME <path>` or `VOLUME ["<path>", ...]`
+    """
+
+    __slots__ = ('paths',)
+
+    name = 'VOLUME'
+
+    def __init__(self, paths):
+        self.paths = paths
+
+
+class User(Instruction):
+    """
+    `USER <username>` or `USER <uid>`
+    """
+
+    __slots__ = ('user',)
+
+    name = 'USER'
+
+    def __init__(self, user):
+        self.user = user
+
+
+class Workdir(Instruction):
+    """
+    `WORKDIR <path>`
+    """
+
+    __slots__ = ('path',)
+
+    name = 'WORKDIR'
+
+    def __init__(self, path):
+        self.path = path
+
+
+class Arg(Instruction):
+    """
+    `ARG <name>[=<default value>]`
+    """
+
+    __slots__ = ('arg_name', 'default')
+
+    name = 'ARG'
+
+    def __init__(self, arg_name, default=None):
+        self.arg_name = arg_name
+        self.default = default
+
+
+class Onbuild(Instruction):
+    """
+    `ONBUILD <instruction>`
+
+    :param instruction: :class:`~ydf.ir.Instruction` run when the image is used as a base
+    """
+
+    __slots__ = ('instruction',)
+
+    name = 'ONBUILD'
+
+    def __init__(self, instruction):
+        self.instruction = instruction
+
+
+class Stopsignal(Instruction):
+    """
+    `STOPSIGNAL <signal>`
+    """
+
+    __slots__ = ('signal',)
+
+    name = 'STOPSIGNAL'
+
+    def __init__(self, signal):
+        self.signal = signal
+
+
+class Healthcheck(Instruction):
+    """
+    `HEALTHCHECK [--<option>=<value>] CMD <command>`, or `HEALTHCHECK` without a command to disable it
+
+    :param cmd: (Optional) :class:`~ydf.ir.Cmd` run to check health
+    :param options: (Optional) List of `(option, value)` tuples
+    """
+
+    __slots__ = ('cmd', 'options')
+
+    name = 'HEALTHCHECK'
+
+    def __init__(self, cmd=None, options=None):
+        self.cmd = cmd
+        self.options = options
+
+
+class Shell(Instruction):
+    """
+    `SHELL ["<executable>", "<param>"]`
+    """
+
+    __slots__ = ('args',)
+
+    name = 'SHELL'
+
+    def __init__(self, args):
+        self.args = args
+
+
+class Raw(Instruction):
+    """
+    Instruction whose arguments are already formatted, built by an instruction function that returns text
+    instead of a node.
+
+    :param name: Name of the instruction
+    :param text: Formatted arguments of the instruction
+    """
+
+    __slots__ = ('name', 'text')
+
+    def __init__(self, name, text):
+        self.name = name
+        self.text = text
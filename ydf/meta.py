@@ -6,15 +6,30 @@
 """
 
 import collections
+import collections.abc
 import importlib
 import sys
+import threading
 
 from ydf import exceptions
 
 
-INSTRUCTIONS_CACHE = None
+INSTRUCTIONS_CACHE = {}
 INSTRUCTIONS_MODULE_NAME = 'ydf.instructions'
 
+DISPATCH_TABLES = {}
+DISPATCH_LOCK = threading.RLock()
+
+# Runtime types of instruction arguments that are added to the dispatch table up front; any other type,
+# e.g. a subclass created by a YAML loader, is added the first time it's seen.
+DISPATCH_RUNTIME_TYPES = {
+    dict: (dict, collections.OrderedDict),
+    list: (list, tuple),
+    str: (str,),
+    int: (int, bool),
+    type(None): (type(None),)
+}
+
 
 def is_instruction(func):
     """
@@ -35,7 +50,7 @@ def get_instruction_arg_type(arg):
     :param arg: Argument object to pass to the instruction
     :return: A type object that maps to the instruction argument runtime type
     """
-    if isinstance(arg, collections.Mapping):
+    if isinstance(arg, collections.abc.Mapping):
         return dict
     if isinstance(arg, (list, tuple)):
         return list
@@ -54,38 +69,83 @@ def get_instruction(instruction_name, instruction_type, module_name=INSTRUCTIONS
     Get the function that is decorated with :func:`~ydf.instructions.instruction` for the given
     instruction name and type.
 
+    Lookups go through a dispatch table keyed by instruction name and the exact runtime type of the
+    argument. Names and types not yet in the table are resolved once and then remembered.
+
     :param instruction_name: Name of instruction to search for
     :param instruction_type: Type of instruction arguments
     :param module_name: Name of the module to scan for instructions
     :param cached: Flag indicating if caller is OK with receiving cached instructions.
     :return:
     """
-    instructions = get_instructions(module_name, cached)
+    key = (instruction_name, type(instruction_type))
+
+    table = DISPATCH_TABLES.get(module_name) if cached else None
+    if table is None:
+        get_instructions(module_name, cached)
+        table = DISPATCH_TABLES[module_name]
+
+    try:
+        return table[key]
+    except KeyError:
+        pass
+
+    instructions = get_instructions(module_name)
+    func = instructions[instruction_name.upper()][get_instruction_arg_type(instruction_type)]
+    table[key] = func
+    return func
+
+
+def build_dispatch_table(instructions):
+    """
+    Build a dispatch table of instruction functions keyed by instruction name and argument runtime type.
 
-    instruction_name = instruction_name.upper()
-    instruction_type = get_instruction_arg_type(instruction_type)
-    return instructions[instruction_name][instruction_type]
+    Each instruction is added under its upper and lower case name for each of the common runtime types
+    of its argument type.
+
+    :param instructions: Mapping of instruction name to mapping of argument type to function
+    :return: Dict of (name, runtime type) tuples to instruction functions
+    """
+    table = {}
+    for instruction_name, funcs in instructions.items():
+        for instruction_type, func in funcs.items():
+            for runtime_type in DISPATCH_RUNTIME_TYPES.get(instruction_type, (instruction_type,)):
+                table[(instruction_name, runtime_type)] = func
+                table[(instruction_name.lower(), runtime_type)] = func
+    return table
 
 
 def get_instructions(module_name=INSTRUCTIONS_MODULE_NAME, cached=True):
     """
     Get all functions within this module that are decorated with :func:`~ydf.instructions.instruction`.
 
+    Building the registry also builds the dispatch table used by :func:`~ydf.meta.get_instruction`. Both
+    are replaced as a whole so concurrent lookups see either the previous or the new version.
+
     :param module_name: Name of the module to scan for instructions
     :param cached: Flag indicating if caller is OK with receiving cached instructions.
     """
-    global INSTRUCTIONS_CACHE
+    instructions = INSTRUCTIONS_CACHE.get(module_name) if cached else None
+    if instructions is not None:
+        return instructions
+
+    with DISPATCH_LOCK:
+        instructions = INSTRUCTIONS_CACHE.get(module_name) if cached else None
+        if instructions is not None:
+            return instructions
 
-    if INSTRUCTIONS_CACHE is None or not cached:
         if module_name not in sys.modules:
             importlib.import_module(module_name)
         module = sys.modules[module_name]
 
-        INSTRUCTIONS_CACHE = collections.defaultdict(dict)
+        instructions = collections.defaultdict(dict)
 
         for func in (val for attr, val in ((a, getattr(module, a)) for a in dir(module)) if is_instruction(val)):
             instruction_name = func.instruction_name.upper()
             instruction_type = func.instruction_type
-            INSTRUCTIONS_CACHE[instruction_name][instruction_type] = func
+            instructions[instruction_name][instruction_type] = func
+
+        DISPATCH_TABLES[module_name] = build_dispatch_table(instructions)
+        INSTRUCTIONS_CACHE[module_name] = instructions
 
-    return INSTRUCTIONS_CACHE
+    return instructions
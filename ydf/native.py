@@ -0,0 +1,111 @@
+"""
+    ydf/native
+    ~~~~~~~~~~
+
+    Render the built-in `default.tpl` template with plain string joins instead of Jinja2.
+
+    The output is byte-identical to rendering the template, including HTML escaping when autoescape is on.
+"""
+
+import collections.abc
+
+import markupsafe
+
+from ydf import instructions
+
+
+__all__ = ['DefaultTemplate']
+
+
+HEADER = '# Automatically generated by ydf\n'
+SEPARATOR = '# ---\n'
+COMMENT_FORMAT = '# {}: {}\n'
+
+
+def _escape(value):
+    """
+    HTML escape the given value the same way Jinja2 does when autoescape is on.
+
+    :param value: Value to render
+    :return: Escaped string
+    """
+    return str(markupsafe.escape(value))
+
+
+def _comments(mapping, escape):
+    """
+    Build the `# Key: value` comment lines for each item of the given mapping.
+
+    :param mapping: Mapping of variables to render as comments
+    :param escape: Function that converts a key or value to its rendered string
+    :return: List of lines
+    """
+    return [COMMENT_FORMAT.format(escape(key.capitalize()), escape(value)) for key, value in mapping.items()]
+
+
+def supports(context):
+    """
+    Check if the given template variables can be rendered natively.
+
+    Variables the template would fail on, e.g. a `meta` that isn't a mapping of strings, are left to Jinja2
+    so that the same error is raised.
+
+    :param context: Mapping of all variables available to the template
+    :return: `True` if :class:`~ydf.native.DefaultTemplate` renders them identically, `False` otherwise
+    """
+    for name in ('ydf', 'meta'):
+        mapping = context.get(name, {})
+        if not isinstance(mapping, collections.abc.Mapping) or not all(isinstance(k, str) for k in mapping):
+            return False
+    return True
+
+
+class DefaultTemplate(object):
+    """
+    Drop-in replacement for the compiled built-in `default.tpl` template.
+
+    :param filename: Path of the template file it replaces
+    :param autoescape: Flag indicating if rendered values should be HTML escaped
+    :param fallback: Function that loads the Jinja2 template, used for variables it doesn't support
+    """
+
+    name = 'default.tpl'
+
+    def __init__(self, filename, autoescape, fallback):
+        self.filename = filename
+        self.autoescape = autoescape
+        self.fallback = fallback
+        self.escape = _escape if autoescape else str
+
+    def render(self, context):
+        """
+        Render the template.
+
+        :param context: Mapping of all variables available to the template
+        :return: The rendered template
+        """
+        if not supports(context):
+            return self.fallback().render(context)
+
+        lines = [self.header(context)]
+        if 'instructions' in context:
+            lines.append(self.escape(instructions.convert_instructions(context['instructions'])))
+
+        return ''.join(lines)
+
+    def header(self, context):
+        """
+        Render the part of the template before the instructions.
+
+        :param context: Mapping of all variables available to the template, supported by :func:`~ydf.native.supports`
+        :return: The rendered comment lines
+        """
+        lines = [HEADER]
+        if 'ydf' in context:
+            lines.extend(_comments(context['ydf'], self.escape))
+        lines.append(SEPARATOR)
+        if 'meta' in context:
+            lines.extend(_comments(context['meta'], self.escape))
+        lines.append(SEPARATOR)
+        lines.append('\n')
+        return ''.join(lines)
@@ -0,0 +1,83 @@
+"""
+    ydf/parallel
+    ~~~~~~~~~~~~
+
+    Execution engine that spreads work across a pool of worker processes.
+"""
+
+import os
+
+
+__all__ = ['cpu_count', 'default_chunksize', 'imap']
+
+
+DEFAULT_JOBS = 1
+CHUNKS_PER_WORKER = 4
+
+
+def cpu_count():
+    """
+    Get the number of CPUs available to this process.
+
+    :return: Number of usable CPUs, at least one
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0)) or 1
+
+    import multiprocessing
+    return multiprocessing.cpu_count() or 1
+
+
+def default_chunksize(count, jobs):
+    """
+    Determine how many items to send to a worker process at a time.
+
+    Items are grouped so each worker receives a handful of chunks; this keeps the pool balanced
+    while making sure the cost of inter-process communication doesn't dominate for small items.
+
+    :param count: Total number of items
+    :param jobs: Number of worker processes
+    :return: Number of items per chunk
+    """
+    return max(1, -(-count // (jobs * CHUNKS_PER_WORKER)))
+
+
+def imap(func, items, jobs=DEFAULT_JOBS, chunksize=None, initializer=None, initargs=()):
+    """
+    Apply a function to every item, yielding results in the same order as the items.
+
+    When `jobs` is one, items are processed lazily within the calling process and no pool is created.
+
+    :param func: Picklable, module level function to call with each item
+    :param items: Sequence of picklable items
+    :param jobs: Number of worker processes; zero or less uses every available CPU
+    :param chunksize: (Optional) Number of items sent to a worker at a time
+    :param initializer: (Optional) Function called once within each worker before it processes items
+    :param initargs: Arguments passed to the initializer
+    :return: Generator that yields the result of each function call in input order
+    """
+    jobs = jobs if jobs > 0 else cpu_count()
+
+    if jobs == 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for item in items:
+            yield func(item)
+        return
+
+    items = list(items)
+    if not items:
+        return
+
+    chunksize = chunksize or default_chunksize(len(items), jobs)
+
+    # Imported here as it is slow to import and only needed when work is spread across processes.
+    import multiprocessing
+    pool = multiprocessing.Pool(min(jobs, len(items)), initializer, initargs)
+    try:
+        for result in pool.imap(func, items, chunksize):
+            yield result
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
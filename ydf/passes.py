@@ -0,0 +1,209 @@
+"""
+    ydf/passes
+    ~~~~~~~~~~
+
+    Optional passes that rewrite :mod:`~ydf.ir` instruction nodes before they are emitted as Dockerfile
+    instructions.
+
+    Each pass takes a list of nodes and returns a new list; the given nodes are not modified.
+"""
+
+import collections
+import threading
+
+from ydf import advisor, ir
+
+
+__all__ = ['apply', 'coalesce_run', 'removed', 'reorder_cache', 'set_enabled']
+
+
+OPTIMIZATION_REORDER_CACHE = 'reorder-cache'
+OPTIMIZATION_COALESCE_RUN = 'coalesce-run'
+
+# Instructions that only set image metadata, so a `RUN` instruction may be moved before them.
+METADATA_INSTRUCTIONS = (ir.Label, ir.Expose, ir.Cmd, ir.Entrypoint, ir.Healthcheck, ir.Stopsignal, ir.Onbuild)
+
+ENABLED = ()
+REMOVED = 0
+REMOVED_LOCK = threading.Lock()
+
+# Characters that leave a command unfinished when it ends with them, so `&&` can't safely follow it.
+CONTINUATION_CHARACTERS = ('&', ';', '\\', '|')
+
+
+def _unquoted(command):
+    """
+    Get the characters of a shell command that aren't quoted or escaped.
+
+    :param command: Shell command string
+    :return: String of unquoted characters, in order
+    """
+    chars = []
+    quote = None
+    escaped = False
+
+    for char in command:
+        if escaped:
+            escaped = False
+        elif quote is not None:
+            if char == quote:
+                quote = None
+            elif char == '\\' and quote == '"':
+                escaped = True
+        elif char in ('"', "'"):
+            quote = char
+        elif char == '\\':
+            escaped = True
+        else:
+            chars.append(char)
+    return ''.join(chars)
+
+
+def _joinable(command):
+    """
+    Check if a shell command can be followed by `&&` and another command.
+
+    :param command: Shell command
+    :return: `True` if the command can be joined with others, `False` otherwise
+    """
+    # A command that spans lines could end in a comment or heredoc.
+    if not isinstance(command, str) or '\n' in command:
+        return False
+
+    # A comment would swallow the commands joined after it.
+    if '#' in command and '#' in _unquoted(command):
+        return False
+
+    # A trailing operator or line continuation would combine with `&&` into different syntax.
+    return not command.rstrip().endswith(CONTINUATION_CHARACTERS)
+
+
+def _shell_commands(node):
+    """
+    Get the commands of a shell form `RUN` instruction that can be joined with others.
+
+    :param node: :class:`~ydf.ir.Instruction` instance
+    :return: List of commands, or `None` if the instruction can't be joined with others
+    """
+    # The exec form doesn't run a shell to join commands with.
+    if type(node) is not ir.Run or node.exec_form:
+        return None
+
+    commands = [node.command] if isinstance(node.command, str) else node.command
+
+    if not commands or not all(_joinable(c) for c in commands):
+        return None
+    return commands
+
+
+def coalesce_run(nodes):
+    """
+    Merge shell form `RUN` instructions into one, so the image has fewer layers.
+
+    A `RUN` instruction is merged into an earlier one when only metadata instructions, e.g. `LABEL` or
+    `EXPOSE`, come between them; the merged commands are joined with `&&`. Every other instruction, e.g.
+    `USER`, `WORKDIR`, `ENV`, `ARG`, `SHELL`, `COPY` or an exec form `RUN`, changes what a following
+    command sees and ends the group.
+
+    Merged commands run in a single shell, so state such as the current directory carries from one
+    command to the next.
+
+    :param nodes: List of :class:`~ydf.ir.Instruction` instances
+    :return: New list of nodes; those not merged are the same objects as given
+    """
+    result = []
+    group = None
+
+    for node in nodes:
+        commands = _shell_commands(node)
+        if commands is not None:
+            if group is None:
+                group = (len(result), list(commands))
+                result.append(node)
+            else:
+                group[1].extend(commands)
+                result[group[0]] = None
+        elif group is not None and isinstance(node, METADATA_INSTRUCTIONS):
+            result.append(node)
+        else:
+            _finish(result, group)
+            group = None
+            result.append(node)
+
+    _finish(result, group)
+    return result
+
+
+def _finish(result, group):
+    """
+    Replace the first node of a group with a single `RUN` instruction of every command in it.
+
+    :param result: List of nodes being built; the first node of a merged group is `None`
+    :param group: (Optional) Tuple of the position and commands of the group
+    """
+    if group is not None and result[group[0]] is None:
+        index, commands = group
+        result[index] = ir.Run(commands)
+
+
+def reorder_cache(nodes):
+    """
+    Move instructions that invalidate the build cache more often than they need to, see
+    :func:`~ydf.advisor.reorder`.
+
+    :param nodes: List of :class:`~ydf.ir.Instruction` instances
+    :return: New list of the same nodes
+    """
+    return advisor.reorder(nodes)
+
+
+# Reordering runs first as moving a volatile `LABEL` out of the way can let `RUN` instructions be merged.
+PASSES = collections.OrderedDict([
+    (OPTIMIZATION_REORDER_CACHE, reorder_cache),
+    (OPTIMIZATION_COALESCE_RUN, coalesce_run),
+])
+
+NAMES = tuple(PASSES)
+
+
+def set_enabled(names):
+    """
+    Set the passes applied to instructions of every document rendered by this process.
+
+    :param names: Sequence of pass names, applied in the order they are registered
+    """
+    global ENABLED
+
+    unknown = [name for name in names if name not in PASSES]
+    if unknown:
+        raise ValueError('Unknown pass "{}"; expected one of {}'.format(unknown[0], ', '.join(NAMES)))
+
+    ENABLED = tuple(name for name in NAMES if name in names)
+
+
+def apply(nodes, names=None):
+    """
+    Apply passes to the instructions of a document.
+
+    :param nodes: Iterable of :class:`~ydf.ir.Instruction` instances
+    :param names: (Optional) Sequence of pass names; the enabled passes if not given
+    :return: New list of nodes
+    """
+    global REMOVED
+
+    given = nodes = list(nodes)
+    for name in (ENABLED if names is None else names):
+        nodes = PASSES[name](nodes)
+
+    with REMOVED_LOCK:
+        REMOVED += len(given) - len(nodes)
+    return nodes
+
+
+def removed():
+    """
+    Get the number of instructions, and so image layers, removed by passes in this process.
+
+    :return: Total number of instructions removed
+    """
+    return REMOVED
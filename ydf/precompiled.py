@@ -0,0 +1,192 @@
+"""
+    ydf/precompiled
+    ~~~~~~~~~~~~~~~
+
+    Compile templates ahead of time into a zip archive of Python modules that Jinja2 imports instead of compiling
+    template sources.
+
+    Each template is compiled once for each `autoescape` setting, as escaping is decided when a template is
+    compiled. The archive records the file, modification time and size of every template source it was compiled
+    from. A template whose source has changed since, or whose name now resolves to a different file, is compiled
+    from source as if there were no archive.
+"""
+
+import importlib.util
+import json
+import marshal
+import os
+import struct
+import sys
+import zipfile
+
+import jinja2
+
+from ydf import __version__
+
+
+__all__ = ['ArchiveLoader', 'compile_templates']
+
+
+ARCHIVE_FORMAT = 1
+MANIFEST_NAME = 'ydf-templates.json'
+
+# Directory within the archive holding the modules compiled for each `autoescape` setting.
+PACKAGES = {True: 'autoescape', False: 'plain'}
+
+
+def _version():
+    """
+    Get the versions compiled templates depend on; modules compiled by others can't be imported or run.
+
+    :return: Dict of version strings
+    """
+    return dict(ydf=__version__, jinja2=jinja2.__version__, python=importlib.util.MAGIC_NUMBER.hex())
+
+
+def _bytecode(code):
+    """
+    Serialize a code object the way it's stored in a `.pyc` file.
+
+    The modification time and size of the source are zero, as the archive holds no Python source they could be
+    checked against.
+
+    :param code: Code object
+    :return: Bytes of the `.pyc` file
+    """
+    header = importlib.util.MAGIC_NUMBER
+    if sys.version_info >= (3, 7):
+        header += struct.pack('<I', 0)
+    return header + struct.pack('<II', 0, 0) + marshal.dumps(code)
+
+
+def _source_state(filename):
+    """
+    Capture the state of a template source file.
+
+    :param filename: Path to template file on disk
+    :return: Dict with the absolute path, modification time and size of the file, or `None` if it doesn't exist
+    """
+    try:
+        st = os.stat(filename)
+    except (IOError, OSError):
+        return None
+    return dict(filename=os.path.abspath(filename), mtime_ns=st.st_mtime_ns, size=st.st_size)
+
+
+def compile_templates(target, environments):
+    """
+    Compile every template found by the loaders of the given environments into a zip archive.
+
+    The archive is written to a temporary file and then moved into place, so a process loading templates never
+    sees a partially written archive.
+
+    :param target: Path of zip archive to write
+    :param environments: Mapping of `autoescape` setting to :class:`~jinja2.Environment` to compile with
+    :return: Tuple of the names of templates compiled and a dict of names that failed to compile to their error
+    """
+    templates, errors = {}, {}
+
+    tmp = '{}.tmp'.format(target)
+    with zipfile.ZipFile(tmp, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for autoescape, env in sorted(environments.items()):
+            for name in env.list_templates():
+                source, filename, _ = env.loader.get_source(env, name)
+                try:
+                    code = env.compile(source, name, filename, defer_init=True)
+                except jinja2.TemplateSyntaxError as e:
+                    errors[name] = e
+                    continue
+                module = jinja2.ModuleLoader.get_template_key(name) + '.pyc'
+                archive.writestr('{}/{}'.format(PACKAGES[autoescape], module), _bytecode(code))
+                templates[name] = _source_state(filename)
+
+        manifest = dict(format=ARCHIVE_FORMAT, version=_version(), templates=templates)
+        archive.writestr(MANIFEST_NAME, json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(tmp, target)
+
+    return sorted(templates), errors
+
+
+class ArchiveLoader(jinja2.BaseLoader):
+    """
+    Loader of templates compiled by :func:`~ydf.precompiled.compile_templates` that falls back to another loader.
+
+    Templates missing from the archive, or whose source changed after it was compiled, are loaded by the fallback
+    loader, as are all templates when the archive can't be read or was compiled by other versions of `ydf`,
+    Jinja2 or Python.
+
+    :param archive: Path of zip archive written by :func:`~ydf.precompiled.compile_templates`
+    :param loader: :class:`~jinja2.FileSystemLoader` that finds template sources
+    """
+
+    def __init__(self, archive, loader):
+        self.archive = os.path.abspath(archive)
+        self.loader = loader
+        self.templates = {}
+        self.modules = {}
+
+        try:
+            with zipfile.ZipFile(self.archive) as f:
+                manifest = json.loads(f.read(MANIFEST_NAME).decode('utf-8'))
+        except (IOError, OSError, KeyError, ValueError, zipfile.BadZipfile):
+            return
+
+        if manifest.get('format') == ARCHIVE_FORMAT and manifest.get('version') == _version():
+            self.templates = manifest.get('templates', {})
+
+    def get_source(self, environment, template):
+        return self.loader.get_source(environment, template)
+
+    def list_templates(self):
+        return self.loader.list_templates()
+
+    def _find(self, template):
+        """
+        Find the file a template name resolves to, searching paths in order like :class:`~jinja2.FileSystemLoader`.
+
+        :param template: Name of template
+        :return: Path of the template file, or `None` if it isn't found
+        """
+        pieces = jinja2.loaders.split_template_path(template)
+        for directory in self.loader.searchpath:
+            filename = os.path.join(directory, *pieces)
+            if os.path.isfile(filename):
+                return filename
+        return None
+
+    def is_current(self, template):
+        """
+        Check if the compiled module of a template is up-to-date with its source.
+
+        :param template: Name of template
+        :return: `True` if the template can be loaded from the archive, `False` otherwise
+        """
+        state = self.templates.get(template)
+        if state is None:
+            return False
+        filename = self._find(template)
+        return filename is not None and _source_state(filename) == state
+
+    def _module_loader(self, autoescape):
+        """
+        Get the loader that imports modules compiled with the given `autoescape` setting, creating it on first use.
+
+        :param autoescape: Flag indicating if rendered values should be HTML escaped
+        :return: :class:`~jinja2.ModuleLoader` instance
+        """
+        loader = self.modules.get(autoescape)
+        if loader is None:
+            loader = self.modules[autoescape] = jinja2.ModuleLoader(os.path.join(self.archive, PACKAGES[autoescape]))
+        return loader
+
+    def load(self, environment, name, globals=None):
+        if environment.autoescape in PACKAGES and self.is_current(name):
+            try:
+                template = self._module_loader(environment.autoescape).load(environment, name, globals)
+            except jinja2.TemplateNotFound:
+                pass
+            else:
+                # Modules don't know their source, so let Jinja2 reload the template once its source changes.
+                template._uptodate = lambda: self.is_current(name)
+                return template
+        return self.loader.load(environment, name, globals)
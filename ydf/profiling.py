@@ -0,0 +1,315 @@
+"""
+    ydf/profiling
+    ~~~~~~~~~~~~~
+
+    Record wall and CPU time of each stage of converting YAML files to Dockerfiles.
+
+    Stages are marked in code with :func:`~ydf.profiling.stage`. When profiling isn't started, it returns
+    a shared context manager that does nothing, so the cost of a stage boundary is a function call.
+"""
+
+import collections
+import io
+import time
+
+
+__all__ = ['stage', 'start', 'stop', 'enabled', 'Profiler']
+
+
+STAGE_CLI = 'cli'
+STAGE_TEMPLATE = 'template'
+STAGE_FILE = 'file'
+STAGE_LOAD = 'load'
+STAGE_RENDER = 'render'
+STAGE_DISPATCH = 'dispatch'
+STAGE_VALIDATE = 'validate'
+STAGE_BUILD = 'build'
+STAGE_FORMAT = 'format'
+STAGE_WRITE = 'write'
+
+# Stages of each file, in the order they happen; `dispatch`, `validate`, `build` and `format` run within `render`.
+FILE_STAGES = (STAGE_LOAD, STAGE_RENDER, STAGE_DISPATCH, STAGE_VALIDATE, STAGE_BUILD, STAGE_FORMAT, STAGE_WRITE)
+
+DEFAULT_TOP_FILES = 20
+
+PROFILER = None
+
+
+class _NullStage(object):
+    """
+    Context manager used for stages when profiling is off.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_STAGE = _NullStage()
+
+
+class _Stage(object):
+    """
+    Context manager that adds its wall and CPU time to the profiler when it exits.
+    """
+
+    __slots__ = ('profiler', 'name', 'path', 'previous_path', 'wall', 'cpu')
+
+    def __init__(self, profiler, name, path):
+        self.profiler = profiler
+        self.name = name
+        self.path = path
+
+    def __enter__(self):
+        self.previous_path = self.profiler.current_path
+        if self.path is not None:
+            self.profiler.current_path = self.path
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc_info):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        self.profiler.record(self.name, self.profiler.current_path, wall, cpu)
+        self.profiler.current_path = self.previous_path
+        return False
+
+
+Timing = collections.namedtuple('Timing', 'calls wall cpu')
+
+
+class Profiler(object):
+    """
+    Totals of wall and CPU time per stage, both overall and per input file, with an optional
+    :mod:`cProfile` profile of every function called.
+    """
+
+    def __init__(self, function_profile=False):
+        self.stages = collections.OrderedDict()
+        self.files = collections.OrderedDict()
+        self.current_path = None
+        self.profile = None
+        if function_profile:
+            import cProfile
+            self.profile = cProfile.Profile()
+
+    def stage(self, name, path=None):
+        """
+        Build a context manager that times a stage.
+
+        :param name: Name of the stage
+        :param path: (Optional) Path of the input file the stage and any stages within it belong to
+        :return: Context manager
+        """
+        return _Stage(self, name, path)
+
+    def record(self, name, path, wall, cpu):
+        """
+        Add a single call of a stage to the totals.
+
+        :param name: Name of the stage
+        :param path: (Optional) Path of the input file the stage belongs to
+        :param wall: Wall time of the call, in seconds
+        :param cpu: CPU time of the call, in seconds
+        """
+        _add(self.stages, name, wall, cpu)
+        if path is not None:
+            _add(self.files.setdefault(path, collections.OrderedDict()), name, wall, cpu)
+
+    def enable(self):
+        if self.profile is not None:
+            self.profile.enable()
+
+    def disable(self):
+        if self.profile is not None:
+            self.profile.disable()
+
+    def stats(self):
+        """
+        Get the function level statistics of the run.
+
+        :return: :class:`~pstats.Stats` instance
+        """
+        if self.profile is None:
+            raise ValueError('Profiler was not started with function profiling')
+
+        import pstats
+        return pstats.Stats(self.profile, stream=io.StringIO())
+
+    def dump_stats(self, path):
+        """
+        Write function level statistics to a file that :mod:`pstats` and tools like `snakeviz` can read.
+
+        :param path: Path of the file to write
+        """
+        self.stats().dump_stats(path)
+
+    def dump_collapsed(self, path):
+        """
+        Write function level statistics as collapsed stacks that flamegraph tools can read.
+
+        :param path: Path of the file to write
+        """
+        with io.open(path, 'w') as f:
+            for stack, microseconds in collapsed_stacks(self.stats()):
+                f.write('{} {}\n'.format(';'.join(stack), microseconds))
+
+    def report(self, top=DEFAULT_TOP_FILES):
+        """
+        Build a plain text report of time spent per stage and for the slowest input files.
+
+        :param top: Number of input files to include
+        :return: List of lines
+        """
+        lines = ['{:<10} {:>8} {:>12} {:>12}'.format('stage', 'calls', 'wall ms', 'cpu ms')]
+        for name, timing in self.stages.items():
+            lines.append('{:<10} {:>8} {:>12.3f} {:>12.3f}'.format(name, timing.calls, timing.wall * 1e3,
+                                                                   timing.cpu * 1e3))
+
+        if not self.files:
+            return lines
+
+        files = sorted(self.files.items(), key=lambda item: _file_total(item[1], 'wall'), reverse=True)
+        columns = [name for name in FILE_STAGES if any(name in stages for _, stages in files)]
+
+        lines.append('')
+        lines.append(' '.join(['{:>10}'.format('wall ms'), '{:>10}'.format('cpu ms')] +
+                              ['{:>10}'.format(name) for name in columns] + ['file']))
+        for path, stages in files[:top]:
+            wall, cpu = _file_total(stages, 'wall'), _file_total(stages, 'cpu')
+            cells = ['{:>10.3f}'.format(stages[name].wall * 1e3) if name in stages else '{:>10}'.format('-')
+                     for name in columns]
+            lines.append(' '.join(['{:>10.3f}'.format(wall * 1e3), '{:>10.3f}'.format(cpu * 1e3)] + cells + [path]))
+        if len(files) > top:
+            lines.append('... {} more files'.format(len(files) - top))
+
+        return lines
+
+
+def _add(timings, name, wall, cpu):
+    timing = timings.get(name)
+    timings[name] = Timing(1, wall, cpu) if timing is None else Timing(timing.calls + 1, timing.wall + wall,
+                                                                       timing.cpu + cpu)
+
+
+def _file_total(stages, field):
+    # The `file` stage covers loading and rendering; writing happens afterwards in the calling process.
+    names = (STAGE_FILE, STAGE_WRITE) if STAGE_FILE in stages else (STAGE_LOAD, STAGE_RENDER, STAGE_WRITE)
+    return sum(getattr(stages[name], field) for name in names if name in stages)
+
+
+def _function_name(func):
+    filename, lineno, name = func
+    if filename == '~':
+        return name
+    return '{}:{}:{}'.format(filename.rsplit('/', 1)[-1], lineno, name)
+
+
+def collapsed_stacks(stats, max_depth=64):
+    """
+    Estimate the time spent in each call stack from function level statistics.
+
+    :mod:`cProfile` only records time per caller and callee pair, so the time spent in a function is split
+    between its callers in proportion to the time each caller spent in it. Each caller is shown under the stack
+    of its own heaviest caller, so there is one stack per caller and callee pair however many paths lead to it.
+
+    :param stats: :class:`~pstats.Stats` instance
+    :param max_depth: Maximum depth of stacks; deeper stacks keep their innermost functions
+    :return: Generator that yields tuples of a stack, as a tuple of function names, and its time in microseconds
+    """
+    entries = stats.stats
+    heaviest = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        if callers:
+            heaviest[func] = max(callers, key=lambda caller: callers[caller][3])
+
+    stacks = {}
+
+    def stack(func):
+        # Follow heaviest callers up to a function whose stack is known, a root or a recursive call.
+        chain, seen = [], set()
+        while func is not None and func not in stacks and func not in seen and len(chain) < max_depth:
+            chain.append(func)
+            seen.add(func)
+            func = heaviest.get(func)
+
+        names = stacks.get(func, ())
+        for func in reversed(chain):
+            names = stacks[func] = (names + (_function_name(func),))[-max_depth:]
+        return names
+
+    times = collections.OrderedDict()
+    for func, (_, _, total_time, _, callers) in entries.items():
+        if not callers:
+            key = stack(func)
+            times[key] = times.get(key, 0.0) + total_time
+            continue
+
+        # A recursive function's callers can add up to more than its cumulative time, so split by their sum.
+        cumulative = sum(timing[3] for timing in callers.values())
+        name = _function_name(func)
+        for caller, timing in callers.items():
+            share = timing[3] / cumulative if cumulative else 1.0 / len(callers)
+            key = (stack(caller) + (name,))[-max_depth:]
+            times[key] = times.get(key, 0.0) + total_time * share
+
+    for names, seconds in times.items():
+        microseconds = int(round(seconds * 1e6))
+        if microseconds:
+            yield names, microseconds
+
+
+def enabled():
+    """
+    Check if profiling is started.
+
+    :return: `True` if stages are being recorded, `False` otherwise
+    """
+    return PROFILER is not None
+
+
+def stage(name, path=None):
+    """
+    Build a context manager that records the wall and CPU time of a stage when profiling is started.
+
+    :param name: Name of the stage
+    :param path: (Optional) Path of the input file the stage and any stages within it belong to
+    :return: Context manager
+    """
+    profiler = PROFILER
+    if profiler is None:
+        return NULL_STAGE
+    return profiler.stage(name, path)
+
+
+def start(function_profile=False):
+    """
+    Start recording stages in this process.
+
+    :param function_profile: Flag indicating if every function call should also be profiled with :mod:`cProfile`
+    :return: :class:`~ydf.profiling.Profiler` instance that records the stages
+    """
+    global PROFILER
+
+    PROFILER = Profiler(function_profile)
+    PROFILER.enable()
+    return PROFILER
+
+
+def stop():
+    """
+    Stop recording stages in this process.
+
+    :return: :class:`~ydf.profiling.Profiler` instance that recorded the stages, or `None` if not started
+    """
+    global PROFILER
+
+    profiler, PROFILER = PROFILER, None
+    if profiler is not None:
+        profiler.disable()
+    return profiler
@@ -0,0 +1,181 @@
+"""
+    ydf/server
+    ~~~~~~~~~~
+
+    Daemon that renders Dockerfiles for requests received on a Unix socket, keeping templates and the
+    instruction registry loaded between requests.
+"""
+
+import os
+import socketserver
+import stat
+import threading
+
+from ydf import __version__, batch, client, exceptions, log, meta, templating, yaml_ext
+
+
+__all__ = ['RenderServer', 'serve']
+
+
+LOGGER = log.get_logger(__name__)
+
+
+class RenderHandler(socketserver.StreamRequestHandler):
+    """
+    Handle every request sent over a single connection until the client closes it.
+    """
+
+    def handle(self):
+        while True:
+            try:
+                request = client.read_message(self.rfile)
+            except exceptions.ProtocolError as e:
+                client.write_message(self.wfile, error_response(e))
+                return
+            if request is None:
+                return
+            client.write_message(self.wfile, self.server.respond(request))
+
+
+def error_response(error):
+    """
+    Build the response for a request that failed.
+
+    :param error: Exception instance
+    :return: Response dict
+    """
+    return dict(ok=False, error=dict(type=type(error).__name__, message=str(error)))
+
+
+class RenderServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Unix socket server that renders each request in its own thread.
+
+    :param path: Path of the Unix socket to listen on
+    :param template: Name of template file used when a request doesn't give one
+    :param search_path: Paths searched for templates when a request doesn't give them
+    :param env_options: Options given to :func:`~ydf.templating.load_template` unless a request overrides them
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path=None, template=templating.DEFAULT_TEMPLATE_NAME,
+                 search_path=templating.DEFAULT_TEMPLATE_PATH, **env_options):
+        self.path = path or client.default_socket_path()
+        self.template = template
+        self.search_path = search_path
+        self.env_options = env_options
+
+        if os.path.exists(self.path):
+            remove_stale_socket(self.path)
+
+        super(RenderServer, self).__init__(self.path, RenderHandler)
+        os.chmod(self.path, 0o600)
+
+        # Warm up so the first request doesn't pay for building the registry and compiling the template.
+        meta.get_instructions()
+        templating.load_template(self.template, self.search_path, **self.env_options)
+
+    def server_close(self):
+        super(RenderServer, self).server_close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def respond(self, request):
+        """
+        Build the response to a single request.
+
+        :param request: Request dict
+        :return: Response dict
+        """
+        op = request.get('op', client.OP_RENDER)
+        if op == client.OP_PING:
+            return dict(ok=True, version=__version__)
+        if op != client.OP_RENDER:
+            return error_response(exceptions.ProtocolError('Unknown op "{}"'.format(op)))
+
+        try:
+            return dict(ok=True, dockerfile=self.render(request))
+        except Exception as e:
+            LOGGER.debug('Failed to render request: %s', batch.format_error(e))
+            return error_response(e)
+
+    def render(self, request):
+        """
+        Render the YAML text or file given in a request.
+
+        :param request: Request dict
+        :return: The rendered Dockerfile
+        """
+        env_options = dict(self.env_options)
+        if 'autoescape' in request:
+            env_options['autoescape'] = bool(request['autoescape'])
+
+        template = templating.load_template(request.get('template') or self.template,
+                                            request.get('path') or self.search_path, **env_options)
+
+        if 'yaml' in request:
+            document = yaml_ext.load(request['yaml'])
+        elif 'file' in request:
+            document = yaml_ext.load_file(request['file'], copy=False)
+        else:
+            raise exceptions.ProtocolError('Render request requires "yaml" or "file"')
+
+        return templating.render_template(template, document)
+
+
+def remove_stale_socket(path):
+    """
+    Remove a socket file left behind by a daemon that is no longer running.
+
+    :param path: Path of the Unix socket
+    :raises OSError: If the path isn't a socket, or a daemon is listening on it
+    """
+    # Never remove a regular file, or a link to one, given as the socket path by mistake.
+    if not stat.S_ISSOCK(os.lstat(path).st_mode):
+        raise OSError('{} exists and is not a socket'.format(path))
+
+    try:
+        with client.Client(path, timeout=1):
+            pass
+    except OSError:
+        os.unlink(path)
+    else:
+        raise OSError('Another ydf daemon is already listening on {}'.format(path))
+
+
+def serve(path=None, template=templating.DEFAULT_TEMPLATE_NAME, search_path=templating.DEFAULT_TEMPLATE_PATH,
+          ready=None, **env_options):
+    """
+    Render requests received on a Unix socket until interrupted.
+
+    :param path: (Optional) Path of the Unix socket to listen on
+    :param template: Name of template file used when a request doesn't give one
+    :param search_path: Paths searched for templates when a request doesn't give them
+    :param ready: (Optional) Function called with the server once it is listening
+    :param env_options: Options given to :func:`~ydf.templating.load_template` unless a request overrides them
+    """
+    server = RenderServer(path, template, search_path, **env_options)
+    try:
+        if ready is not None:
+            ready(server)
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def serve_in_thread(path=None, template=templating.DEFAULT_TEMPLATE_NAME,
+                    search_path=templating.DEFAULT_TEMPLATE_PATH, **env_options):
+    """
+    Start a daemon within a background thread of this process.
+
+    :param path: (Optional) Path of the Unix socket to listen on
+    :param template: Name of template file used when a request doesn't give one
+    :param search_path: Paths searched for templates when a request doesn't give them
+    :param env_options: Options given to :func:`~ydf.templating.load_template` unless a request overrides them
+    :return: :class:`~ydf.server.RenderServer` instance; call `shutdown` and `server_close` to stop it
+    """
+    server = RenderServer(path, template, search_path, **env_options)
+    thread = threading.Thread(target=server.serve_forever, name='ydf-server', daemon=True)
+    thread.start()
+    return server
@@ -0,0 +1,120 @@
+"""
+    ydf/stream
+    ~~~~~~~~~~
+
+    Render each document of a multi-document YAML stream as soon as it is parsed.
+"""
+
+import io
+import os
+import sys
+
+from ydf import batch, passes, profiling, templating, yaml_ext
+
+
+__all__ = ['document_key', 'render_stream', 'render_streams']
+
+
+DEFAULT_KEY_FIELD = 'name'
+DEFAULT_OUTPUT_PATTERN = '{key}.Dockerfile'
+STDIN = '-'
+
+
+def document_key(document, index, key_field=DEFAULT_KEY_FIELD):
+    """
+    Get the value that identifies the given document within its stream.
+
+    :param document: Document parsed from the stream
+    :param index: Position of the document within the stream
+    :param key_field: Name of the field within the document `meta` block that identifies it
+    :return: Value of the `meta` field or position of the document if it isn't set
+    """
+    key = (document.get('meta') or {}).get(key_field)
+    return str(key) if key is not None else str(index)
+
+
+def render_stream(stream, name='<stream>', template=templating.DEFAULT_TEMPLATE_NAME,
+                  path=templating.DEFAULT_TEMPLATE_PATH, output_pattern=DEFAULT_OUTPUT_PATTERN, output_dir=None,
+                  key_field=DEFAULT_KEY_FIELD, **env_options):
+    """
+    Render each document within a `---` separated YAML stream to its own Dockerfile.
+
+    Documents are parsed lazily; each one is rendered and written to disk before the next is parsed so
+    memory use doesn't grow with the length of the stream. A failure to name or render a document, e.g. one
+    that isn't a mapping, does not stop the stream, however invalid YAML does since the parser can't recover
+    from it.
+
+    :param stream: File-like object containing YAML documents
+    :param name: Name of the stream used when reporting results
+    :param template: Name of template file to render
+    :param path: Path on disk to search for templates to render
+    :param output_pattern: Filename pattern for each generated Dockerfile; formatted with `key` and `index`
+    :param output_dir: (Optional) Directory to write generated Dockerfiles to
+    :param key_field: Name of the field within each document `meta` block used as its `key`
+    :param env_options: Options given to :func:`~ydf.templating.load_template`
+    :return: Generator that yields a :class:`~ydf.batch.Result` for each document, in order
+    """
+    tpl = templating.load_template(template, path, **env_options)
+    documents = yaml_ext.load_all_gen(stream)
+    index = 0
+
+    while True:
+        document_name = '{}[{}]'.format(name, index)
+        try:
+            with profiling.stage(profiling.STAGE_LOAD, document_name):
+                document = next(documents)
+        except StopIteration:
+            return
+        except Exception as e:
+            yield batch.Result(document_name, None, batch.format_error(e))
+            return
+
+        if document is not None:
+            output = None
+            removed = passes.removed()
+            try:
+                # A document that isn't a mapping, or a pattern with unknown fields, only fails that document.
+                output = output_pattern.format(key=document_key(document, index, key_field), index=index)
+                output = os.path.join(output_dir, output) if output_dir else output
+                with profiling.stage(profiling.STAGE_FILE, document_name):
+                    content = templating.render_template(tpl, document)
+                with profiling.stage(profiling.STAGE_WRITE, document_name):
+                    batch.write_file(output, content)
+            except Exception as e:
+                yield batch.Result(document_name, output, batch.format_error(e))
+            else:
+                yield batch.Result(document_name, output, removed=passes.removed() - removed)
+
+        index += 1
+
+
+def render_streams(paths, template=templating.DEFAULT_TEMPLATE_NAME, path=templating.DEFAULT_TEMPLATE_PATH,
+                   output_pattern=DEFAULT_OUTPUT_PATTERN, output_dir=None, key_field=DEFAULT_KEY_FIELD,
+                   **env_options):
+    """
+    Render every document within each of the YAML streams at the given paths.
+
+    :param paths: Sequence of YAML file paths; `-` reads from stdin
+    :param template: Name of template file to render
+    :param path: Path on disk to search for templates to render
+    :param output_pattern: Filename pattern for each generated Dockerfile; formatted with `key` and `index`
+    :param output_dir: (Optional) Directory to write generated Dockerfiles to
+    :param key_field: Name of the field within each document `meta` block used as its `key`
+    :param env_options: Options given to :func:`~ydf.templating.load_template`
+    :return: Generator that yields a :class:`~ydf.batch.Result` for each document, in order
+    """
+    for stream_path in paths:
+        if stream_path == STDIN:
+            yield from render_stream(sys.stdin, STDIN, template, path, output_pattern, output_dir, key_field,
+                                     **env_options)
+            continue
+
+        try:
+            f = io.open(stream_path, 'r')
+        except (IOError, OSError) as e:
+            yield batch.Result(stream_path, None, batch.format_error(e))
+            continue
+
+        with f:
+            yield from render_stream(f, stream_path, template, path, output_pattern, output_dir, key_field,
+                                     **env_options)
@@ -0,0 +1,159 @@
+"""
+    ydf/streaming
+    ~~~~~~~~~~~~~
+
+    Render a YAML file with a huge list of instructions while holding only one instruction in memory at a time.
+
+    The file is read incrementally by the parser. Each item under `instructions` is composed and constructed on
+    its own from the event stream, converted, written to the output and then discarded, so memory use depends on
+    the largest instruction instead of the size of the file. Unlike :mod:`~ydf.stream`, which renders each
+    document of a multi-document stream, this splits up a single document.
+"""
+
+import io
+import tempfile
+
+from ruamel.yaml import composer, events
+
+from ydf import instructions, native, passes, profiling, templating, yaml_ext
+
+
+__all__ = ['iter_document', 'render', 'render_file']
+
+
+INSTRUCTIONS_KEY = 'instructions'
+
+# Rendered instructions are held in memory up to this size while waiting for a `meta` block that comes after
+# them, then spill to a temporary file.
+SPOOL_MAX_SIZE = 1024 * 1024
+
+
+def iter_document(stream, loader=None):
+    """
+    Parse the top level mapping of a single YAML document one entry at a time.
+
+    Items of an `instructions` sequence are composed and constructed one at a time. Objects built for an item
+    are released once it's yielded; anchored nodes are kept so later items can alias them.
+
+    :param stream: File-like object or string containing a single YAML document
+    :param loader: (Optional) Name of loader backend to use; must be a ruamel.yaml loader
+    :return: Generator that yields a `(key, value)` tuple for each top level entry, except for the items of
+        `instructions`, which are each yielded as `(None, item)`
+    """
+    instance, parser, _, nodes = yaml_ext.event_loader(stream, loader)
+
+    # The composer keeps the anchors of the document, so an item can alias a node of an earlier one.
+    def construct():
+        return instance.construct_document(nodes.compose_node(None, None))
+
+    try:
+        parser.get_event()
+        if parser.check_event(events.StreamEndEvent):
+            return
+        parser.get_event()
+
+        if not parser.check_event(events.MappingStartEvent):
+            if construct() is not None:
+                raise TypeError('Expected a mapping at the top level of the document')
+        else:
+            parser.get_event()
+            while not parser.check_event(events.MappingEndEvent):
+                key = construct()
+                if key == INSTRUCTIONS_KEY and parser.check_event(events.SequenceStartEvent):
+                    parser.get_event()
+                    while not parser.check_event(events.SequenceEndEvent):
+                        yield None, construct()
+                    parser.get_event()
+                else:
+                    yield key, construct()
+            parser.get_event()
+
+        parser.get_event()
+        if not parser.check_event(events.StreamEndEvent):
+            raise composer.ComposerError(None, None, 'expected a single document in the stream',
+                                         parser.peek_event().start_mark)
+    finally:
+        instance.dispose()
+
+
+def render(stream, output, template=templating.DEFAULT_TEMPLATE_NAME, path=templating.DEFAULT_TEMPLATE_PATH,
+           autoescape=templating.DEFAULT_AUTOESCAPE, loader=None):
+    """
+    Render a YAML document with the built-in default template, writing each instruction as soon as it's parsed.
+
+    The output is identical to :func:`~ydf.templating.render`. Other templates may use instructions in any
+    order, and passes from :mod:`~ydf.passes` need every instruction at once, so neither is supported.
+
+    :param stream: File-like object or string containing a single YAML document
+    :param output: File-like object to write the Dockerfile to
+    :param template: Name of template file to render
+    :param path: Path on disk to search for templates to render
+    :param autoescape: Flag indicating if rendered values should be HTML escaped
+    :param loader: (Optional) Name of loader backend to use
+    :raises ValueError: If the template isn't the built-in default template or passes are enabled
+    :raises TypeError: If the document has a top level key that is a variable defined by ydf, e.g. `ydf`
+    """
+    if passes.ENABLED:
+        raise ValueError('Passes can\'t be applied while streaming instructions')
+
+    template = templating.load_template(template, path, autoescape)
+    if not isinstance(template, native.DefaultTemplate):
+        raise ValueError('Streaming requires the built-in default template')
+    context = templating._render_vars(None)
+    reserved = frozenset(context)
+    spool = None
+
+    def header():
+        if not native.supports(context):
+            raise ValueError('Streaming requires "ydf" and "meta" to be mappings with string keys')
+        output.write(template.header(context))
+
+    # Instructions go straight to the output once `meta` is known, otherwise to a spool until the document ends.
+    target = None
+
+    with profiling.stage(profiling.STAGE_RENDER):
+        for key, value in iter_document(stream, loader):
+            if key is None:
+                text = instructions.convert_instruction(value) + instructions.INSTRUCTION_SEPARATOR
+            elif key == INSTRUCTIONS_KEY:
+                # Not a sequence, so convert it the same way the template does.
+                text = instructions.convert_instructions(value)
+            elif key in reserved:
+                # Same error as rendering the loaded document, which passes the variable to `dict` twice.
+                raise TypeError('YAML variable "{}" conflicts with a variable defined by ydf'.format(key))
+            else:
+                context[key] = value
+                continue
+
+            if target is None:
+                if 'meta' in context:
+                    header()
+                    target = output
+                else:
+                    target = spool = tempfile.SpooledTemporaryFile(SPOOL_MAX_SIZE, mode='w+')
+            target.write(template.escape(text))
+
+        if target is not output:
+            header()
+        if spool is not None:
+            spool.seek(0)
+            for chunk in iter(lambda: spool.read(io.DEFAULT_BUFFER_SIZE), ''):
+                output.write(chunk)
+            spool.close()
+
+
+def render_file(yaml_path, output, template=templating.DEFAULT_TEMPLATE_NAME, path=templating.DEFAULT_TEMPLATE_PATH,
+                autoescape=templating.DEFAULT_AUTOESCAPE, loader=None):
+    """
+    Render the YAML file at the given path with the built-in default template, reading it incrementally.
+
+    :param yaml_path: Path to YAML file on disk
+    :param output: File-like object to write the Dockerfile to
+    :param template: Name of template file to render
+    :param path: Path on disk to search for templates to render
+    :param autoescape: Flag indicating if rendered values should be HTML escaped
+    :param loader: (Optional) Name of loader backend to use
+    """
+    with profiling.stage(profiling.STAGE_FILE, yaml_path), yaml_ext.loading(yaml_path, loader):
+        with io.open(yaml_path, 'r') as f:
+            render(f, output, template, path, autoescape, loader)
@@ -5,14 +5,20 @@
     Contains functions to be exported into the Jinja2 environment and accessible from templates.
 """
 
-import jinja2
 import os
 
-from ydf import instructions, __version__
+from ydf import profiling, __version__
 
 
 DEFAULT_TEMPLATE_NAME = 'default.tpl'
 DEFAULT_TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates')
+DEFAULT_AUTOESCAPE = True
+DEFAULT_NATIVE = True
+DEFAULT_TEMPLATE_ARCHIVE = '.ydf-templates.zip'
+
+
+ENVIRONMENT_CACHE = {}
+NATIVE_CACHE = {}
 
 
 def _render_vars(yaml_vars):
@@ -27,32 +33,211 @@ def _render_vars(yaml_vars):
     return dict(ydf=dict(version=__version__), **(yaml_vars or {}))
 
 
-def _environ(path=DEFAULT_TEMPLATE_PATH, **kwargs):
+def _environ(path=DEFAULT_TEMPLATE_PATH, autoescape=DEFAULT_AUTOESCAPE, bytecode_cache=None, cached=True,
+             template_archive=None, **kwargs):
     """
     Build a Jinja2 environment for the given template directory path and options.
 
-    :param path: Path to search for Jinja2 template files
+    Environments are cached by search path and options so templates compiled by one call are reused
+    by the next.
+
+    :param path: Path, or sequence of paths, to search for Jinja2 template files
+    :param autoescape: Flag indicating if rendered values should be HTML escaped
+    :param bytecode_cache: (Optional) Directory used to cache compiled template bytecode between processes
+    :param cached: Flag indicating if caller is OK with receiving a cached environment.
+    :param template_archive: (Optional) Archive written by :func:`~ydf.templating.compile_templates` to load
+        compiled templates from, if it exists
     :param kwargs: Options to configure the environment
     :return: :class:`~jinja2.Environment` instance
     """
+    # Imported here so commands that never render, e.g. `--help` or a thin client, start faster.
+    import jinja2
+    from ydf import instructions
+
     kwargs.setdefault('trim_blocks', True)
     kwargs.setdefault('lstrip_blocks', True)
     kwargs.setdefault('undefined', jinja2.StrictUndefined)
 
-    env = jinja2.Environment(autoescape=True, loader=jinja2.FileSystemLoader(path), **kwargs)
-    env.globals[instructions.convert_instruction.__name__] = instructions.convert_instruction
+    path = (path,) if isinstance(path, str) else tuple(path)
+    key = (path, autoescape, bytecode_cache, template_archive, tuple(sorted(kwargs.items())))
+
+    env = ENVIRONMENT_CACHE.get(key) if cached else None
+    if env is None:
+        if bytecode_cache is not None:
+            os.makedirs(bytecode_cache, exist_ok=True)
+            kwargs['bytecode_cache'] = jinja2.FileSystemBytecodeCache(bytecode_cache)
+
+        loader = jinja2.FileSystemLoader(path)
+        if template_archive is not None and os.path.isfile(template_archive):
+            from ydf import precompiled
+            loader = precompiled.ArchiveLoader(template_archive, loader)
+
+        # Dockerfiles aren't HTML, so escaping is the caller's choice rather than a defence against XSS.
+        env = jinja2.Environment(autoescape=autoescape, loader=loader, **kwargs)  # nosec B701
+        env.globals[instructions.convert_instruction.__name__] = instructions.convert_instruction
+        env.globals[instructions.convert_instructions.__name__] = instructions.convert_instructions
+        ENVIRONMENT_CACHE[key] = env
 
     return env
 
 
-def render(yaml_vars, template=DEFAULT_TEMPLATE_NAME, path=DEFAULT_TEMPLATE_PATH):
+def _find_template(template, path):
+    """
+    Find the file a template name resolves to, searching paths in order like :class:`~jinja2.FileSystemLoader`.
+
+    :param template: Name of template file
+    :param path: Path, or sequence of paths, to search for template files
+    :return: Absolute path of the template file, or `None` if it isn't found
+    """
+    for directory in ((path,) if isinstance(path, str) else path):
+        filename = os.path.join(directory, template)
+        if os.path.isfile(filename):
+            return os.path.abspath(filename)
+    return None
+
+
+def _is_default_template(template, path):
+    """
+    Check if the given template name and search path resolve to the built-in default template.
+
+    :param template: Name of template file
+    :param path: Path, or sequence of paths, to search for template files
+    :return: `True` if the built-in `default.tpl` would be loaded, `False` otherwise
+    """
+    if template != DEFAULT_TEMPLATE_NAME:
+        return False
+    filename = _find_template(template, path)
+    return filename is not None and os.path.samefile(filename, os.path.join(DEFAULT_TEMPLATE_PATH, template))
+
+
+def load_template(template=DEFAULT_TEMPLATE_NAME, path=DEFAULT_TEMPLATE_PATH, autoescape=DEFAULT_AUTOESCAPE,
+                  bytecode_cache=None, native=DEFAULT_NATIVE, template_archive=None):
+    """
+    Load and compile a template so it can be rendered any number of times.
+
+    When the built-in default template is requested, a :class:`~ydf.native.DefaultTemplate` that renders
+    the same output without Jinja2 is returned instead, unless `native` is disabled.
+
+    :param template: Name of template file to load
+    :param path: Path on disk to search for templates to load
+    :param autoescape: Flag indicating if rendered values should be HTML escaped
+    :param bytecode_cache: (Optional) Directory used to cache compiled template bytecode between processes
+    :param native: Flag indicating if the built-in default template may be rendered without Jinja2
+    :param template_archive: (Optional) Archive written by :func:`~ydf.templating.compile_templates` to load
+        compiled templates from, if it exists
+    :return: :class:`~jinja2.Template` or :class:`~ydf.native.DefaultTemplate` instance
+    """
+    with profiling.stage(profiling.STAGE_TEMPLATE):
+        if native:
+            native_template = _native_template(template, path, autoescape, bytecode_cache, template_archive)
+            if native_template is not None:
+                return native_template
+        return _environ(path, autoescape, bytecode_cache, template_archive=template_archive).get_template(template)
+
+
+def _native_template(template, path, autoescape, bytecode_cache, template_archive=None):
+    """
+    Get the native replacement for a template, if it has one.
+
+    Whether a template has one is cached by search path, the same way Jinja2 caches the file a template
+    name resolves to.
+
+    :param template: Name of template file
+    :param path: Path, or sequence of paths, to search for template files
+    :param autoescape: Flag indicating if rendered values should be HTML escaped
+    :param bytecode_cache: (Optional) Directory used to cache compiled template bytecode when falling back to Jinja2
+    :param template_archive: (Optional) Archive of compiled templates used when falling back to Jinja2
+    :return: :class:`~ydf.native.DefaultTemplate` instance, or `None` if the template must be rendered by Jinja2
+    """
+    path = (path,) if isinstance(path, str) else tuple(path)
+    key = (template, path, autoescape, bytecode_cache, template_archive)
+
+    try:
+        return NATIVE_CACHE[key]
+    except KeyError:
+        pass
+
+    result = None
+    if _is_default_template(template, path):
+        from ydf import native
+        result = native.DefaultTemplate(_find_template(template, path), autoescape,
+                                        lambda: load_template(template, path, autoescape, bytecode_cache, False,
+                                                              template_archive))
+
+    NATIVE_CACHE[key] = result
+    return result
+
+
+def template_dependencies(template=DEFAULT_TEMPLATE_NAME, path=DEFAULT_TEMPLATE_PATH, **kwargs):
+    """
+    Find the files of the given template and every template it references through `extends`, `include`
+    or `import`, recursively.
+
+    References that can't be determined statically, e.g. `{% include some_variable %}`, are ignored.
+
+    :param template: Name of template file
+    :param path: Path on disk to search for templates
+    :param kwargs: Options given to :func:`~ydf.templating._environ`
+    :return: List of absolute template file paths, starting with the given template
+    """
+    import jinja2.meta
+
+    env = _environ(path, **kwargs)
+    names, files = [template], []
+    seen = set(names)
+
+    while names:
+        source, filename, _ = env.loader.get_source(env, names.pop(0))
+        files.append(os.path.abspath(filename))
+        for name in jinja2.meta.find_referenced_templates(env.parse(source)):
+            if name is not None and name not in seen:
+                seen.add(name)
+                names.append(name)
+
+    return files
+
+
+def compile_templates(target=DEFAULT_TEMPLATE_ARCHIVE, path=DEFAULT_TEMPLATE_PATH):
+    """
+    Compile every template on the given search paths into an archive that :func:`~ydf.templating.load_template`
+    loads instead of compiling template sources.
+
+    :param target: Path of zip archive to write
+    :param path: Path, or sequence of paths, to search for template files
+    :return: Tuple of the names of templates compiled and a dict of names that failed to compile to their error
+    """
+    from ydf import precompiled
+
+    environments = {autoescape: _environ(path, autoescape, cached=False) for autoescape in (True, False)}
+    return precompiled.compile_templates(target, environments)
+
+
+def render_template(template, yaml_vars):
+    """
+    Render an already loaded template.
+
+    :param template: Template returned by :func:`~ydf.templating.load_template`
+    :param yaml_vars: Mapping of variables parsed from a YAML file.
+    :return: The rendered template.
+    """
+    with profiling.stage(profiling.STAGE_RENDER):
+        return template.render(_render_vars(yaml_vars))
+
+
+def render(yaml_vars, template=DEFAULT_TEMPLATE_NAME, path=DEFAULT_TEMPLATE_PATH, autoescape=DEFAULT_AUTOESCAPE,
+           bytecode_cache=None, native=DEFAULT_NATIVE, template_archive=None):
     """
     Render a template.
 
     :param yaml_vars: Mapping of variables parsed from a YAML file.
     :param template: Name of template file to render
     :param path: Path on disk to search for templates to render
+    :param autoescape: Flag indicating if rendered values should be HTML escaped
+    :param bytecode_cache: (Optional) Directory used to cache compiled template bytecode between processes
+    :param native: Flag indicating if the built-in default template may be rendered without Jinja2
+    :param template_archive: (Optional) Archive written by :func:`~ydf.templating.compile_templates` to load
+        compiled templates from, if it exists
     :return: The rendered template.
     """
-    env = _environ(path)
-    return env.get_template(template).render(_render_vars(yaml_vars))
+    return render_template(load_template(template, path, autoescape, bytecode_cache, native, template_archive),
+                           yaml_vars)
@@ -0,0 +1,211 @@
+"""
+    ydf/watch
+    ~~~~~~~~~
+
+    Watch YAML files and templates for changes and re-render only the Dockerfiles they affect.
+"""
+
+import collections
+import os
+import time
+
+from ydf import batch, templating
+
+
+__all__ = ['DependencyGraph', 'Watcher', 'watch']
+
+
+DEFAULT_INTERVAL = 0.5
+
+
+class DependencyGraph(object):
+    """
+    Map of files on disk to the YAML inputs whose Dockerfiles depend on them.
+    """
+
+    def __init__(self):
+        self.dependents = collections.defaultdict(set)
+        self.dependencies = collections.defaultdict(set)
+
+    def set(self, yaml_path, dependencies):
+        """
+        Replace the dependencies of the given YAML input.
+
+        :param yaml_path: Path to YAML input
+        :param dependencies: Sequence of file paths the rendered Dockerfile depends on
+        """
+        self.remove(yaml_path)
+        for dependency in dependencies:
+            self.dependents[dependency].add(yaml_path)
+            self.dependencies[yaml_path].add(dependency)
+
+    def remove(self, yaml_path):
+        """
+        Remove the given YAML input from the graph.
+
+        :param yaml_path: Path to YAML input
+        """
+        for dependency in self.dependencies.pop(yaml_path, ()):
+            dependents = self.dependents[dependency]
+            dependents.discard(yaml_path)
+            if not dependents:
+                del self.dependents[dependency]
+
+    def files(self):
+        """
+        Get every file that at least one YAML input depends on.
+
+        :return: Set of file paths
+        """
+        return set(self.dependents)
+
+    def affected(self, changed):
+        """
+        Get the YAML inputs whose Dockerfiles depend on any of the given files.
+
+        :param changed: Sequence of changed file paths
+        :return: Set of YAML input paths
+        """
+        affected = set()
+        for path in changed:
+            affected.update(self.dependents.get(path, ()))
+        return affected
+
+
+def snapshot(paths):
+    """
+    Capture the modification time and size of each file at the given paths.
+
+    :param paths: Sequence of file paths
+    :return: Dict of path to stat tuple, or `None` for paths that don't exist
+    """
+    stats = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+            stats[path] = (st.st_mtime_ns, st.st_size)
+        except (IOError, OSError):
+            stats[path] = None
+    return stats
+
+
+class Watcher(object):
+    """
+    Poll YAML inputs and the templates they render with, re-rendering the Dockerfiles affected by each change.
+
+    The process, template environment and instruction registry stay warm between polls so a re-render only
+    pays for parsing and rendering the affected files.
+    """
+
+    def __init__(self, patterns, template=templating.DEFAULT_TEMPLATE_NAME, path=templating.DEFAULT_TEMPLATE_PATH,
+                 output_pattern=batch.DEFAULT_OUTPUT_PATTERN, output_dir=None, **env_options):
+        self.patterns = patterns
+        self.template = template
+        self.path = path
+        self.output_pattern = output_pattern
+        self.output_dir = output_dir
+        self.env_options = env_options
+        self.graph = DependencyGraph()
+        self.inputs = []
+        self.stats = {}
+        self.template_files = []
+
+    def _template_files(self):
+        self.template_files = templating.template_dependencies(self.template, self.path, **self.env_options)
+        return self.template_files
+
+    def _render(self, paths):
+        """
+        Render the given YAML inputs in a stable order.
+
+        :param paths: Collection of YAML input paths
+        :return: List of :class:`~ydf.batch.Result` instances
+        """
+        paths = [p for p in self.inputs if p in paths]
+        results = list(batch.render_files(paths, self.template, self.path, self.output_pattern, self.output_dir,
+                                          **self.env_options))
+
+        # Files included with `!include` are only known once a YAML input is parsed, and may have changed.
+        template_files = self._template_files()
+        for result in results:
+            if result.ok:
+                self.graph.set(result.path, [result.path] + list(result.includes) + template_files)
+        self.stats.update(snapshot(self.graph.files().difference(self.stats)))
+        return results
+
+    def start(self):
+        """
+        Build the dependency graph and render every YAML input.
+
+        :return: List of :class:`~ydf.batch.Result` instances
+        """
+        self.inputs = batch.expand_paths(self.patterns)
+        template_files = self._template_files()
+        for yaml_path in self.inputs:
+            self.graph.set(yaml_path, [yaml_path] + template_files)
+
+        self.stats = snapshot(self.graph.files())
+        return self._render(set(self.inputs))
+
+    def poll(self):
+        """
+        Check watched files for changes and re-render the affected YAML inputs.
+
+        :return: List of :class:`~ydf.batch.Result` instances; empty if nothing changed
+        """
+        inputs = batch.expand_paths(self.patterns)
+        added = [p for p in inputs if p not in self.graph.dependencies]
+        for yaml_path in set(self.inputs).difference(inputs):
+            self.graph.remove(yaml_path)
+        self.inputs = inputs
+
+        stats = snapshot(self.graph.files())
+        changed = [p for p, stat in stats.items() if stat != self.stats.get(p)]
+        affected = self.graph.affected(changed)
+
+        # A changed template may now include different templates, so its dependencies are found again. Files
+        # included with `!include` are kept, as they are only found again when a YAML input is rendered.
+        if added or set(changed).difference(inputs):
+            old_template_files = set(self.template_files)
+            template_files = set(self._template_files())
+            for yaml_path in inputs:
+                dependencies = self.graph.dependencies.get(yaml_path, {yaml_path})
+                self.graph.set(yaml_path, (dependencies - old_template_files) | template_files)
+            stats.update(snapshot(self.graph.files().difference(stats)))
+
+        self.stats = stats
+        return self._render(affected.union(added))
+
+
+def watch(patterns, template=templating.DEFAULT_TEMPLATE_NAME, path=templating.DEFAULT_TEMPLATE_PATH,
+          output_pattern=batch.DEFAULT_OUTPUT_PATTERN, output_dir=None, interval=DEFAULT_INTERVAL, callback=None,
+          iterations=None, **env_options):
+    """
+    Render the YAML inputs and keep re-rendering affected Dockerfiles as files change.
+
+    :param patterns: Sequence of YAML file paths, directories or glob patterns; re-expanded on each poll
+    :param template: Name of template file to render
+    :param path: Path on disk to search for templates to render
+    :param output_pattern: Filename pattern for each generated Dockerfile
+    :param output_dir: (Optional) Directory to write generated Dockerfiles to
+    :param interval: Number of seconds to wait between polls
+    :param callback: (Optional) Function called with the results and elapsed seconds of each render
+    :param iterations: (Optional) Number of polls before returning; watch forever if not given
+    :param env_options: Options given to :func:`~ydf.templating.load_template`
+    """
+    watcher = Watcher(patterns, template, path, output_pattern, output_dir, **env_options)
+
+    start = time.perf_counter()
+    results = watcher.start()
+    if callback is not None:
+        callback(results, time.perf_counter() - start)
+
+    count = 0
+    while iterations is None or count < iterations:
+        count += 1
+        time.sleep(interval)
+
+        start = time.perf_counter()
+        results = watcher.poll()
+        if results and callback is not None:
+            callback(results, time.perf_counter() - start)
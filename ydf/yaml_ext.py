@@ -6,79 +6,559 @@
 """
 
 import collections
+import contextlib
 import io
 import os
+import threading
 
-from ruamel import yaml
-from ruamel.yaml import resolver
+from ydf import exceptions, profiling
 
 
-__all__ = ['load', 'load_all', 'load_all_gen', 'load_file', 'load_files']
+__all__ = ['load', 'load_all', 'load_all_gen', 'load_file', 'load_files', 'get_loader', 'set_default_loader',
+           'available_loaders', 'loader_name', 'event_loader', 'cache_info', 'clear_cache', 'set_cache_size',
+           'include', 'includes', 'loading']
 
 
-class OrderedRoundTripLoader(yaml.RoundTripLoader):
+LOADER_AUTO = 'auto'
+LOADER_CSAFE = 'csafe'
+LOADER_PYYAML = 'pyyaml'
+LOADER_SAFE = 'safe'
+LOADER_ROUNDTRIP = 'roundtrip'
+
+LOADER_NAMES = (LOADER_AUTO, LOADER_CSAFE, LOADER_PYYAML, LOADER_SAFE, LOADER_ROUNDTRIP)
+
+# Backend used by `auto`; when `None` it's the fastest one installed, which is determined on first use.
+AUTO_LOADER = None
+DEFAULT_LOADER = LOADER_AUTO
+
+DEFAULT_CACHE_SIZE = 1024
+
+INCLUDE_TAG = '!include'
+INCLUDE_KEY_SEPARATOR = '#'
+DEFAULT_FRAGMENT_CACHE_SIZE = 1024
+
+
+def _loaders():
+    # The YAML libraries are imported here, on first use, to keep `import ydf.yaml_ext` cheap.
+    from ydf import yaml_loaders
+    return yaml_loaders
+
+
+# Thin wrappers for names that moved to :mod:`~ydf.yaml_loaders`, so existing imports from here keep working without
+# importing the YAML libraries until one is used. The supported Python versions (2.7, 3.5 and 3.6) predate module
+# level `__getattr__` (PEP 562), so these are explicit functions rather than the classes themselves.
+
+def OrderedRoundTripLoader(*args, **kwargs):
+    """
+    Create a :class:`~ydf.yaml_loaders.OrderedRoundTripLoader`.
+
+    :param args: Positional arguments for the loader
+    :param kwargs: Keyword arguments for the loader
+    :return: Loader instance
+    """
+    return _loaders().OrderedRoundTripLoader(*args, **kwargs)
+
+
+def OrderedSafeLoader(*args, **kwargs):
+    """
+    Create a :class:`~ydf.yaml_loaders.OrderedSafeLoader`.
+
+    :param args: Positional arguments for the loader
+    :param kwargs: Keyword arguments for the loader
+    :return: Loader instance
     """
-    Extends the default round trip YAML loader to use :class:`~collections.OrderedDict` for mapping
-    types.
+    return _loaders().OrderedSafeLoader(*args, **kwargs)
+
+
+def OrderedCSafeLoader(*args, **kwargs):
+    """
+    Create a :class:`~ydf.yaml_loaders.OrderedCSafeLoader`.
+
+    :param args: Positional arguments for the loader
+    :param kwargs: Keyword arguments for the loader
+    :return: Loader instance
+    :raises ValueError: When libyaml isn't installed
     """
+    return get_loader(LOADER_CSAFE)(*args, **kwargs)
 
-    def __init__(self, *args, **kwargs):
-        super(OrderedRoundTripLoader, self).__init__(*args, **kwargs)
-        self.add_constructor(yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG, self.construct_ordered_mapping)
 
-    @staticmethod
-    def construct_ordered_mapping(loader, node):
-        loader.flatten_mapping(node)
-        return collections.OrderedDict(loader.construct_pairs(node))
+def construct_ordered_mapping(loader, node):
+    """
+    Construct an :class:`~collections.OrderedDict` from a YAML mapping node, see
+    :func:`~ydf.yaml_loaders.construct_ordered_mapping`.
+
+    :param loader: Loader instance constructing the node
+    :param node: YAML mapping node
+    :return: :class:`~collections.OrderedDict` of the mapping
+    """
+    return _loaders().construct_ordered_mapping(loader, node)
+
+
+def available_loaders():
+    """
+    Get the names of every YAML loader backend that is installed, fastest first.
+
+    :return: List of loader backend names
+    """
+    return _loaders().available()
+
+
+def loader_name(name=None):
+    """
+    Get the name of the loader backend that loads YAML for the given backend name, resolving `auto`.
+
+    :param name: (Optional) Name of loader backend; uses the default loader if not given
+    :return: Name of a loader backend other than `auto`
+    """
+    name = name or DEFAULT_LOADER
+    if name == LOADER_AUTO:
+        name = AUTO_LOADER or _loaders().AUTO_LOADER
+    return name
+
+
+def get_loader(name=None):
+    """
+    Get the YAML loader class for the given backend name.
+
+    :param name: (Optional) Name of loader backend; uses the default loader if not given
+    :return: Loader class
+    """
+    yaml_loaders = _loaders()
+    name = loader_name(name)
+
+    try:
+        return yaml_loaders.get(name)
+    except KeyError:
+        raise ValueError('YAML loader "{}" is not available; choose from {}'.format(
+            name, ', '.join(yaml_loaders.available())))
 
 
-def load_file(path):
+def event_loader(stream, name=None):
+    """
+    Create a loader for the given stream that exposes the parser, resolver and composer of its backend, to compose
+    and construct a document one node at a time.
+
+    :param stream: File-like object or string containing YAML
+    :param name: (Optional) Name of loader backend; uses the default loader if not given
+    :return: :class:`~ydf.yaml_loaders.EventLoader` whose `loader` must be disposed of by the caller
+    :raises ValueError: If the backend isn't available or isn't a ruamel.yaml loader
+    """
+    yaml_loaders = _loaders()
+    cls = get_loader(name)
+    if yaml_loaders.yaml_module(cls) is not yaml_loaders.yaml:
+        raise ValueError('YAML loader "{}" doesn\'t expose its events; choose a ruamel.yaml loader'.format(
+            loader_name(name)))
+    return yaml_loaders.event_loader(stream, cls)
+
+
+def set_default_loader(name=LOADER_AUTO):
+    """
+    Set the YAML loader backend used when one isn't explicitly given.
+
+    By default, the libyaml based loader is used when available, falling back to the pure python round
+    trip loader otherwise.
+
+    :param name: Name of loader backend
+    """
+    global DEFAULT_LOADER
+
+    get_loader(name)
+    DEFAULT_LOADER = name
+
+
+CacheInfo = collections.namedtuple('CacheInfo', 'hits misses evictions maxsize currsize')
+
+
+def _copy_document(value, memo=None):
+    """
+    Copy the mappings and sequences of a parsed document, sharing its scalars, which can't be modified.
+
+    This is much faster than :func:`copy.deepcopy`. Containers that are the same object, e.g. a YAML alias of an
+    anchored node, are copied once and stay the same object in the copy.
+
+    :param value: Document, or value within one
+    :param memo: (Optional) Dict of the id of each container copied so far to its copy
+    :return: Copy of the value
+    """
+    if not isinstance(value, (dict, list, tuple, set)):
+        return value
+
+    if memo is None:
+        memo = {}
+    copied = memo.get(id(value))
+    if copied is not None:
+        return copied
+
+    if isinstance(value, dict):
+        copied = memo[id(value)] = value.__class__()
+        for key, item in value.items():
+            copied[key] = _copy_document(item, memo)
+    elif isinstance(value, list):
+        copied = memo[id(value)] = value.__class__()
+        copied.extend(_copy_document(item, memo) for item in value)
+    elif isinstance(value, tuple):
+        copied = memo[id(value)] = tuple(_copy_document(item, memo) for item in value)
+    else:
+        copied = memo[id(value)] = value.__class__(value)
+    return copied
+
+
+class DocumentCache(object):
+    """
+    Size bounded, least recently used cache of documents parsed from YAML files.
+
+    Entries are keyed by absolute path and only returned while the modification time, size and loader
+    match those of the cached document. Documents are copied going in and coming out so callers can't
+    modify a cached document, unless the caller agrees not to modify the documents it gives or gets.
+    """
+
+    def __init__(self, maxsize=0):
+        self.maxsize = maxsize
+        self.hits = self.misses = self.evictions = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path, version, is_current=None, copy=True):
+        """
+        Get the document cached for the given path and version.
+
+        :param path: Absolute path to YAML file
+        :param version: Tuple that identifies the version of the file, e.g. modification time, size and loader
+        :param is_current: (Optional) Function called with the cached document that returns `False` if it's stale
+        :param copy: Flag indicating if a copy is returned; if not, the caller must not modify the document
+        :return: Cached document or `None` if it isn't cached
+        """
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != version or (is_current is not None and not is_current(entry[1])):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(path)
+            self.hits += 1
+        return _copy_document(entry[1]) if copy else entry[1]
+
+    def put(self, path, version, document, copy=True):
+        """
+        Cache the given document, evicting the least recently used documents when full.
+
+        :param path: Absolute path to YAML file
+        :param version: Tuple that identifies the version of the file, e.g. modification time, size and loader
+        :param document: Document parsed from the file
+        :param copy: Flag indicating if a copy is cached; if not, the caller must not modify the document
+        """
+        if copy:
+            document = _copy_document(document)
+        with self._lock:
+            self._entries[path] = (version, document)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def resize(self, maxsize):
+        """
+        Change the number of documents the cache holds, evicting documents if it shrinks.
+
+        :param maxsize: Maximum number of documents; zero disables the cache
+        """
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Remove all documents and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self):
+        """
+        Get the cache statistics.
+
+        :return: :class:`~ydf.yaml_ext.CacheInfo` instance
+        """
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._entries))
+
+
+DOCUMENT_CACHE = DocumentCache()
+
+# Documents of files included with `!include`, shared by every file a process loads.
+FRAGMENT_CACHE = DocumentCache(DEFAULT_FRAGMENT_CACHE_SIZE)
+
+# Absolute path of each file loaded by this process to the files it included, directly or not, the last time. Least
+# recently loaded files are forgotten beyond the size of the document cache, or `INCLUDES_SIZE` if that's smaller,
+# so a long running `serve` or `--watch` process doesn't hold every file it has ever loaded.
+INCLUDES = collections.OrderedDict()
+INCLUDES_SIZE = DEFAULT_CACHE_SIZE
+INCLUDES_LOCK = threading.Lock()
+
+# Files being loaded by the current thread, innermost last, so includes resolve relative to the including file.
+LOADING = threading.local()
+
+
+class _Loading(object):
+    """
+    File being loaded, and the versions of the files it has included so far.
+    """
+
+    def __init__(self, path, loader):
+        self.path = path
+        self.loader = loader
+        self.includes = collections.OrderedDict()
+
+
+def _loading_stack():
+    stack = getattr(LOADING, 'stack', None)
+    if stack is None:
+        stack = LOADING.stack = []
+    return stack
+
+
+@contextlib.contextmanager
+def loading(path=None, loader=None):
+    """
+    Context manager that resolves `!include` tags of YAML parsed within it relative to the given file.
+
+    :param path: (Optional) Path of the file being loaded; includes resolve relative to the working directory if
+        not given
+    :param loader: (Optional) Name of loader backend used to load included files
+    :return: Context manager that yields an `OrderedDict` of the path of each included file to its version
+    """
+    stack = _loading_stack()
+    frame = _Loading(os.path.abspath(path) if path else None, loader)
+    stack.append(frame)
+    try:
+        yield frame.includes
+    finally:
+        stack.pop()
+
+
+def _file_version(path):
+    """
+    Get the version of the file at the given path.
+
+    :param path: Path to file on disk
+    :return: Tuple of modification time and size, or `None` if it doesn't exist
+    """
+    try:
+        st = os.stat(path)
+    except (IOError, OSError):
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _includes_current(entry):
+    """
+    Check that none of the files included by a cached document have changed.
+
+    :param entry: Tuple of document and `OrderedDict` of included file paths to their versions
+    :return: `True` if every included file is unchanged, `False` otherwise
+    """
+    return all(_file_version(path) == version for path, version in entry[1].items())
+
+
+def include(reference):
+    """
+    Load the document, or one of its top level values, that an `!include path[#key]` tag refers to.
+
+    The path is relative to the file being loaded. Documents of included files are cached by path, modification
+    time and size, so a file included by many others is parsed once per process. Only the included value is
+    copied, as the cached document is never handed out.
+
+    :param reference: Path of a YAML file, optionally followed by `#` and a top level key within it
+    :return: Copy of the included document, or of the value of the key
+    :raises IncludeError: If the file or key doesn't exist, or the file includes itself
+    """
+    stack = _loading_stack()
+    frame = stack[-1] if stack else _Loading(None, None)
+
+    path, _, key = reference.partition(INCLUDE_KEY_SEPARATOR)
+    base = os.path.dirname(frame.path) if frame.path else os.getcwd()
+    path = os.path.abspath(os.path.join(base, path))
+
+    loading_paths = [f.path for f in stack]
+    if path in loading_paths:
+        raise exceptions.IncludeError('Include cycle: {}'.format(
+            ' -> '.join(loading_paths[loading_paths.index(path):] + [path])))
+
+    version = _file_version(path)
+    if version is None:
+        raise exceptions.IncludeError('Included file "{}" does not exist'.format(path))
+
+    loader = frame.loader or DEFAULT_LOADER
+    entry = FRAGMENT_CACHE.get(path, version + (loader,), _includes_current, copy=False)
+    if entry is None:
+        with loading(path, loader) as nested, io.open(path, 'r') as f:
+            entry = (load(f.read(), loader), nested)
+        FRAGMENT_CACHE.put(path, version + (loader,), entry, copy=False)
+
+    document, nested = entry
+    cycle = [p for p in nested if p in loading_paths]
+    if cycle:
+        raise exceptions.IncludeError('Include cycle: {} -> {}'.format(path, cycle[0]))
+
+    frame.includes[path] = version
+    frame.includes.update(nested)
+
+    if not key:
+        return _copy_document(document)
+    try:
+        return _copy_document(document[key])
+    except (KeyError, TypeError):
+        raise exceptions.IncludeError('Included file "{}" has no top level key "{}"'.format(path, key))
+
+
+def _record_includes(path, included):
+    """
+    Remember the files included by the YAML file at the given path, forgetting the least recently loaded files.
+
+    :param path: Absolute path to YAML file on disk
+    :param included: Iterable of absolute paths of included files
+    """
+    with INCLUDES_LOCK:
+        INCLUDES[path] = tuple(included)
+        INCLUDES.move_to_end(path)
+        while len(INCLUDES) > max(DOCUMENT_CACHE.maxsize, INCLUDES_SIZE):
+            INCLUDES.popitem(last=False)
+
+
+def includes(path):
+    """
+    Get the files included, directly or not, by the YAML file at the given path the last time it was loaded.
+
+    Watch mode and incremental builds use these to re-render a Dockerfile when a file it includes changes. Only
+    recently loaded files are remembered, see :data:`~ydf.yaml_ext.INCLUDES`.
+
+    :param path: Path to YAML file on disk
+    :return: Tuple of absolute paths of included files
+    """
+    return tuple(INCLUDES.get(os.path.abspath(path), ()))
+
+
+def set_cache_size(maxsize=DEFAULT_CACHE_SIZE):
+    """
+    Enable the cache of documents loaded by :func:`~ydf.yaml_ext.load_file` with the given size.
+
+    :param maxsize: Maximum number of documents to cache; zero disables the cache
+    """
+    DOCUMENT_CACHE.resize(maxsize)
+
+
+def cache_info():
+    """
+    Get the hit, miss and eviction counters of the document cache.
+
+    :return: :class:`~ydf.yaml_ext.CacheInfo` instance
+    """
+    return DOCUMENT_CACHE.info()
+
+
+def clear_cache():
+    """
+    Remove all documents from the document and included fragment caches, reset their counters and forget the files
+    each loaded file included.
+    """
+    DOCUMENT_CACHE.clear()
+    FRAGMENT_CACHE.clear()
+    with INCLUDES_LOCK:
+        INCLUDES.clear()
+
+
+def load_file(path, loader=None, cached=True, copy=True):
     """
     Load a single document from the YAML file at the given path.
 
+    When the document cache is enabled with :func:`~ydf.yaml_ext.set_cache_size`, a copy of the document
+    is returned from the cache while the file modification time and size are unchanged.
+
     :param path: Path to YAML file on disk.
+    :param loader: (Optional) Name of loader backend to use.
+    :param cached: Flag indicating if caller is OK with receiving a cached document.
+    :param copy: Flag indicating if a cached document is copied; if not, the caller must not modify the document.
     :return: An :class:`~collections.OrderedDict` representation of the YAML stream.
     """
-    with io.open(os.path.abspath(path), 'r') as f:
-        return load(f.read())
+    path = os.path.abspath(path)
+
+    with profiling.stage(profiling.STAGE_LOAD):
+        if not cached or not DOCUMENT_CACHE.maxsize:
+            return _load_file(path, loader)[0]
+
+        st = os.stat(path)
+        version = (st.st_mtime_ns, st.st_size, loader or DEFAULT_LOADER)
 
+        entry = DOCUMENT_CACHE.get(path, version, _includes_current, copy)
+        if entry is None:
+            entry = _load_file(path, loader)
+            DOCUMENT_CACHE.put(path, version, entry, copy)
+        else:
+            _record_includes(path, entry[1])
 
-def load_files(paths):
+        return entry[0]
+
+
+def _load_file(path, loader=None):
+    """
+    Parse the YAML file at the given path, recording the files it includes.
+
+    :param path: Absolute path to YAML file on disk.
+    :param loader: (Optional) Name of loader backend to use.
+    :return: Tuple of the document and an `OrderedDict` of the path of each included file to its version
+    """
+    with loading(path, loader) as included, io.open(path, 'r') as f:
+        document = load(f.read(), loader)
+    _record_includes(path, included)
+    return document, included
+
+
+def load_files(paths, loader=None):
     """
     Load and yield a YAML document for each file path given.
 
     :param paths: Sequence of file paths that point to YAML documents.
+    :param loader: (Optional) Name of loader backend to use.
     :return: A generator that yields YAML documents from the given file paths.
     """
     for path in paths:
-        yield load_file(path)
+        yield load_file(path, loader)
 
 
-def load(stream):
+def load(stream, loader=None):
     """
     Load a single document within the given YAML string.
 
     :param stream: A valid YAML stream.
+    :param loader: (Optional) Name of loader backend to use.
     :return: An :class:`~collections.OrderedDict` representation of the YAML stream.
     """
-    return yaml.load(stream, OrderedRoundTripLoader)
+    loader = get_loader(loader)
+    return _loaders().yaml_module(loader).load(stream, loader)
 
 
-def load_all(stream):
+def load_all(stream, loader=None):
     """
     Load all documents within the given YAML string.
 
     :param stream: A valid YAML stream.
+    :param loader: (Optional) Name of loader backend to use.
     :return: List that contains all documents found in the YAML stream.
     """
-    return list(load_all_gen(stream))
+    return list(load_all_gen(stream, loader))
 
 
-def load_all_gen(stream):
+def load_all_gen(stream, loader=None):
     """
-    Load all documents within the given YAML string.
+    Load all documents within the given YAML string or file-like object.
+
+    Documents are parsed lazily, one at a time, as the generator is consumed.
 
     :param stream: A valid YAML stream.
+    :param loader: (Optional) Name of loader backend to use.
     :return: Generator that yields each document found in the YAML stream.
     """
-    return yaml.load_all(stream, OrderedRoundTripLoader)
+    loader = get_loader(loader)
+    return _loaders().yaml_module(loader).load_all(stream, loader)
@@ -0,0 +1,226 @@
+"""
+    ydf/yaml_loaders
+    ~~~~~~~~~~~~~~~~
+
+    YAML loader classes for each parser backend supported by :mod:`~ydf.yaml_ext`.
+
+    These live apart from :mod:`~ydf.yaml_ext` so the YAML libraries are only imported once a document
+    is parsed.
+"""
+
+import collections
+import importlib
+
+from ruamel import yaml
+from ruamel.yaml import composer, constructor, resolver
+
+from ydf import yaml_ext
+
+
+def construct_ordered_mapping(loader, node):
+    """
+    Construct a :class:`~collections.OrderedDict` from a YAML mapping node, applying any merge (`<<`) keys.
+
+    :param loader: Safe loader instance constructing the document
+    :param node: YAML mapping node
+    :return: An :class:`~collections.OrderedDict` of the mapping
+    """
+    loader.flatten_mapping(node)
+    return collections.OrderedDict(loader.construct_pairs(node))
+
+
+def construct_include(loader, node):
+    """
+    Construct the document, or one of its top level values, that an `!include path[#key]` node refers to.
+
+    :param loader: Loader instance constructing the document
+    :param node: YAML scalar node containing the path, relative to the file being loaded, and optional key
+    :return: Copy of the included document or value
+    """
+    return yaml_ext.include(str(loader.construct_scalar(node)))
+
+
+EventLoader = collections.namedtuple('EventLoader', 'loader parser resolver composer')
+EventLoader.__doc__ = """
+Parts of a loader instance used to compose and construct a document one node at a time.
+
+:param loader: Loader instance, which constructs Python objects from composed nodes
+:param parser: Parser the events of the stream are read from
+:param resolver: Resolver of the tags of composed nodes
+:param composer: :class:`~ydf.yaml_loaders.NodeComposer` of the loader
+"""
+
+
+class NodeComposer(composer.Composer):
+    """
+    Composer of nodes from the events of any ruamel.yaml loader, including one whose parser is written in C and
+    doesn't compose nodes one at a time itself.
+
+    Anchors are kept for the whole document, so a node can alias one composed by an earlier call.
+
+    :param parser: Parser to read events from
+    :param resolver: Resolver of the tags of nodes
+    """
+
+    # Plain attributes instead of the properties of the base class, which are looked up on every event.
+    parser = None
+    resolver = None
+
+    def __init__(self, parser, resolver):
+        super(NodeComposer, self).__init__()
+        self.parser = parser
+        self.resolver = resolver
+
+
+class OrderedRoundTripLoader(yaml.RoundTripLoader):
+    """
+    Extends the default round trip YAML loader to use :class:`~collections.OrderedDict` for mapping
+    types.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(OrderedRoundTripLoader, self).__init__(*args, **kwargs)
+        self.add_constructor(yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG, self.construct_ordered_mapping)
+        self.add_constructor(yaml_ext.INCLUDE_TAG, construct_include)
+
+    @staticmethod
+    def construct_ordered_mapping(loader, node):
+        # The round trip constructor records merge keys instead of applying them, so use the safe one.
+        constructor.SafeConstructor.flatten_mapping(loader, node)
+        return collections.OrderedDict(loader.construct_pairs(node))
+
+
+class OrderedSafeLoader(yaml.SafeLoader):
+    """
+    Extends the pure python safe YAML loader to use :class:`~collections.OrderedDict` for mapping types.
+
+    The safe loader skips the comment and formatting bookkeeping of the round trip loader.
+    """
+
+
+OrderedSafeLoader.add_constructor(resolver.BaseResolver.DEFAULT_MAPPING_TAG, construct_ordered_mapping)
+OrderedSafeLoader.add_constructor(yaml_ext.INCLUDE_TAG, construct_include)
+
+
+LOADERS = collections.OrderedDict()
+
+try:
+    from _ruamel_yaml import CParser
+except ImportError:
+    pass
+else:
+    class OrderedCSafeLoader(CParser, constructor.SafeConstructor, resolver.VersionedResolver):
+        """
+        Safe YAML loader that parses with libyaml and uses :class:`~collections.OrderedDict` for
+        mapping types.
+
+        Scalars are resolved using the same YAML 1.2 rules as the round trip loader.
+        """
+
+        def __init__(self, stream, version=None, preserve_quotes=None):
+            CParser.__init__(self, stream)
+            self._parser = self._composer = self
+            constructor.SafeConstructor.__init__(self, loader=self)
+            resolver.VersionedResolver.__init__(self, version, loader=self)
+
+    OrderedCSafeLoader.add_constructor(resolver.BaseResolver.DEFAULT_MAPPING_TAG, construct_ordered_mapping)
+    OrderedCSafeLoader.add_constructor(yaml_ext.INCLUDE_TAG, construct_include)
+    LOADERS[yaml_ext.LOADER_CSAFE] = OrderedCSafeLoader
+
+LOADERS[yaml_ext.LOADER_SAFE] = OrderedSafeLoader
+LOADERS[yaml_ext.LOADER_ROUNDTRIP] = OrderedRoundTripLoader
+
+AUTO_LOADER = yaml_ext.LOADER_CSAFE if yaml_ext.LOADER_CSAFE in LOADERS else yaml_ext.LOADER_ROUNDTRIP
+
+# PyYAML is slow to import, so its loader is only built when it's asked for.
+PYYAML_LOADER = None
+
+
+def pyyaml_loader():
+    """
+    Get the loader that parses with PyYAML and libyaml, building it the first time.
+
+    :return: Loader class or `None` if PyYAML or its libyaml bindings aren't installed
+    """
+    global PYYAML_LOADER
+
+    if PYYAML_LOADER is None:
+        try:
+            pyyaml = importlib.import_module('yaml')
+            PyYAMLCSafeLoader = pyyaml.CSafeLoader
+        except (ImportError, AttributeError):
+            PYYAML_LOADER = False
+        else:
+            class OrderedPyYAMLLoader(PyYAMLCSafeLoader):
+                """
+                Safe YAML loader from PyYAML that parses with libyaml and uses :class:`~collections.OrderedDict`
+                for mapping types.
+
+                PyYAML resolves scalars using YAML 1.1 rules, e.g. `yes` is loaded as `True`.
+                """
+
+                yaml_module = pyyaml
+
+            OrderedPyYAMLLoader.add_constructor(pyyaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG,
+                                                construct_ordered_mapping)
+            OrderedPyYAMLLoader.add_constructor(yaml_ext.INCLUDE_TAG, construct_include)
+            PYYAML_LOADER = OrderedPyYAMLLoader
+
+    return PYYAML_LOADER or None
+
+
+def get(name):
+    """
+    Get the loader class of the given backend.
+
+    :param name: Name of loader backend
+    :return: Loader class
+    :raises KeyError: If the backend is unknown or not installed
+    """
+    if name == yaml_ext.LOADER_PYYAML:
+        loader = pyyaml_loader()
+        if loader is None:
+            raise KeyError(name)
+        return loader
+    return LOADERS[name]
+
+
+def available():
+    """
+    Get the names of every loader backend that is installed, fastest first.
+
+    :return: List of loader backend names
+    """
+    names = []
+    for name in yaml_ext.LOADER_NAMES:
+        try:
+            get(name)
+        except KeyError:
+            continue
+        names.append(name)
+    return names
+
+
+def event_loader(stream, loader):
+    """
+    Create an instance of the given loader class for the stream, along with its parser, resolver and a composer
+    of single nodes.
+
+    Every ruamel.yaml loader class mixes in its parser and resolver, so the instance is both.
+
+    :param stream: File-like object or string containing YAML
+    :param loader: ruamel.yaml loader class
+    :return: :class:`~ydf.yaml_loaders.EventLoader` of the new instance
+    """
+    instance = loader(stream)
+    return EventLoader(instance, instance, instance, NodeComposer(instance, instance))
+
+
+def yaml_module(loader):
+    """
+    Get the module whose `load` functions accept the given loader class.
+
+    :param loader: Loader class
+    :return: Module containing `load` and `load_all` functions
+    """
+    return getattr(loader, 'yaml_module', yaml)